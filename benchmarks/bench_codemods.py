@@ -0,0 +1,170 @@
+"""
+Times each codemod separately on a synthetic legacy dagster corpus, see
+:mod:`corpus`, and saves the results as JSON so that runs on different versions
+can be compared::
+
+    python benchmarks/bench_codemods.py --output before.json
+    # ... change some codemods ...
+    python benchmarks/bench_codemods.py --output after.json --compare before.json
+
+Modules are parsed once, outside of the timings; what is timed is
+``codemod(context).transform_module(tree)`` on every module of the corpus,
+repeated ``--repeat`` times. Parsing is timed on its own as a reference.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from dataclasses import asdict, fields
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import libcst as cst
+from libcst.codemod import Codemod, CodemodContext
+
+from codemods import __version__
+from codemods.cache import LIBCST_VERSION
+from codemods.change_input_output_defs import ChangeInputOutputDefsCommand
+from codemods.convert_composite_to_graph import ConvertCompositeToGraph
+from codemods.convert_pipeline_to_job import ConvertPipelineToJob
+from codemods.convert_solid_to_op import ConvertSolidToOp
+from codemods.execute_pipeline_to_in_process import ConvertExecutePipeline
+from codemods.invocation_arguments import SwitchInvocationArgumentsCommand
+from codemods.legacy_dagster_imports import LegacyImportCommand
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from corpus import CorpusSpec, generate_corpus  # noqa: E402
+
+# Codemods under benchmark, with the arguments they are instantiated with.
+BENCHMARKS: Dict[str, Callable[[CodemodContext], Codemod]] = {
+    "ConvertSolidToOp": ConvertSolidToOp,
+    "ConvertPipelineToJob": ConvertPipelineToJob,
+    "ConvertCompositeToGraph": ConvertCompositeToGraph,
+    "ConvertExecutePipeline": ConvertExecutePipeline,
+    "ChangeInputOutputDefsCommand": ChangeInputOutputDefsCommand,
+    "LegacyImportCommand": lambda context: LegacyImportCommand(
+        context, symbols=["solid", "lambda_solid", "composite_solid", "pipeline"]
+    ),
+    "SwitchInvocationArgumentsCommand": lambda context: SwitchInvocationArgumentsCommand(
+        context,
+        symbol="ScheduleDefinition",
+        original_arg="pipeline_name",
+        original_arg_position=2,
+        replacement_arg="job_name",
+    ),
+}
+
+
+def time_codemod(
+    make_codemod: Callable[[CodemodContext], Codemod], trees: Sequence[cst.Module], repeat: int
+) -> List[float]:
+    """Seconds it took to transform all of ``trees``, for each repetition."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for tree in trees:
+            make_codemod(CodemodContext()).transform_module(tree)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def time_parse(sources: Sequence[str], repeat: int) -> List[float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for source in sources:
+            cst.parse_module(source)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def summarize(timings: List[float], modules: int) -> Dict[str, Any]:
+    return {
+        "timings": timings,
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "per_module_ms": min(timings) / modules * 1000,
+    }
+
+
+def run_benchmarks(
+    spec: CorpusSpec, repeat: int, only: Optional[Sequence[str]] = None
+) -> Dict[str, Any]:
+    sources = [source for _, source in generate_corpus(spec)]
+    trees = [cst.parse_module(source) for source in sources]
+    results = {"parse_module": summarize(time_parse(sources, repeat), spec.modules)}
+    for name, make_codemod in BENCHMARKS.items():
+        if only and name not in only:
+            continue
+        results[name] = summarize(time_codemod(make_codemod, trees, repeat), spec.modules)
+    return {
+        "metadata": {
+            "codemods": __version__,
+            "libcst": LIBCST_VERSION,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "corpus_bytes": sum(len(source.encode("utf-8")) for source in sources),
+        },
+        "spec": asdict(spec),
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[Tuple[str, float, float]]:
+    """Best timings of every benchmark found in both runs, as (name, baseline, current)."""
+    return [
+        (name, baseline["results"][name]["min"], result["min"])
+        for name, result in current["results"].items()
+        if name in baseline["results"]
+    ]
+
+
+def parse_args(args):
+    parser = argparse.ArgumentParser(description="Benchmark each codemod on a synthetic corpus")
+    for spec_field in fields(CorpusSpec):
+        parser.add_argument(
+            "--" + spec_field.name.replace("_", "-"),
+            dest=spec_field.name,
+            type=int,
+            default=spec_field.default,
+            metavar="INT",
+            help="default: {}".format(spec_field.default),
+        )
+    parser.add_argument("--repeat", type=int, default=3, metavar="INT")
+    parser.add_argument(
+        "--only", nargs="+", choices=sorted(BENCHMARKS), metavar="CODEMOD", help="codemods to time"
+    )
+    parser.add_argument("--output", metavar="PATH", help="write the results as JSON to PATH")
+    parser.add_argument("--compare", metavar="PATH", help="results of a previous run to compare to")
+    return parser.parse_args(args)
+
+
+def main(args: List[str]) -> None:
+    args = parse_args(args)
+    spec = CorpusSpec(
+        **{spec_field.name: getattr(args, spec_field.name) for spec_field in fields(CorpusSpec)}
+    )
+    report = run_benchmarks(spec, args.repeat, args.only)
+    if args.output:
+        with open(args.output, "w") as fp:
+            json.dump(report, fp, indent=2)
+
+    corpus_bytes = report["metadata"]["corpus_bytes"]
+    print(f"{spec.modules} modules, {corpus_bytes} bytes, best of {args.repeat}")
+    if args.compare:
+        with open(args.compare) as fp:
+            baseline = json.load(fp)
+        for name, before, after in compare(report, baseline):
+            print(f"{name:36} {before * 1e3:10.1f} ms {after * 1e3:10.1f} ms {after / before:7.2f}x")
+    else:
+        for name, result in report["results"].items():
+            print(f"{name:36} {result['min'] * 1e3:10.1f} ms {result['per_module_ms']:8.2f} ms/module")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,145 @@
+"""
+Generator of synthetic legacy dagster modules, used as the benchmark corpus.
+
+Every module has the same shape, controlled by a :class:`CorpusSpec`: a number
+of ``@solid``, ``@lambda_solid`` and ``@composite_solid`` functions (plus some
+half-migrated ``@op`` functions still using ``input_defs``/``output_defs``),
+pipelines with a ``ModeDefinition`` and a schedule, ``execute_pipeline`` calls
+and string literals mentioning the solids and pipelines. Names are prefixed by
+the module index, so that modules don't share identifiers.
+"""
+
+import os
+from dataclasses import dataclass
+from typing import Iterator, List, Tuple
+
+
+@dataclass(frozen=True)
+class CorpusSpec:
+    """Shape of every generated module."""
+
+    modules: int = 10
+    solids: int = 20
+    lambda_solids: int = 5
+    composite_solids: int = 5
+    # Half-migrated ops still using input_defs/output_defs.
+    ops: int = 5
+    # Length of the input_defs/output_defs lists of each solid and op.
+    input_defs: int = 3
+    output_defs: int = 2
+    # Pipelines with a single ModeDefinition, each with a schedule.
+    mode_pipelines: int = 3
+    # execute_pipeline calls per pipeline.
+    execute_pipeline_calls: int = 2
+    string_literals: int = 50
+
+
+def generate_module(spec: CorpusSpec, index: int = 0) -> str:
+    """Source code of the ``index``-th module of the corpus."""
+    prefix = f"m{index}_"
+    lines = [
+        "from dagster import (",
+        "    DynamicOutputDefinition,",
+        "    InputDefinition,",
+        "    ModeDefinition,",
+        "    OutputDefinition,",
+        "    ScheduleDefinition,",
+        "    composite_solid,",
+        "    execute_pipeline,",
+        "    fs_io_manager,",
+        "    lambda_solid,",
+        "    op,",
+        "    pipeline,",
+        "    solid,",
+        ")",
+        "",
+    ]
+    solids = [f"{prefix}solid_{i}" for i in range(spec.solids)]
+    for name in solids:
+        lines += _definition("solid", name, spec, config=True)
+    lambda_solids = [f"{prefix}lambda_solid_{i}" for i in range(spec.lambda_solids)]
+    for name in lambda_solids:
+        lines += ["@lambda_solid", f"def {name}():", "    return 1", "", ""]
+    for i in range(spec.ops):
+        lines += _definition("op", f"{prefix}op_{i}", spec, config=False)
+
+    composites = [f"{prefix}composite_solid_{i}" for i in range(spec.composite_solids)]
+    for i, name in enumerate(composites):
+        lines += [
+            '@composite_solid(config_schema={"n": int}, config_fn=lambda cfg: cfg)',
+            f"def {name}():",
+            *(f"    {callee}()" for callee in _take(solids + lambda_solids, i, 3)),
+            "",
+            "",
+        ]
+
+    pipelines = [f"{prefix}pipeline_{i}" for i in range(spec.mode_pipelines)]
+    for i, name in enumerate(pipelines):
+        lines += [
+            '@pipeline(mode_defs=[ModeDefinition(resource_defs={"io_manager": fs_io_manager})])',
+            f"def {name}():",
+            *(f"    {callee}()" for callee in _take(composites or solids, i, 2)),
+            "",
+            "",
+            f"{name}_schedule = ScheduleDefinition(",
+            f'    "{name}_schedule", "0 * * * *", pipeline_name="{name}"',
+            ")",
+            "",
+            "",
+        ]
+
+    lines.append("MESSAGES = [")
+    for i in range(spec.string_literals):
+        subject = _take(solids + pipelines, i, 1)
+        lines.append(f'    "message {i} about {subject[0] if subject else "nothing"}",')
+    lines += ["]", "", ""]
+
+    lines.append(f"def {prefix}run_all():")
+    for name in pipelines:
+        for i in range(spec.execute_pipeline_calls):
+            lines.append(
+                f'    execute_pipeline({name}, run_config={{"solids": {{}}}}, tags={{"run": "{i}"}})'
+            )
+    lines.append("    return MESSAGES")
+    return "\n".join(lines) + "\n"
+
+
+def generate_corpus(spec: CorpusSpec) -> Iterator[Tuple[str, str]]:
+    """Yield the file name and source code of every module of the corpus."""
+    for index in range(spec.modules):
+        yield f"legacy_{index}.py", generate_module(spec, index)
+
+
+def write_corpus(spec: CorpusSpec, directory: str) -> List[str]:
+    """Write the corpus to ``directory`` and return the paths of the modules."""
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for name, source in generate_corpus(spec):
+        path = os.path.join(directory, name)
+        with open(path, "w") as fp:
+            fp.write(source)
+        paths.append(path)
+    return paths
+
+
+def _definition(decorator: str, name: str, spec: CorpusSpec, config: bool) -> List[str]:
+    inputs = [f"{name}_in_{i}" for i in range(spec.input_defs)]
+    input_defs = ", ".join(f'InputDefinition("{input_}", int)' for input_ in inputs)
+    output_defs = ", ".join(
+        f'OutputDefinition(int, name="{name}_out_{i}")' for i in range(spec.output_defs)
+    )
+    config_schema = ', config_schema={"multiplier": int}' if config else ""
+    return [
+        f"@{decorator}(input_defs=[{input_defs}], output_defs=[{output_defs}]{config_schema})",
+        f"def {name}(context, {', '.join(inputs)}):" if inputs else f"def {name}(context):",
+        f'    context.log.info("running {name} in " + context.pipeline_run.pipeline_name)',
+        "    return context.solid_config",
+        "",
+        "",
+    ]
+
+
+def _take(names: List[str], start: int, count: int) -> List[str]:
+    if not names:
+        return []
+    return [names[(start + i) % len(names)] for i in range(min(count, len(names)))]
@@ -0,0 +1,213 @@
+"""
+On-disk cache of migration results, so that reruns only redo the files whose
+inputs changed.
+
+Entries are keyed by the hash of a file's contents and by a key identifying
+everything that produced the output: the libcst version, a fingerprint of each
+codemod that was applied to the file (see :func:`codemod_fingerprint`) and the
+formatter, along with a fingerprint of the code running the codemods together.
+Editing a codemod therefore only invalidates the entries of files that codemod
+was routed to.
+"""
+
+import ast
+import hashlib
+import importlib.util
+import inspect
+import os
+import sqlite3
+import sys
+from functools import lru_cache
+from types import ModuleType
+from typing import Dict, FrozenSet, Optional, Sequence, Tuple, Type
+
+from libcst.codemod import Codemod
+
+from codemods.formatting import formatter_key
+from codemods.multiplex import MultiplexedCodemod
+
+if sys.version_info[:2] >= (3, 8):
+    from importlib.metadata import version  # pragma: no cover
+else:
+    from importlib_metadata import version  # pragma: no cover
+
+DEFAULT_CACHE_PATH = ".dagster-migrate-cache.sqlite"
+
+LIBCST_VERSION = version("libcst")
+
+_PACKAGE = __name__.partition(".")[0]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    content_hash TEXT NOT NULL,
+    transform_key TEXT NOT NULL,
+    -- NULL when the transform left the file unchanged.
+    output BLOB,
+    PRIMARY KEY (content_hash, transform_key)
+)
+"""
+
+
+def content_hash(source: bytes) -> str:
+    return hashlib.blake2b(source, digest_size=20).hexdigest()
+
+
+@lru_cache(maxsize=None)
+def codemod_fingerprint(codemod: Type[Codemod]) -> str:
+    """Hash of the source code a codemod is made of.
+
+    This covers the module defining the codemod and every module of this
+    package it imports, directly or through other modules, see
+    :func:`package_dependencies`, so that editing ``convert_solid_to_op.py``
+    changes the fingerprint of ``ConvertSolidToOp`` but not that of
+    ``ConvertPipelineToJob``.
+    """
+    return _fingerprint(codemod.__qualname__, sys.modules[codemod.__module__])
+
+
+@lru_cache(maxsize=None)
+def driver_fingerprint() -> str:
+    """Hash of the source code running the codemods together, see :mod:`codemods.multiplex`."""
+    return _fingerprint("driver", sys.modules[MultiplexedCodemod.__module__])
+
+
+def _fingerprint(name: str, module: ModuleType) -> str:
+    digest = hashlib.blake2b(name.encode("utf-8"), digest_size=20)
+    with open(inspect.getfile(module), "rb") as fp:
+        digest.update(fp.read())
+    for module_name in sorted(package_dependencies(module.__name__) - {module.__name__}):
+        with open(_source_file(module_name), "rb") as fp:
+            digest.update(fp.read())
+    return digest.hexdigest()
+
+
+def package_dependencies(module_name: str) -> FrozenSet[str]:
+    """The modules of this package ``module_name`` imports, directly or not.
+
+    Imports are read from the source, wherever they are, so that this also
+    covers the modules constants such as ``TRIVIA`` are imported from.
+    """
+    dependencies = set()
+    pending = [module_name]
+    while pending:
+        for dependency in _imported_modules(pending.pop()):
+            if dependency not in dependencies:
+                dependencies.add(dependency)
+                pending.append(dependency)
+    return frozenset(dependencies)
+
+
+@lru_cache(maxsize=None)
+def _imported_modules(module_name: str) -> Tuple[str, ...]:
+    """The modules of this package the source of ``module_name`` imports."""
+    path = _source_file(module_name)
+    if path is None:
+        return ()
+    with open(path, "rb") as fp:
+        tree = ast.parse(fp.read(), path)
+    package = (
+        module_name if os.path.basename(path) == "__init__.py" else module_name.rpartition(".")[0]
+    )
+    imported = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            imported.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            base = importlib.util.resolve_name("." * node.level + (node.module or ""), package)
+            imported.append(base)
+            # ``from codemods import cleanup`` imports a module too.
+            imported.extend(f"{base}.{alias.name}" for alias in node.names)
+    return tuple(name for name in imported if _is_package_module(name))
+
+
+def _is_package_module(name: str) -> bool:
+    return name.partition(".")[0] == _PACKAGE and _source_file(name) is not None
+
+
+@lru_cache(maxsize=None)
+def _source_file(module_name: str) -> Optional[str]:
+    if module_name in sys.modules:
+        return inspect.getfile(sys.modules[module_name])
+    try:
+        spec = importlib.util.find_spec(module_name)
+    except (ImportError, ValueError):
+        return None
+    return spec.origin if spec is not None and spec.has_location else None
+
+
+def transform_key(
+    codemods: Sequence[Type[Codemod]],
+    formatter: Sequence[str] = (),
+    filename: Optional[str] = None,
+) -> str:
+    """Identifies the output of ``codemods`` and ``formatter`` for a given file contents.
+
+    Codemods whose output also depends on state other than the contents, such
+    as the path of the file, identify that state with a ``state_key(filename)``
+    class method.
+    """
+    return ";".join(
+        [
+            f"libcst={LIBCST_VERSION}",
+            f"driver={driver_fingerprint()}",
+            *(
+                f"{codemod.__qualname__}={codemod_fingerprint(codemod)}{_state_key(codemod, filename)}"
+                for codemod in codemods
+            ),
+            f"formatter={formatter_key(formatter)}",
+        ]
+    )
+
+
+def _state_key(codemod: Type[Codemod], filename: Optional[str]) -> str:
+    state_key = getattr(codemod, "state_key", None)
+    return f"+{state_key(filename)}" if state_key is not None else ""
+
+
+class ResultCache:
+    """SQLite backed store of transform outputs.
+
+    Connections are opened in WAL mode so that every worker of a run can read
+    and write the same cache concurrently. Use :meth:`open` to get a connection
+    that is reused for the lifetime of the current process; threads sharing it
+    must not use it concurrently.
+    """
+
+    _connections: Dict[Tuple[int, str], "ResultCache"] = {}
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._db = sqlite3.connect(path, timeout=60, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(_SCHEMA)
+
+    @classmethod
+    def open(cls, path: str) -> "ResultCache":
+        # Keyed by pid too: sqlite connections must not be shared across a fork.
+        key = (os.getpid(), os.path.abspath(path))
+        if key not in cls._connections:
+            cls._connections[key] = cls(path)
+        return cls._connections[key]
+
+    def get(self, content_hash: str, transform_key: str) -> Tuple[bool, Optional[bytes]]:
+        """Look up a result, returning whether it was found and the stored output."""
+        row = self._db.execute(
+            "SELECT output FROM results WHERE content_hash = ? AND transform_key = ?",
+            (content_hash, transform_key),
+        ).fetchone()
+        if row is None:
+            return False, None
+        return True, row[0]
+
+    def put(self, content_hash: str, transform_key: str, output: Optional[bytes]) -> None:
+        self._db.execute(
+            "INSERT OR REPLACE INTO results VALUES (?, ?, ?)",
+            (content_hash, transform_key, output),
+        )
+
+    def close(self) -> None:
+        self._db.close()
+        for key, cache in list(self._connections.items()):
+            if cache is self:
+                del self._connections[key]
@@ -1,19 +1,36 @@
 import argparse
 from ast import literal_eval
-from typing import Union, Sequence, Set, Optional, Tuple
+from typing import Dict, FrozenSet, Union, Sequence, Set, Optional, Tuple, Type
 
 import libcst as cst
-from libcst.codemod import CodemodContext, VisitorBasedCodemodCommand
+from libcst.codemod import CodemodContext
 from libcst.codemod.visitors import AddImportsVisitor
 
+from codemods.dagster_imports import collect, dagster_imports
+from codemods.matching import call_name
+from codemods.pruning import IMPORTS, TRIVIA, PruningCodemodCommand
 
-class ChangeInputOutputDefsCommand(VisitorBasedCodemodCommand):
+# For each decorator whose input_defs and output_defs are converted, the
+# classes that replace InputDefinition and OutputDefinition in its ins and out.
+IO_DEFINITION_CLASSES: Dict[str, Tuple[str, str]] = {
+    "op": ("In", "Out"),
+    "graph": ("GraphIn", "GraphOut"),
+}
+
+
+class ChangeInputOutputDefsCommand(PruningCodemodCommand):
 
     # Add a description so that future codemodders can see what this does.
     DESCRIPTION: str = (
         "Switches the arguments of a function/class invocation to the ones specified."
     )
 
+    # Byte strings one of which must appear in a module for this codemod to change it.
+    PREFILTER_KEYWORDS: Tuple[bytes, ...] = (b"input_defs", b"output_defs")
+
+    # Nodes whose children this codemod never changes, see codemods.pruning.
+    SKIPPED_SUBTREES: FrozenSet[Type[cst.CSTNode]] = TRIVIA | IMPORTS
+
     @staticmethod
     def add_args(arg_parser: argparse.ArgumentParser) -> None:
         # Add command-line args that a user can specify for running this
@@ -29,16 +46,20 @@ class ChangeInputOutputDefsCommand(VisitorBasedCodemodCommand):
         # this init.
         super().__init__(context)
 
+    def visit_Module(self, node: cst.Module) -> None:
+        collect(self.context, node)
+
     def leave_Call(self, original_node: cst.Call, updated_node: cst.Call) -> cst.Call:
-        if isinstance(original_node.func, cst.Name) and original_node.func.value == "op":
-            return self._replace_args(original_node)
+        classes = IO_DEFINITION_CLASSES.get(call_name(original_node, dagster_imports(self.context)))
+        if classes is not None:
+            return self._replace_args(original_node, *classes)
         # This isn't an invocation we're concerned with, so leave it unchanged.
         return updated_node
 
-    def _replace_args(self, node: cst.Call) -> cst.Call:
-        return self._replace_arg(self._replace_arg(node, "input"), "output")
+    def _replace_args(self, node: cst.Call, in_class: str, out_class: str) -> cst.Call:
+        return self._replace_arg(self._replace_arg(node, "input", in_class), "output", out_class)
 
-    def _replace_arg(self, node: cst.Call, io_type: str) -> cst.Call:
+    def _replace_arg(self, node: cst.Call, io_type: str, io_class: str) -> cst.Call:
         if io_type == "input":
             keyword = "ins"
             original_arg_name = "input_defs"
@@ -52,7 +73,7 @@ class ChangeInputOutputDefsCommand(VisitorBasedCodemodCommand):
         if pos is None:
             return node
         arg = node.args[pos]
-        new_arg = cst.Arg(keyword=cst.Name(value=keyword), value=_convert_fn(arg.value))
+        new_arg = cst.Arg(keyword=cst.Name(value=keyword), value=_convert_fn(arg.value, io_class))
 
         new_arg_list = [node.args[i] if i != pos else new_arg for i in range(len(node.args))]
 
@@ -69,29 +90,29 @@ class ChangeInputOutputDefsCommand(VisitorBasedCodemodCommand):
                 return i
         return None
 
-    def _convert_input_defs_to_ins(self, input_defs_list: cst.List) -> cst.Dict:
+    def _convert_input_defs_to_ins(self, input_defs_list: cst.List, in_class: str) -> cst.Dict:
         dict_elements = []
         for input_def_call in input_defs_list.elements:
             input_def_args = input_def_call.value.args
             name, rest_of_args = self._extract_name_from_input_def_args(input_def_args)
             dict_element = cst.DictElement(
                 key=cst.SimpleString(value=name),
-                value=cst.Call(func=cst.Name(value="In"), args=rest_of_args),
+                value=cst.Call(func=cst.Name(value=in_class), args=rest_of_args),
             )
             dict_elements.append(dict_element)
         return cst.Dict(elements=dict_elements)
 
-    def _convert_output_defs_to_out(self, output_defs_list: cst.List) -> cst.Dict:
+    def _convert_output_defs_to_out(self, output_defs_list: cst.List, out_class: str) -> cst.Dict:
         dict_elements = []
         for output_def_call in output_defs_list.elements:
             output_def_args = output_def_call.value.args
             name, rest_of_args = self._extract_name_from_output_def_args(output_def_args)
             # Singleton output case
             if name is None:
-                return cst.Call(func=cst.Name(value="Out"), args=rest_of_args)
+                return cst.Call(func=cst.Name(value=out_class), args=rest_of_args)
             dict_element = cst.DictElement(
                 key=cst.SimpleString(value=name),
-                value=cst.Call(func=cst.Name(value="Out"), args=rest_of_args),
+                value=cst.Call(func=cst.Name(value=out_class), args=rest_of_args),
             )
             dict_elements.append(dict_element)
         return cst.Dict(elements=dict_elements)
@@ -0,0 +1,77 @@
+"""
+Removal of the imports the migration codemods made obsolete, such as the
+``solid`` in ``from dagster import solid`` once every ``@solid`` became ``@op``.
+
+Codemods record the symbols they stopped referencing with
+:func:`mark_obsolete_import`, or :func:`mark_obsolete_name` for the names
+they resolved to a symbol, which may be aliases. After the codemods ran,
+:func:`remove_obsolete_imports` removes the imports of those symbols, and only
+those, that scope analysis finds to be unused. Unlike scheduling them with
+``RemoveImportsVisitor.remove_unused_import``, marks are only acted upon when
+the codemods are run together, by :class:`~codemods.multiplex.MultiplexedCodemod`,
+which removes the marks of every codemod at once, see :mod:`codemods.imports`.
+"""
+
+from typing import AbstractSet, Iterable, Optional, Set, Tuple
+
+import libcst as cst
+from libcst.codemod import CodemodContext
+from libcst.codemod.visitors import RemoveImportsVisitor
+
+from codemods.metadata import MetadataCache, transform_module
+
+CONTEXT_KEY = "ObsoleteImports"
+ALIASES_KEY = "ObsoleteAliases"
+
+# Modules the legacy dagster APIs may be imported from.
+DAGSTER_MODULES: Tuple[str, ...] = ("dagster", "dagster._legacy")
+
+
+def mark_obsolete_import(context: CodemodContext, *symbols: str) -> None:
+    """Record that the dagster ``symbols`` may no longer be referenced."""
+    obsolete = context.scratch.setdefault(CONTEXT_KEY, set())
+    for symbol in symbols:
+        for module in DAGSTER_MODULES:
+            obsolete.add((module, symbol))
+
+
+def mark_obsolete_name(context: CodemodContext, name: str, symbol: str) -> None:
+    """Record that ``name``, bound to the dagster ``symbol``, may no longer be referenced."""
+    if name == symbol:
+        mark_obsolete_import(context, symbol)
+        return
+    aliases = context.scratch.setdefault(ALIASES_KEY, set())
+    for module in DAGSTER_MODULES:
+        aliases.add((module, symbol, name))
+
+
+def obsolete_imports(context: CodemodContext) -> AbstractSet[Tuple[str, str]]:
+    return context.scratch.get(CONTEXT_KEY, frozenset())
+
+
+def obsolete_aliases(context: CodemodContext) -> AbstractSet[Tuple[str, str, str]]:
+    """The (module, symbol, alias) triples of the aliased imports marked obsolete."""
+    return context.scratch.get(ALIASES_KEY, frozenset())
+
+
+def remove_obsolete_imports(
+    context: CodemodContext,
+    tree: cst.Module,
+    obsolete: Iterable[Tuple[str, str]],
+    cache: Optional[MetadataCache] = None,
+    aliases: Iterable[Tuple[str, str, str]] = (),
+) -> cst.Module:
+    """Remove the imports of ``obsolete`` (module, symbol) pairs left unused in ``tree``.
+
+    Likewise for the imports of the (module, symbol, alias) triples of ``aliases``.
+    The scope analysis reuses the metadata of ``cache``, if given and computed for ``tree``.
+    """
+    unused: Set[Tuple[str, str, Optional[str]]] = {
+        (module, symbol, None) for module, symbol in obsolete
+    }
+    unused.update(aliases)
+    if not unused:
+        return tree
+    return transform_module(
+        RemoveImportsVisitor(context, sorted(unused)), tree, cache or MetadataCache()
+    )
@@ -1,13 +1,17 @@
 import argparse
 from ast import literal_eval
-from typing import Union, Sequence, Set, Optional, Tuple, cast, Dict
+from typing import Iterator, Union, Sequence, Set, Optional, Tuple, cast, Dict
 
 import libcst as cst
 from libcst.codemod import CodemodContext, VisitorBasedCodemodCommand
 from libcst.codemod.visitors import AddImportsVisitor
-from libcst.codemod._visitor import ContextAwareTransformer
 import libcst.matchers as m
 
+from codemods.cleanup import mark_obsolete_name
+from codemods.dagster_imports import DagsterImports, collect, dagster_imports, with_name
+from codemods.matching import decorator_name
+from codemods.rename import RenameTable, RenameTransformer
+
 
 class CodemodSolid(VisitorBasedCodemodCommand):
 
@@ -16,6 +20,9 @@ class CodemodSolid(VisitorBasedCodemodCommand):
         "Switches the arguments of a function/class invocation to the ones specified."
     )
 
+    # Byte strings one of which must appear in a module for this codemod to change it.
+    PREFILTER_KEYWORDS: Tuple[bytes, ...] = (b"solid",)
+
     @staticmethod
     def add_args(arg_parser: argparse.ArgumentParser) -> None:
         # Add command-line args that a user can specify for running this
@@ -30,39 +37,63 @@ class CodemodSolid(VisitorBasedCodemodCommand):
         # "dest" for each argument we added above must match a parameter name in
         # this init.
         super().__init__(context)
+        self.renames = RenameTable({})
+        # Number of solid function bodies the traversal is in.
+        self._solid_body_depth = 0
+
+    def visit_Module(self, node: cst.Module) -> None:
+        # Solids are found upfront, so that their references are renamed in the
+        # same pass, even those that come before their definition.
+        for solid_def in _find_solids(node.body, collect(self.context, node)):
+            name = solid_def.name.value
+            RenameVariablesVisitor.rename_variable(self.context, name, name.replace("solid", "op"))
+        self.renames = RenameTable(self.context.scratch.get(RenameVariablesVisitor.CONTEXT_KEY, {}))
+
+    def visit_FunctionDef_body(self, node: cst.FunctionDef) -> None:
+        if _get_solid_decorator_pos(node.decorators, dagster_imports(self.context)) != -1:
+            self._solid_body_depth += 1
+
+    def leave_FunctionDef_body(self, node: cst.FunctionDef) -> None:
+        if _get_solid_decorator_pos(node.decorators, dagster_imports(self.context)) != -1:
+            self._solid_body_depth -= 1
 
-    def transform_module(self, tree: cst.Module) -> cst.Module:
-        tree = super().transform_module(tree)
-
-        supported_transforms: Dict[str, Type[Codemod]] = {
-            RenameVariablesVisitor.CONTEXT_KEY: RenameVariablesVisitor,
-        }
-
-        # For any visitors that we support auto-running, run them here if needed.
-        for key, transform in supported_transforms.items():
-            if key in self.context.scratch:
-                # We have work to do, so lets run this.
-                tree = self._instantiate_and_run(transform, tree)
+    def leave_Name(self, original_node: cst.Name, updated_node: cst.Name) -> cst.Name:
+        value = original_node.value
+        if self._solid_body_depth:
+            value = SOLID_FUNCTION_RENAMES.sub(value)
+        value = self.renames.rename(value) or value
+        if value != original_node.value:
+            return updated_node.with_changes(value=value)
+        return updated_node
 
-        # We're finally done!
-        return tree
+    def leave_SimpleString(
+        self, original_node: cst.SimpleString, updated_node: cst.SimpleString
+    ) -> cst.SimpleString:
+        value = self.renames.sub(updated_node.value)
+        if value != updated_node.value:
+            return updated_node.with_changes(value=value)
+        return updated_node
 
     def leave_FunctionDef(
         self, original_node: cst.FunctionDef, updated_node: cst.FunctionDef
     ) -> cst.FunctionDef:
         if (
             len(original_node.decorators) > 0
-            and _get_solid_decorator_pos(original_node.decorators) != -1
+            and _get_solid_decorator_pos(original_node.decorators, dagster_imports(self.context))
+            != -1
         ):
-            return self.replace_solid(original_node)
+            return self.replace_solid(original_node, updated_node)
         # This isn't a function def we're concerned with, so leave it unchanged.
         return updated_node
 
-    def replace_solid(self, node: cst.FunctionDef) -> cst.FunctionDef:
-        solid_def = node
-        new_name = solid_def.name.value.replace("solid", "op")
-        RenameVariablesVisitor.rename_variable(self.context, solid_def.name.value, new_name)
-        solid_decorator_pos = _get_solid_decorator_pos(solid_def.decorators)
+    def replace_solid(
+        self, original_node: cst.FunctionDef, updated_node: cst.FunctionDef
+    ) -> cst.FunctionDef:
+        solid_def = updated_node
+        new_name = original_node.name.value.replace("solid", "op")
+        solid_decorator_pos = _get_solid_decorator_pos(
+            solid_def.decorators, dagster_imports(self.context)
+        )
         replaced_decorator = self._replace_decorator(solid_def.decorators[solid_decorator_pos])
         new_decorator_list = [
             decorator if i != solid_decorator_pos else replaced_decorator
@@ -72,24 +103,23 @@ class CodemodSolid(VisitorBasedCodemodCommand):
         return solid_def.with_changes(
             name=solid_def.name.with_changes(value=new_name),
             decorators=new_decorator_list,
-            body=self._instantiate_and_run(
-                RenameVariablesWithinSolidFunctionVisitor, solid_def.body
-            ),
         )
 
     def _replace_decorator(self, decorator: cst.Decorator) -> cst.Decorator:
-        AddImportsVisitor.add_needed_import(
-            self.context,
-            "dagster",
-            "op",
-        )
-        if isinstance(decorator.decorator, cst.Name):
-            return decorator.with_changes(decorator=decorator.decorator.with_changes(value="op"))
+        if not isinstance(decorator.decorator, cst.Call):
+            return decorator.with_changes(decorator=self._to_op(decorator.decorator))
         else:
             call_node = cast(cst.Call, decorator.decorator)
-            new_call = self._replace_args(call_node)
+            new_call = self._replace_args(call_node.with_changes(func=self._to_op(call_node.func)))
             return decorator.with_changes(decorator=new_call)
 
+    def _to_op(self, expression: cst.BaseExpression) -> cst.BaseExpression:
+        """``expression``, referring to the ``solid`` decorator, referring to ``op`` instead."""
+        if isinstance(expression, cst.Name):
+            AddImportsVisitor.add_needed_import(self.context, "dagster", "op")
+            mark_obsolete_name(self.context, expression.value, "solid")
+        return with_name(expression, "op")
+
     def _replace_args(self, node: cst.Call) -> cst.Call:
         return self._replace_arg(self._replace_arg(node, "input"), "output")
 
@@ -105,13 +135,13 @@ class CodemodSolid(VisitorBasedCodemodCommand):
 
         pos = self._get_arg_pos(node.args, original_arg_name)
         if pos is None:
-            return node.with_changes(func=node.func.with_changes(value="op"))
+            return node
         arg = node.args[pos]
         new_arg = cst.Arg(keyword=cst.Name(value=keyword), value=_convert_fn(arg.value))
 
         new_arg_list = [node.args[i] if i != pos else new_arg for i in range(len(node.args))]
 
-        return node.with_changes(func=node.func.with_changes(value="op"), args=new_arg_list)
+        return node.with_changes(args=new_arg_list)
 
     def _get_arg_pos(self, arg_list: Sequence[cst.Arg], keyword: str) -> Optional[int]:
         for i, arg in enumerate(arg_list):
@@ -199,17 +229,38 @@ class CodemodSolid(VisitorBasedCodemodCommand):
         return None, output_def_args
 
 
-def _get_solid_decorator_pos(decorator_seq: Sequence[cst.Decorator]) -> bool:
+def _find_solids(
+    statements: Sequence[cst.CSTNode], imports: DagsterImports
+) -> Iterator[cst.FunctionDef]:
+    """Solid definitions among ``statements``, and the statements nested in them."""
+    for statement in statements:
+        if (
+            isinstance(statement, cst.FunctionDef)
+            and _get_solid_decorator_pos(statement.decorators, imports) != -1
+        ):
+            yield statement
+        if isinstance(statement, cst.SimpleStatementLine):
+            continue
+        # Only compound statements nest statements, in these attributes.
+        for attribute in ("body", "orelse", "handlers", "finalbody", "cases"):
+            nested = getattr(statement, attribute, None)
+            if isinstance(nested, cst.CSTNode):
+                nested = [nested]
+            if nested:
+                yield from _find_solids(nested, imports)
+
+
+def _get_solid_decorator_pos(
+    decorator_seq: Sequence[cst.Decorator], imports: DagsterImports
+) -> bool:
     for i, decorator in enumerate(decorator_seq):
-        if isinstance(decorator.decorator, cst.Name) and decorator.decorator.value == "solid":
-            return i
-        if isinstance(decorator.decorator, cst.Call) and decorator.decorator.func.value == "solid":
+        if decorator_name(decorator, imports) == "solid":
             return i
 
     return -1
 
 
-class RenameVariablesVisitor(ContextAwareTransformer):
+class RenameVariablesVisitor(RenameTransformer):
 
     CONTEXT_KEY = "RenameVariablesVisitor"
 
@@ -220,38 +271,10 @@ class RenameVariablesVisitor(ContextAwareTransformer):
         context.scratch[RenameVariablesVisitor.CONTEXT_KEY] = renames
 
     def __init__(self, context: CodemodContext) -> None:
-        super().__init__(context)
-        self.renames = context.scratch[RenameVariablesVisitor.CONTEXT_KEY]
+        super().__init__(context, RenameTable(context.scratch[RenameVariablesVisitor.CONTEXT_KEY]))
 
-    def leave_Name(self, original_node: cst.Name, updated_node: cst.Name) -> cst.Name:
-        if original_node.value in self.renames:
-            return original_node.with_changes(value=self.renames[original_node.value])
-        return updated_node
 
-    def leave_SimpleString(
-        self, original_node: cst.SimpleString, updated_node: cst.SimpleString
-    ) -> cst.SimpleString:
-        new_val = original_node.value
-        for orig_name in self.renames.keys():
-            if orig_name in new_val:
-                new_val = new_val.replace(orig_name, self.renames[orig_name])
-        return original_node.with_changes(value=new_val)
-
-    def _replace_value(self, orig_value: str) -> str:
-        stripped_value = orig_value.strip('"').strip("'")
-        return orig_value.replace(stripped_value, self.renames[stripped_value])
-
-
-class RenameVariablesWithinSolidFunctionVisitor(ContextAwareTransformer):
-    def leave_Name(self, original_node: cst.Name, updated_node: cst.Name) -> cst.Name:
-        if "solid" in original_node.value:
-            return original_node.with_changes(value=original_node.value.replace("solid", "op"))
-        if "pipeline_run" in original_node.value:
-            return original_node.with_changes(
-                value=original_node.value.replace("pipeline_run", "run")
-            )
-        if "pipeline_name" in original_node.value:
-            return original_node.with_changes(
-                value=original_node.value.replace("pipeline_name", "job_name")
-            )
-        return updated_node
+# Renamed within the names used by solid functions.
+SOLID_FUNCTION_RENAMES = RenameTable(
+    {"solid": "op", "pipeline_run": "run", "pipeline_name": "job_name"}, boundaries=False
+)
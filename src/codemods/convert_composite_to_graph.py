@@ -1,18 +1,31 @@
-from typing import Union, Sequence, Set, Optional, Tuple, cast
+from typing import FrozenSet, Union, Sequence, Set, Optional, Tuple, Type, cast
 
 import libcst as cst
-from libcst.codemod import CodemodContext, VisitorBasedCodemodCommand
+from libcst.codemod import CodemodContext
 from libcst.codemod.visitors import AddImportsVisitor
-from libcst.codemod._visitor import ContextAwareTransformer
-import libcst.matchers as m
-from libcst.codemod.visitors._imports import ImportItem
 
+from codemods.cleanup import mark_obsolete_name
+from codemods.dagster_imports import collect, dagster_imports, with_name
+from codemods.matching import call_name, decorated_with, decorator_name, keyword_name
+from codemods.pruning import IMPORTS, TRIVIA
+from codemods.rename import RenameTable, RenameTransformer
+from codemods.tracking import TrackedCodemodCommand, revisit_statements
 
-class ConvertCompositeToGraph(VisitorBasedCodemodCommand):
+
+class ConvertCompositeToGraph(TrackedCodemodCommand):
 
     # Add a description so that future codemodders can see what this does.
     DESCRIPTION: str = "Converts invocations of composite_solid to graph, renames the function if the function name contains solid, and renames all mention of the former solid's name."
 
+    # Byte strings one of which must appear in a module for this codemod to change it.
+    PREFILTER_KEYWORDS: Tuple[bytes, ...] = (b"composite_solid",)
+
+    # Nodes whose children this codemod never changes, see codemods.pruning. It
+    # only changes decorators, and only function definitions nest decorators.
+    SKIPPED_SUBTREES: FrozenSet[Type[cst.CSTNode]] = (
+        TRIVIA | IMPORTS | {cst.SimpleStatementLine, cst.Parameters, cst.Annotation, cst.Decorator}
+    )
+
     def __init__(
         self,
         context: CodemodContext,
@@ -21,20 +34,14 @@ class ConvertCompositeToGraph(VisitorBasedCodemodCommand):
         self.context.scratch[RenameVariablesVisitor.CONTEXT_KEY] = set()
         self.required_imports: Set[str] = set()
 
+    def visit_Module(self, node: cst.Module) -> None:
+        collect(self.context, node)
+
     def visit_FunctionDef(self, node: cst.FunctionDef) -> None:
-        if m.matches(
-            node,
-            m.FunctionDef(
-                decorators=(
-                    m.ZeroOrMore(),
-                    m.Decorator(
-                        decorator=m.Name(value="composite_solid")
-                        | m.Call(func=m.Name(value="composite_solid")),
-                    ),
-                    m.ZeroOrMore(),
-                )
-            ),
-        ) and ("solid" in node.name.value or "composite" in node.name.value):
+        imports = dagster_imports(self.context)
+        if decorated_with(node, "composite_solid", imports=imports) and (
+            "solid" in node.name.value or "composite" in node.name.value
+        ):
             if not RenameVariablesVisitor.CONTEXT_KEY in self.context.scratch:
                 self.context.scratch[RenameVariablesVisitor.CONTEXT_KEY] = set()
             self.context.scratch[RenameVariablesVisitor.CONTEXT_KEY].add(node.name.value)
@@ -42,41 +49,44 @@ class ConvertCompositeToGraph(VisitorBasedCodemodCommand):
     def leave_Decorator(
         self, original_node: cst.Decorator, updated_node: cst.Decorator
     ) -> cst.Decorator:
-        if m.matches(
-            updated_node,
-            m.Decorator(decorator=m.Name(value="composite_solid")),
-        ):  # bare decorator case
-            self.required_imports.add("graph")
-            return updated_node.with_changes(
-                decorator=updated_node.decorator.with_changes(value="graph")
+        imports = dagster_imports(self.context)
+        if decorator_name(updated_node, imports) != "composite_solid":
+            return updated_node
+        if call_name(updated_node.decorator, imports) is None:  # bare decorator case
+            return updated_node.with_changes(decorator=self._to_graph(updated_node.decorator))
+        # case where decorator is invoked a la @composite_solid(...)
+        solid_decorator_call = cast(cst.Call, updated_node.decorator)
+        solid_args = cast(cst.Call, solid_decorator_call).args
+        graph_args = self._convert_solid_args_to_graph_args(solid_args)
+        # If an argument was provided that we don't know how to handle, just ignore it.
+        if graph_args is None:
+            return updated_node
+        return updated_node.with_changes(
+            decorator=solid_decorator_call.with_changes(
+                args=graph_args, func=self._to_graph(solid_decorator_call.func)
             )
-        if m.matches(
-            updated_node,
-            m.Decorator(decorator=m.Call(func=m.Name(value="composite_solid"))),
-        ):  # case where decorator is invoked a la @composite_solid(...)
-            solid_decorator_call = cast(cst.Call, updated_node.decorator)
-            solid_args = cast(cst.Call, solid_decorator_call).args
-            graph_args = self._convert_solid_args_to_graph_args(solid_args)
-            # If an argument was provided that we don't know how to handle, just ignore it.
-            if graph_args is None:
-                return updated_node
-            self.required_imports.add("graph")
-            return updated_node.with_changes(
-                decorator=solid_decorator_call.with_changes(
-                    args=graph_args, func=solid_decorator_call.func.with_changes(value="graph")
-                )
+        )
+
+    def renames(self) -> RenameTable:
+        """The functions renamed so far, and their new names, see codemods.rename_index."""
+        return RenameVariablesVisitor(self.context).table
+
+    def leave_Module(self, original_node: cst.Module, updated_node: cst.Module) -> cst.Module:
+        if self.context.scratch.get(RenameVariablesVisitor.CONTEXT_KEY):
+            updated_node = revisit_statements(
+                self.context, updated_node, RenameVariablesVisitor(self.context)
             )
+        # Applied once the transform is done, see CodemodCommand.transform_module.
+        for required_import in sorted(self.required_imports):
+            AddImportsVisitor.add_needed_import(self.context, "dagster", required_import)
         return updated_node
 
-    def leave_Module(self, original_node: cst.Module, updated_node: cst.Module) -> cst.Module:
-        # Shenanigans here
-        module_solid_refs_removed = self._instantiate_and_run(RenameVariablesVisitor, updated_node)  # type: ignore
-        return AddImportsVisitor(
-            context=self.context,
-            imports=[
-                ImportItem("dagster", required_import) for required_import in self.required_imports
-            ],
-        ).transform_module(module_solid_refs_removed)
+    def _to_graph(self, expression: cst.BaseExpression) -> cst.BaseExpression:
+        """``expression``, referring to ``composite_solid``, referring to ``graph`` instead."""
+        if isinstance(expression, cst.Name):
+            self.required_imports.add("graph")
+            mark_obsolete_name(self.context, expression.value, "composite_solid")
+        return with_name(expression, "graph")
 
     def _convert_solid_args_to_graph_args(
         self, args: Sequence[cst.Arg]
@@ -84,13 +94,12 @@ class ConvertCompositeToGraph(VisitorBasedCodemodCommand):
         config_schema_idx = -1
         config_fn_idx = -1
         for i, arg in enumerate(args):
-            if m.matches(
-                arg, m.Arg(keyword=m.Name(value="input_defs") | m.Name(value="output_defs"))
-            ):
+            keyword = keyword_name(arg)
+            if keyword in ("input_defs", "output_defs"):
                 return None
-            if m.matches(arg, m.Arg(keyword=m.Name(value="config_fn"))):
+            if keyword == "config_fn":
                 config_fn_idx = i
-            if m.matches(arg, m.Arg(keyword=m.Name(value="config_schema"))):
+            if keyword == "config_schema":
                 config_schema_idx = i
         config_mapping_arg = []
         if config_schema_idx != -1 or config_fn_idx != -1:
@@ -112,28 +121,13 @@ class ConvertCompositeToGraph(VisitorBasedCodemodCommand):
         ]
 
 
-class RenameVariablesVisitor(ContextAwareTransformer):
+class RenameVariablesVisitor(RenameTransformer):
 
     CONTEXT_KEY = "VariableRenames"
 
     def __init__(self, context: CodemodContext) -> None:
-        super().__init__(context)
-        self.renames = context.scratch.get(RenameVariablesVisitor.CONTEXT_KEY, set())
-
-    def leave_Name(self, original_node: cst.Name, updated_node: cst.Name) -> cst.Name:
-        if original_node.value in self.renames:
-            return original_node.with_changes(value=self._replace(original_node.value))
-        return updated_node
-
-    def leave_SimpleString(
-        self, original_node: cst.SimpleString, updated_node: cst.SimpleString
-    ) -> cst.SimpleString:
-        new_val = original_node.value
-        for orig_name in self.renames:
-            new_name = self._replace(orig_name)
-            if orig_name in new_val:
-                new_val = new_val.replace(orig_name, new_name)
-        return original_node.with_changes(value=new_val)
+        renames = context.scratch.get(RenameVariablesVisitor.CONTEXT_KEY, set())
+        super().__init__(context, RenameTable({name: self._replace(name) for name in renames}))
 
     def _replace(self, orig_str: str) -> str:
         return (
@@ -1,18 +1,66 @@
-from typing import Union, Sequence, Set, Optional, Tuple, cast, Dict
+from typing import FrozenSet, Union, Sequence, Set, Optional, Tuple, Type, cast, Dict
 
 import libcst as cst
-from libcst.codemod import CodemodContext, VisitorBasedCodemodCommand
+from libcst.codemod import CodemodContext
 from libcst.codemod.visitors import AddImportsVisitor
-from libcst.codemod._visitor import ContextAwareTransformer
 import libcst.matchers as m
-from libcst.codemod.visitors._imports import ImportItem
+
+from codemods.cleanup import mark_obsolete_name
+from codemods.dagster_imports import collect, dagster_imports, with_name
+from codemods.matching import (
+    call_name,
+    compile_matcher,
+    decorated_with,
+    decorator_name,
+    keyword_name,
+)
+from codemods.pruning import IMPORTS, TRIVIA
+from codemods.rename import RenameTable, RenameTransformer
+from codemods.tracking import TrackedCodemodCommand, revisit_statements
+
+
+def _single_mode(mode_args: Sequence[m.BaseMatcherNode] = ()) -> m.List:
+    """Matches ``[ModeDefinition(...)]`` with an argument matching ``mode_args``, if any.
+
+    Whatever the function called, which the imports of the module tell, see
+    ``ConvertPipelineToJob._mode_definition``.
+    """
+    args = (m.ZeroOrMore(), *mode_args, m.ZeroOrMore()) if mode_args else m.DoNotCare()
+    return m.List(elements=(m.Element(value=m.Call(args=args)),))
+
+
+# Compiled once, see codemods.matching.
+_SINGLE_MODE_DECORATOR = compile_matcher(
+    m.Decorator(
+        decorator=m.Call(
+            args=(
+                m.ZeroOrMore(),
+                m.Arg(keyword=m.Name(value="mode_defs"), value=_single_mode()),
+                m.ZeroOrMore(),
+            ),
+        )
+    )
+)
+_SINGLE_MODE = compile_matcher(_single_mode())
+_MODE_WITH_RESOURCE_DEFS = compile_matcher(
+    _single_mode([m.Arg(keyword=m.Name(value="resource_defs"))])
+)
+_MODE_WITH_LOGGER_OR_EXECUTOR_DEFS = compile_matcher(
+    _single_mode([m.Arg(keyword=m.Name(value="logger_defs") | m.Name(value="executor_defs"))])
+)
 
 
-class ConvertPipelineToJob(VisitorBasedCodemodCommand):
+class ConvertPipelineToJob(TrackedCodemodCommand):
 
     # Add a description so that future codemodders can see what this does.
     DESCRIPTION: str = "Converts invocations of pipeline to job, renames the function if the function name contains job, and renames all mention of the former job's name."
 
+    # Byte strings one of which must appear in a module for this codemod to change it.
+    PREFILTER_KEYWORDS: Tuple[bytes, ...] = (b"pipeline", b"PipelineDefinition")
+
+    # Nodes whose children this codemod never changes, see codemods.pruning.
+    SKIPPED_SUBTREES: FrozenSet[Type[cst.CSTNode]] = TRIVIA | IMPORTS
+
     def __init__(
         self,
         context: CodemodContext,
@@ -21,23 +69,12 @@ class ConvertPipelineToJob(VisitorBasedCodemodCommand):
         self.context.scratch[RenameVariablesVisitor.CONTEXT_KEY] = set()
         self.required_imports: Set[str] = set()
 
+    def visit_Module(self, node: cst.Module) -> None:
+        collect(self.context, node)
+
     def visit_FunctionDef(self, node: cst.FunctionDef) -> None:
-        if (
-            m.matches(
-                node,
-                m.FunctionDef(
-                    decorators=(
-                        m.ZeroOrMore(),
-                        m.Decorator(
-                            decorator=m.Name(value="pipeline")
-                            | m.Call(func=m.Name(value="pipeline"))
-                        ),
-                        m.ZeroOrMore(),
-                    )
-                ),
-            )
-            and "pipeline" in node.name.value
-        ):
+        imports = dagster_imports(self.context)
+        if decorated_with(node, "pipeline", imports=imports) and "pipeline" in node.name.value:
             if not RenameVariablesVisitor.CONTEXT_KEY in self.context.scratch:
                 self.context.scratch[RenameVariablesVisitor.CONTEXT_KEY] = set()
             self.context.scratch[RenameVariablesVisitor.CONTEXT_KEY].add(node.name.value)
@@ -45,104 +82,86 @@ class ConvertPipelineToJob(VisitorBasedCodemodCommand):
     def leave_FunctionDef(
         self, original_node: cst.FunctionDef, updated_node: cst.FunctionDef
     ) -> cst.FunctionDef:
-        if m.matches(
-            updated_node,
-            m.FunctionDef(decorators=(m.Decorator(decorator=m.Name(value="pipeline")),)),
-        ):  # bare decorator case
-            pipeline_decorator = updated_node.decorators[0]
-            self.required_imports.add("job")
-            return updated_node.with_deep_changes(
-                cast(cst.Name, pipeline_decorator.decorator), value="job"
+        imports = dagster_imports(self.context)
+        if len(updated_node.decorators) != 1:
+            return updated_node
+        pipeline_decorator = updated_node.decorators[0]
+        if decorator_name(pipeline_decorator, imports) != "pipeline":
+            return updated_node
+        if call_name(pipeline_decorator.decorator, imports) is None:  # bare decorator case
+            return updated_node.with_changes(
+                decorators=[
+                    pipeline_decorator.with_changes(
+                        decorator=self._to_job(pipeline_decorator.decorator)
+                    )
+                ]
             )
-        elif m.matches(
-            updated_node,
-            m.FunctionDef(
-                decorators=(
-                    m.Decorator(
-                        decorator=m.Call(
-                            func=m.Name(value="pipeline"),
-                            args=(
-                                m.ZeroOrMore(),
-                                m.Arg(
-                                    keyword=m.Name(value="mode_defs"),
-                                    value=m.List(
-                                        elements=(
-                                            m.Element(
-                                                value=m.Call(
-                                                    func=m.Name(value="ModeDefinition"),
-                                                )
-                                            ),
-                                        )
-                                    ),
-                                ),
-                                m.ZeroOrMore(),
-                            ),
-                        )
-                    ),
-                ),
-            ),
+        elif _SINGLE_MODE_DECORATOR(
+            pipeline_decorator
         ):  # case where decorator is invoked a la @pipeline(..., mode_defs)
-            updated_decorator = self._replace_single_mode_job_decorator(updated_node.decorators[0])
+            updated_decorator = self._replace_single_mode_job_decorator(pipeline_decorator)
             if not updated_decorator:
                 if RenameVariablesVisitor.CONTEXT_KEY in self.context.scratch:
                     self.context.scratch[RenameVariablesVisitor.CONTEXT_KEY].remove(
                         updated_node.name.value
                     )
                 return updated_node
-            self.required_imports.add("job")
             return updated_node.with_changes(decorators=[updated_decorator])
 
         return updated_node
 
     def leave_Call(self, original_node: cst.Call, updated_node: cst.Call) -> cst.Call:
-        if m.matches(updated_node, m.Call(func=m.Name(value="PipelineDefinition"))):
+        if call_name(updated_node, dagster_imports(self.context)) == "PipelineDefinition":
             args = []
             to_job_args = []
             for arg in updated_node.args:
-                if m.matches(arg, m.Arg(keyword=m.Name(value="solid_defs"))):
+                keyword = keyword_name(arg)
+                if keyword == "solid_defs":
                     args.append(
                         arg.with_deep_changes(cast(cst.Name, arg.keyword), value="node_defs")
                     )
-                elif m.matches(arg, m.Arg(keyword=m.Name(value="mode_defs"))):
-                    if not m.matches(
-                        arg.value,
-                        m.List(
-                            elements=(m.Element(value=m.Call(func=m.Name(value="ModeDefinition"))),)
-                        ),
-                    ):
+                elif keyword == "mode_defs":
+                    mode_def_call = self._mode_definition(arg.value)
+                    if not _SINGLE_MODE(arg.value) or mode_def_call is None:
                         raise Exception("Could not handle PipelineDefinition")
-                    mode_def_call = cast(cst.Call, cast(cst.List, arg.value).elements[0].value)
+                    if isinstance(mode_def_call.func, cst.Name):
+                        mark_obsolete_name(self.context, mode_def_call.func.value, "ModeDefinition")
                     for mode_arg in mode_def_call.args:
-                        if m.matches(mode_arg, m.Arg(keyword=m.Name(value="executor_defs"))):
+                        mode_keyword = keyword_name(mode_arg)
+                        if mode_keyword == "executor_defs":
                             raise Exception("Could not handle PipelineDefinition")
-                        if (
-                            m.matches(mode_arg, m.Arg(keyword=m.Name(value="name")))
-                            or mode_arg.keyword is None
-                        ):
+                        if mode_keyword == "name" or mode_keyword is None:
                             continue
                         to_job_args.append(mode_arg)
                 else:
                     args.append(arg)
-            self.required_imports.add("GraphDefinition")
+            if isinstance(updated_node.func, cst.Name):
+                self.required_imports.add("GraphDefinition")
+                mark_obsolete_name(self.context, updated_node.func.value, "PipelineDefinition")
             return cst.Call(
                 func=cst.Attribute(
-                    value=updated_node.with_deep_changes(
-                        updated_node.func, value="GraphDefinition"
-                    ).with_changes(args=args),
+                    value=updated_node.with_changes(
+                        func=with_name(updated_node.func, "GraphDefinition"), args=args
+                    ),
                     attr=cst.Name(value="to_job"),
                 ),
                 args=to_job_args,
             )
         return updated_node
 
+    def renames(self) -> RenameTable:
+        """The functions renamed so far, and their new names, see codemods.rename_index."""
+        return RenameVariablesVisitor(self.context).table
+
     def leave_Module(self, original_node: cst.Module, updated_node: cst.Module) -> cst.Module:
-        module_pipeline_refs_removed = self._instantiate_and_run(RenameVariablesVisitor, updated_node)  # type: ignore
-        return AddImportsVisitor(
-            context=self.context,
-            imports=[
-                ImportItem("dagster", required_import) for required_import in self.required_imports
-            ],
-        ).transform_module(module_pipeline_refs_removed)
+        if self.context.scratch.get(RenameVariablesVisitor.CONTEXT_KEY):
+            updated_node = revisit_statements(
+                self.context, updated_node, RenameVariablesVisitor(self.context)
+            )
+        # Applied once the transform is done, see CodemodCommand.transform_module.
+        for required_import in sorted(self.required_imports):
+            AddImportsVisitor.add_needed_import(self.context, "dagster", required_import)
+        return updated_node
 
     def _replace_single_mode_job_decorator(
         self, pipeline_decorator: cst.Decorator
@@ -150,58 +169,28 @@ class ConvertPipelineToJob(VisitorBasedCodemodCommand):
         mode_def_arg_idx = -1
         pipeline_decorator_args = cast(cst.Call, pipeline_decorator.decorator).args
         for i, arg in enumerate(cast(cst.Call, pipeline_decorator.decorator).args):
-            if m.matches(arg, m.Arg(keyword=m.Name(value="mode_defs"))):
+            if keyword_name(arg) == "mode_defs":
                 mode_def_arg_idx = i
                 break
         mode_def_arg = pipeline_decorator_args[mode_def_arg_idx]
-        if not m.matches(
-            mode_def_arg.value,
-            m.List(
-                elements=(
-                    m.Element(
-                        value=m.Call(
-                            func=m.Name(value="ModeDefinition"),
-                            args=(
-                                m.ZeroOrMore(),
-                                m.Arg(
-                                    keyword=m.Name(value="resource_defs"),
-                                ),
-                                m.ZeroOrMore(),
-                            ),
-                        )
-                    ),
-                )
-            ),
-        ) or m.matches(
-            mode_def_arg.value,
-            m.List(
-                elements=(
-                    m.Element(
-                        value=m.Call(
-                            func=m.Name(value="ModeDefinition"),
-                            args=(
-                                m.ZeroOrMore(),
-                                m.Arg(
-                                    keyword=m.Name(value="logger_defs")
-                                    | m.Name(value="executor_defs"),
-                                ),
-                                m.ZeroOrMore(),
-                            ),
-                        )
-                    ),
-                )
-            ),
+        if not _MODE_WITH_RESOURCE_DEFS(mode_def_arg.value) or _MODE_WITH_LOGGER_OR_EXECUTOR_DEFS(
+            mode_def_arg.value
         ):
             return None
-        mode_def_call = cast(cst.Call, cast(cst.List, mode_def_arg.value).elements[0].value)
+        mode_def_call = self._mode_definition(mode_def_arg.value)
+        if mode_def_call is None:
+            return None
+        if isinstance(mode_def_call.func, cst.Name):
+            mark_obsolete_name(self.context, mode_def_call.func.value, "ModeDefinition")
         resource_defs_arg = -1
         for i, arg in enumerate(mode_def_call.args):
             if arg.keyword == "resource_defs":
                 resource_defs_arg = i
                 break
 
-        job_decorator = pipeline_decorator.with_deep_changes(
-            cast(cst.Call, pipeline_decorator.decorator).func, value="job"
+        pipeline_call = cast(cst.Call, pipeline_decorator.decorator)
+        job_decorator = pipeline_decorator.with_changes(
+            decorator=pipeline_call.with_changes(func=self._to_job(pipeline_call.func))
         )
         return job_decorator.with_deep_changes(
             cast(cst.Call, job_decorator.decorator).args[mode_def_arg_idx],
@@ -209,29 +198,30 @@ class ConvertPipelineToJob(VisitorBasedCodemodCommand):
             value=mode_def_call.args[resource_defs_arg].value,
         )
 
+    def _to_job(self, expression: cst.BaseExpression) -> cst.BaseExpression:
+        """``expression``, referring to ``pipeline``, referring to ``job`` instead."""
+        if isinstance(expression, cst.Name):
+            self.required_imports.add("job")
+            mark_obsolete_name(self.context, expression.value, "pipeline")
+        return with_name(expression, "job")
 
-class RenameVariablesVisitor(ContextAwareTransformer):
+    def _mode_definition(self, modes: cst.BaseExpression) -> Optional[cst.Call]:
+        """The ``ModeDefinition(...)`` of ``modes``, as matched by _single_mode, if it is one."""
+        if not isinstance(modes, cst.List) or not modes.elements:
+            return None
+        mode_def_call = modes.elements[0].value
+        if call_name(mode_def_call, dagster_imports(self.context)) != "ModeDefinition":
+            return None
+        return cast(cst.Call, mode_def_call)
 
-    CONTEXT_KEY = "VariableRenames"
 
-    def __init__(self, context: CodemodContext) -> None:
-        super().__init__(context)
-        self.renames = context.scratch.get(RenameVariablesVisitor.CONTEXT_KEY, set())
+class RenameVariablesVisitor(RenameTransformer):
 
-    def leave_Name(self, original_node: cst.Name, updated_node: cst.Name) -> cst.Name:
-        if original_node.value in self.renames:
-            return original_node.with_changes(value=self._replace(original_node.value))
-        return updated_node
+    CONTEXT_KEY = "VariableRenames"
 
-    def leave_SimpleString(
-        self, original_node: cst.SimpleString, updated_node: cst.SimpleString
-    ) -> cst.SimpleString:
-        new_val = original_node.value
-        for orig_name in self.renames:
-            new_name = self._replace(orig_name)
-            if orig_name in new_val:
-                new_val = new_val.replace(orig_name, new_name)
-        return original_node.with_changes(value=new_val)
+    def __init__(self, context: CodemodContext) -> None:
+        renames = context.scratch.get(RenameVariablesVisitor.CONTEXT_KEY, set())
+        super().__init__(context, RenameTable({name: self._replace(name) for name in renames}))
 
     def _replace(self, orig_str: str) -> str:
         return orig_str.replace("pipeline", "job")
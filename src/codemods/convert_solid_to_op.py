@@ -1,18 +1,44 @@
-from typing import Union, Sequence, Set, Optional, Tuple, cast
+from typing import Dict, FrozenSet, Union, Sequence, Set, Optional, Tuple, Type, cast
 
 import libcst as cst
-from libcst.codemod import CodemodContext, VisitorBasedCodemodCommand
+from libcst.codemod import CodemodContext
 from libcst.codemod.visitors import AddImportsVisitor
 from libcst.codemod._visitor import ContextAwareTransformer
 import libcst.matchers as m
-from libcst.codemod.visitors._imports import ImportItem
 
+from codemods.cleanup import mark_obsolete_import, mark_obsolete_name
+from codemods.dagster_imports import collect, dagster_imports, with_name
+from codemods.matching import call_name, compile_matcher, decorated_with, decorator_name
+from codemods.pruning import TRIVIA
+from codemods.rename import RenameTable, RenameTransformer
+from codemods.tracking import TrackedCodemodCommand, revisit_statements
 
-class ConvertSolidToOp(VisitorBasedCodemodCommand):
+_SOLID_DECORATORS: Tuple[str, ...] = ("solid", "lambda_solid")
+
+# Compiled once, see codemods.matching.
+_INPUT_DEFS_ARG = compile_matcher(m.Arg(keyword=m.Name(value="input_defs"), value=m.List()))
+_OUTPUT_DEFS_ARG = compile_matcher(m.Arg(keyword=m.Name(value="output_defs"), value=m.List()))
+_OUTPUT_DEF_ARG = compile_matcher(m.Arg(keyword=m.Name(value="output_def"), value=m.Call()))
+_CONTEXT = compile_matcher(m.Name(value="context"))
+
+# The output definition class each class of out replaces.
+_OUTPUT_DEFINITION_CLASSES: Dict[str, str] = {
+    "Out": "OutputDefinition",
+    "DynamicOut": "DynamicOutputDefinition",
+}
+
+
+class ConvertSolidToOp(TrackedCodemodCommand):
 
     # Add a description so that future codemodders can see what this does.
     DESCRIPTION: str = "Converts invocations of solid to op, renames the function if the function name contains solid, and renames all mention of the former solid's name."
 
+    # Byte strings one of which must appear in a module for this codemod to change it.
+    PREFILTER_KEYWORDS: Tuple[bytes, ...] = (b"solid", b"pipeline_run", b"pipeline_name")
+
+    # Nodes whose children this codemod never changes, see codemods.pruning.
+    SKIPPED_SUBTREES: FrozenSet[Type[cst.CSTNode]] = TRIVIA
+
     def __init__(
         self,
         context: CodemodContext,
@@ -21,25 +47,12 @@ class ConvertSolidToOp(VisitorBasedCodemodCommand):
         self.context.scratch[RenameVariablesVisitor.CONTEXT_KEY] = set()
         self.required_imports: Set[str] = set()
 
+    def visit_Module(self, node: cst.Module) -> None:
+        collect(self.context, node)
+
     def visit_FunctionDef(self, node: cst.FunctionDef) -> None:
-        if (
-            m.matches(
-                node,
-                m.FunctionDef(
-                    decorators=(
-                        m.ZeroOrMore(),
-                        m.Decorator(
-                            decorator=m.Name(value="solid")
-                            | m.Call(func=m.Name(value="solid"))
-                            | m.Name(value="lambda_solid")
-                            | m.Call(func=m.Name(value="lambda_solid")),
-                        ),
-                        m.ZeroOrMore(),
-                    )
-                ),
-            )
-            and "solid" in node.name.value
-        ):
+        imports = dagster_imports(self.context)
+        if decorated_with(node, *_SOLID_DECORATORS, imports=imports) and "solid" in node.name.value:
             if not RenameVariablesVisitor.CONTEXT_KEY in self.context.scratch:
                 self.context.scratch[RenameVariablesVisitor.CONTEXT_KEY] = set()
             self.context.scratch[RenameVariablesVisitor.CONTEXT_KEY].add(node.name.value)
@@ -47,61 +60,72 @@ class ConvertSolidToOp(VisitorBasedCodemodCommand):
     def leave_Decorator(
         self, original_node: cst.Decorator, updated_node: cst.Decorator
     ) -> cst.Decorator:
-        if m.matches(
-            original_node,
-            m.Decorator(decorator=m.Name(value="solid") | m.Name(value="lambda_solid")),
-        ):  # bare decorator case
-            self.required_imports.add("op")
-            return original_node.with_changes(
-                decorator=original_node.decorator.with_changes(value="op")
+        imports = dagster_imports(self.context)
+        name = decorator_name(original_node, imports)
+        if name not in _SOLID_DECORATORS:
+            return updated_node
+        if call_name(original_node.decorator, imports) is None:  # bare decorator case
+            return updated_node.with_changes(decorator=self._to_op(updated_node.decorator, name))
+        # case where decorator is invoked a la @solid(...)
+        solid_decorator_call = cast(cst.Call, updated_node.decorator)
+        solid_args = cast(cst.Call, solid_decorator_call).args
+        op_args = [self._convert_solid_arg_to_op_arg(arg) for arg in solid_args]
+        return updated_node.with_changes(
+            decorator=solid_decorator_call.with_changes(
+                args=op_args, func=self._to_op(solid_decorator_call.func, name)
             )
-        if m.matches(
-            original_node,
-            m.Decorator(
-                decorator=m.Call(func=m.Name(value="solid") | m.Name(value="lambda_solid"))
-            ),
-        ):  # case where decorator is invoked a la @solid(...)
-            solid_decorator_call = cast(cst.Call, original_node.decorator)
-            solid_args = cast(cst.Call, solid_decorator_call).args
-            op_args = [self._convert_solid_arg_to_op_arg(arg) for arg in solid_args]
-            self.required_imports.add("op")
-            return original_node.with_changes(
-                decorator=solid_decorator_call.with_changes(
-                    args=op_args, func=solid_decorator_call.func.with_changes(value="op")
-                )
+        )
+
+    def leave_Attribute(
+        self, original_node: cst.Attribute, updated_node: cst.Attribute
+    ) -> cst.Attribute:
+        return _rename_context_attribute(updated_node)
+
+    def renames(self) -> RenameTable:
+        """The functions renamed so far, and their new names, see codemods.rename_index."""
+        return RenameVariablesVisitor(self.context).table
+
+    def leave_Module(self, original_node: cst.Module, updated_node: cst.Module) -> cst.Module:
+        # Names of solids are only known once the whole module has been visited,
+        # so renaming their references takes another pass, over the statements
+        # that changed or mention them.
+        if self.context.scratch.get(RenameVariablesVisitor.CONTEXT_KEY):
+            updated_node = revisit_statements(
+                self.context, updated_node, RenameVariablesVisitor(self.context)
             )
+        # Applied once the transform is done, see CodemodCommand.transform_module.
+        for required_import in sorted(self.required_imports):
+            AddImportsVisitor.add_needed_import(self.context, "dagster", required_import)
         return updated_node
 
-    def leave_Module(self, original_node: cst.Module, updated_node: cst.Module) -> cst.Module:
-        # Shenanigans here
-        module_op_body_refs_removed = self._instantiate_and_run(
-            RenameVariablesWithinSolidFunctionTransformer, updated_node
-        )  # type: ignore
-        module_solid_refs_removed = self._instantiate_and_run(RenameVariablesVisitor, module_op_body_refs_removed)  # type: ignore
-        return AddImportsVisitor(
-            context=self.context,
-            imports=[
-                ImportItem("dagster", required_import) for required_import in self.required_imports
-            ],
-        ).transform_module(module_solid_refs_removed)
+    def _to_op(self, expression: cst.BaseExpression, name: str) -> cst.BaseExpression:
+        """``expression``, referring to the ``name`` decorator, referring to ``op`` instead."""
+        if isinstance(expression, cst.Name):
+            self.required_imports.add("op")
+            mark_obsolete_name(self.context, expression.value, name)
+        return with_name(expression, "op")
 
     def _convert_solid_arg_to_op_arg(self, arg: cst.Arg) -> cst.Arg:
-        if m.matches(arg, m.Arg(keyword=m.Name(value="input_defs"), value=m.List())):
+        if _INPUT_DEFS_ARG(arg):
             arg_name = cast(cst.Name, arg.keyword)
             input_defs_list = cast(cst.List, arg.value)
             if len(input_defs_list.elements) > 0:
                 self.required_imports.add("In")
+                mark_obsolete_import(self.context, "InputDefinition")
             ins = _convert_input_defs_to_ins(input_defs_list)
             return arg.with_changes(value=ins, keyword=arg_name.with_changes(value="ins"))
-        if m.matches(arg, m.Arg(keyword=m.Name(value="output_defs"), value=m.List())):
+        if _OUTPUT_DEFS_ARG(arg):
             arg_name = cast(cst.Name, arg.keyword)
             output_defs_list = cast(cst.List, arg.value)
             for imprt in _get_required_output_def_imports(output_defs_list):
                 self.required_imports.add(imprt)
+                mark_obsolete_import(self.context, _OUTPUT_DEFINITION_CLASSES[imprt])
             outs = _convert_output_defs_to_outs(output_defs_list)
             return arg.with_changes(value=outs, keyword=arg_name.with_changes(value="out"))
-        if m.matches(arg, m.Arg(keyword=m.Name(value="output_def"), value=m.Call())):
-            self.required_imports.add(_get_import_for_def(cast(cst.Call, arg.value)))
+        if _OUTPUT_DEF_ARG(arg):
+            imprt = _get_import_for_def(cast(cst.Call, arg.value))
+            self.required_imports.add(imprt)
+            mark_obsolete_import(self.context, _OUTPUT_DEFINITION_CLASSES[imprt])
             arg_name = cast(cst.Name, arg.keyword)
             output_def = cast(cst.Call, arg.value)
             new_value = _convert_output_def_to_out(output_def)
@@ -223,47 +247,37 @@ def _extract_name_from_output_def_args(
     return None, output_def_args
 
 
+# Renamed within the attributes of context, as in context.solid_config.
+CONTEXT_ATTRIBUTE_RENAMES = RenameTable(
+    {"solid": "op", "pipeline_run": "run", "pipeline_name": "job_name"}, boundaries=False
+)
+
+
+def _rename_context_attribute(node: cst.Attribute) -> cst.Attribute:
+    if not _CONTEXT(node.value):
+        return node
+    new_attr = CONTEXT_ATTRIBUTE_RENAMES.sub(node.attr.value)
+    if new_attr != node.attr.value:
+        return node.with_changes(attr=node.attr.with_changes(value=new_attr))
+    return node
+
+
 class RenameVariablesWithinSolidFunctionTransformer(ContextAwareTransformer):
     """Renames all variables within solid function."""
 
     def leave_Attribute(
         self, original_node: cst.Attribute, updated_node: cst.Attribute
     ) -> cst.Attribute:
-        node = updated_node
-        for orig, replacement in [
-            ("solid", "op"),
-            ("pipeline_run", "run"),
-            ("pipeline_name", "job_name"),
-        ]:
-            if m.matches(node.value, m.Name(value="context")) and orig in node.attr.value:
-                node = node.with_changes(
-                    attr=node.attr.with_changes(value=node.attr.value.replace(orig, replacement))
-                )
-        return node
+        return _rename_context_attribute(updated_node)
 
 
-class RenameVariablesVisitor(ContextAwareTransformer):
+class RenameVariablesVisitor(RenameTransformer):
 
     CONTEXT_KEY = "VariableRenames"
 
     def __init__(self, context: CodemodContext) -> None:
-        super().__init__(context)
-        self.renames = context.scratch.get(RenameVariablesVisitor.CONTEXT_KEY, set())
-
-    def leave_Name(self, original_node: cst.Name, updated_node: cst.Name) -> cst.Name:
-        if original_node.value in self.renames:
-            return original_node.with_changes(value=self._replace(original_node.value))
-        return updated_node
-
-    def leave_SimpleString(
-        self, original_node: cst.SimpleString, updated_node: cst.SimpleString
-    ) -> cst.SimpleString:
-        new_val = original_node.value
-        for orig_name in self.renames:
-            new_name = self._replace(orig_name)
-            if orig_name in new_val:
-                new_val = new_val.replace(orig_name, new_name)
-        return original_node.with_changes(value=new_val)
+        renames = context.scratch.get(RenameVariablesVisitor.CONTEXT_KEY, set())
+        super().__init__(context, RenameTable({name: self._replace(name) for name in renames}))
 
     def _replace(self, orig_str: str) -> str:
         return orig_str.replace("lambda_solid", "op").replace("solid", "op").replace("lambda", "op")
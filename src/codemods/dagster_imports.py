@@ -0,0 +1,107 @@
+"""
+The names a module binds to the dagster APIs the codemods convert.
+
+The codemods match decorators and calls by name, such as ``@solid`` or
+``execute_pipeline(...)``, which misses ``from dagster import solid as s`` with
+``@s``, and ``import dagster as dg`` with ``@dg.solid``. ``QualifiedNameProvider``
+resolves both, at the cost of a scope analysis of every module. Instead, a
+:class:`DagsterImports` table of the names the top-level imports of a module
+bind to dagster APIs and modules is collected once, when the traversal enters
+the module, see :func:`collect`, and :meth:`DagsterImports.resolve` maps the
+expression a decorator or call names to the API with a dictionary lookup.
+
+Names no import binds resolve to themselves, as the codemods matched them
+before: they still convert APIs imported with a star, or not imported at all.
+"""
+
+from typing import Dict, Optional, Set
+
+import libcst as cst
+from libcst.codemod import CodemodContext
+from libcst.helpers import get_full_name_for_node
+
+CONTEXT_KEY = "DagsterImports"
+
+
+class DagsterImports:
+    """The names the top-level imports of a module bind to dagster APIs and modules."""
+
+    def __init__(self, module: Optional[cst.Module] = None) -> None:
+        # The module whose imports these are.
+        self.module = module
+        # The dagster APIs imported from a dagster module, by the name bound to them.
+        self.symbols: Dict[str, str] = {}
+        # Names bound to dagster modules, such as ``dg`` in ``import dagster as dg``.
+        self.modules: Set[str] = set()
+
+    @classmethod
+    def from_module(cls, module: cst.Module) -> "DagsterImports":
+        imports = cls(module)
+        for statement in module.body:
+            if not isinstance(statement, cst.SimpleStatementLine):
+                continue
+            for small_statement in statement.body:
+                if isinstance(small_statement, cst.ImportFrom):
+                    imports._add_import_from(small_statement)
+                elif isinstance(small_statement, cst.Import):
+                    imports._add_import(small_statement)
+        return imports
+
+    def resolve(self, expression: cst.BaseExpression) -> Optional[str]:
+        """The name of the API ``expression`` refers to.
+
+        That is the imported name for a name an import bound, the attribute for
+        an attribute of a dagster module, and the name itself for other names.
+        """
+        if isinstance(expression, cst.Name):
+            return self.symbols.get(expression.value, expression.value)
+        if isinstance(expression, cst.Attribute) and self.modules:
+            value = expression.value
+            while isinstance(value, cst.Attribute):
+                value = value.value
+            if isinstance(value, cst.Name) and value.value in self.modules:
+                return expression.attr.value
+        return None
+
+    def _add_import_from(self, node: cst.ImportFrom) -> None:
+        if node.relative or node.module is None or isinstance(node.names, cst.ImportStar):
+            return
+        if not _is_dagster_module(get_full_name_for_node(node.module)):
+            return
+        for alias in node.names:
+            if isinstance(alias.name, cst.Name):
+                self.symbols[alias.evaluated_alias or alias.name.value] = alias.name.value
+
+    def _add_import(self, node: cst.Import) -> None:
+        for alias in node.names:
+            if not _is_dagster_module(get_full_name_for_node(alias.name)):
+                continue
+            # ``import dagster.core`` binds ``dagster``.
+            self.modules.add(alias.evaluated_alias or alias.evaluated_name.split(".")[0])
+
+
+def _is_dagster_module(name: Optional[str]) -> bool:
+    return name is not None and (name == "dagster" or name.startswith("dagster."))
+
+
+def collect(context: CodemodContext, module: cst.Module) -> DagsterImports:
+    """Collect the imports of ``module``, unless ``context`` already has them."""
+    imports = context.scratch.get(CONTEXT_KEY)
+    if imports is None or imports.module is not module:
+        imports = context.scratch[CONTEXT_KEY] = DagsterImports.from_module(module)
+    return imports
+
+
+def dagster_imports(context: CodemodContext) -> DagsterImports:
+    """The imports collected for the module being transformed, none before a traversal."""
+    return context.scratch.get(CONTEXT_KEY) or _NO_IMPORTS
+
+
+_NO_IMPORTS = DagsterImports()
+
+
+def with_name(expression: cst.BaseExpression, name: str) -> cst.BaseExpression:
+    """``expression``, a name or attribute :meth:`DagsterImports.resolve` resolved, renamed."""
+    if isinstance(expression, cst.Attribute):
+        return expression.with_changes(attr=expression.attr.with_changes(value=name))
+    return expression.with_changes(value=name)
@@ -4,9 +4,12 @@ import libcst as cst
 from libcst.codemod import CodemodContext, VisitorBasedCodemodCommand
 from libcst.codemod.visitors import AddImportsVisitor
 from libcst.codemod._visitor import ContextAwareTransformer
-import libcst.matchers as m
 from libcst.codemod.visitors._imports import ImportItem
 
+from codemods.cleanup import mark_obsolete_name
+from codemods.dagster_imports import collect, dagster_imports
+from codemods.matching import call_name
+
 
 class ConvertExecutePipeline(VisitorBasedCodemodCommand):
 
@@ -15,11 +18,19 @@ class ConvertExecutePipeline(VisitorBasedCodemodCommand):
         "Converts invocations of execute_pipeline to invocations of execute_in_process`."
     )
 
+    # Byte strings one of which must appear in a module for this codemod to change it.
+    PREFILTER_KEYWORDS: Tuple[bytes, ...] = (b"execute_pipeline",)
+
+    def visit_Module(self, node: cst.Module) -> None:
+        collect(self.context, node)
+
     def leave_Call(self, original_node: cst.Call, updated_node: cst.Call) -> cst.Call:
-        if m.matches(updated_node, m.Call(func=m.Name(value="execute_pipeline"))):
+        if call_name(updated_node, dagster_imports(self.context)) == "execute_pipeline":
             execute_pipeline_call = updated_node
             execute_pipeline_other_args = execute_pipeline_call.args[1:]
             pipeline_name = cast(cst.Name, execute_pipeline_call.args[0].value)
+            if isinstance(updated_node.func, cst.Name):
+                mark_obsolete_name(self.context, updated_node.func.value, "execute_pipeline")
             return execute_pipeline_call.with_changes(
                 func=cst.Attribute(
                     value=pipeline_name, attr=cst.Name(value="execute_in_process"), dot=cst.Dot()
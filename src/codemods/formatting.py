@@ -0,0 +1,86 @@
+"""
+Formatting of migrated code.
+
+``black`` is run in-process when it is installed (``pip install codemods[format]``)
+and the formatter is the default ``black -`` command: its mode is read once from
+the nearest ``pyproject.toml`` and reused for every file, instead of starting a
+``black`` process per file. Any other formatter command is run as a subprocess,
+like ``libcst.tool`` does.
+"""
+
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Optional, Sequence
+
+from libcst.codemod._cli import invoke_formatter
+
+try:
+    import black
+except ImportError:  # pragma: no cover
+    black = None
+
+BLACK_FORMATTER: Sequence[str] = ("black", "-")
+
+
+def is_black(formatter: Sequence[str]) -> bool:
+    """Whether ``formatter`` can be run in-process."""
+    return black is not None and tuple(formatter) == tuple(BLACK_FORMATTER)
+
+
+@lru_cache(maxsize=None)
+def black_mode(start_dir: Optional[str] = None) -> "black.Mode":
+    """The black mode configured in the nearest ``pyproject.toml``
+
+    The directories from ``start_dir`` (the current directory by default) up to
+    the project root are searched, just like ``black`` does.
+    """
+    config_file = black.find_pyproject_toml((os.path.abspath(start_dir or os.getcwd()),))
+    config = black.parse_pyproject_toml(config_file) if config_file else {}
+    target_versions = {
+        black.TargetVersion[version.upper()] for version in config.get("target_version", ())
+    }
+    return black.Mode(
+        target_versions=target_versions,
+        line_length=config.get("line_length", black.DEFAULT_LINE_LENGTH),
+        string_normalization=not config.get("skip_string_normalization", False),
+        magic_trailing_comma=not config.get("skip_magic_trailing_comma", False),
+        preview=config.get("preview", False),
+    )
+
+
+def formatter_key(formatter: Sequence[str]) -> str:
+    """Identifies the output of ``formatter``, for :func:`codemods.cache.transform_key`."""
+    if is_black(formatter):
+        return f"black=={black.__version__} {black_mode().get_cache_key()}"
+    return " ".join(formatter)
+
+
+def format_code(formatter: Sequence[str], code: bytes) -> bytes:
+    """Format ``code`` with the ``formatter`` command, in-process if it is black."""
+    if not is_black(formatter):
+        return invoke_formatter(formatter, code)
+    source = code.decode("utf-8")
+    try:
+        formatted = black.format_file_contents(source, fast=False, mode=black_mode())
+    except black.NothingChanged:
+        return code
+    return formatted.encode("utf-8")
+
+
+def update_black_cache(formatter: Sequence[str], paths: Iterable[str]) -> None:
+    """Record ``paths`` as formatted in black's own cache, in a single write
+
+    A later ``black`` run with the same mode, from a pre-commit hook for
+    instance, then skips these files.
+    """
+    if not is_black(formatter):
+        return
+    try:
+        from black.cache import Cache
+    except ImportError:  # pragma: no cover
+        # Black versions before 23.10 don't expose the cache as a class.
+        return
+    sources = {Path(path).resolve() for path in paths}
+    if sources:
+        Cache.read(black_mode()).write(sources)
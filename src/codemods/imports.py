@@ -0,0 +1,351 @@
+"""
+A single edit of the import block for all the codemods run over a module.
+
+Run on their own, codemods schedule the imports they need with
+``AddImportsVisitor.add_needed_import``, and ``CodemodCommand.transform_module``
+applies them with one traversal of the whole module per codemod, to which the
+removal of obsolete imports adds another, with scope analysis, see
+:mod:`codemods.cleanup`. An :class:`ImportLedger` collects the ``from`` imports
+every codemod scheduled or marked obsolete, such as ``from dagster import op``,
+and applies them all at once, editing only top-level statements: new
+names are added to the first ``from`` import of their module, or to a new one
+after the last import, in the same order as ``AddImportsVisitor`` run once per
+codemod would add them. Obsolete names are removed from the ``from`` imports
+of their module when :func:`referenced_names` doesn't find them in the rest of
+the module. When a string literal mentions one of them, as ``__all__`` and
+string annotations may, they are left to the scope analysis of
+:func:`~codemods.cleanup.remove_obsolete_imports` instead, see
+:func:`mentioned_in_strings`.
+
+The imports ``AddImportsVisitor`` supports that the ledger doesn't, such as
+aliased imports, are left to ``AddImportsVisitor``, see :meth:`ImportLedger.record`.
+"""
+
+import operator
+import re
+from collections import defaultdict
+from typing import AbstractSet, Dict, List, Optional, Set, Tuple
+
+import libcst as cst
+from libcst.codemod import CodemodContext
+from libcst.codemod.visitors import AddImportsVisitor, RemoveImportsVisitor
+from libcst.helpers import get_full_name_for_node
+
+from codemods.cleanup import obsolete_aliases, obsolete_imports
+from codemods.tracking import StatementTracker
+
+
+class ImportLedger:
+    """The imports to add to and remove from a module, from every codemod."""
+
+    def __init__(self) -> None:
+        # Names to import per module, one mapping per codemod that scheduled
+        # some, in the order the codemods ran.
+        self.additions: List[Dict[str, Set[str]]] = []
+        # The (module, symbol, alias) of the imports to remove, alias being
+        # None for unaliased imports.
+        self.removals: Set[Tuple[str, str, Optional[str]]] = set()
+        self.modules: Set[str] = set()
+
+    def record(self, context: CodemodContext) -> bool:
+        """Take over the imports scheduled and marked obsolete in ``context``.
+
+        Records nothing and returns False when some of them aren't unaliased
+        ``from`` imports of an absolute module.
+        """
+        additions: Dict[str, Set[str]] = defaultdict(set)
+        for item in context.scratch.get(AddImportsVisitor.CONTEXT_KEY, ()):
+            if not _is_supported(item.module_name, item.obj_name, item.alias) or item.relative:
+                return False
+            additions[item.module_name].add(item.obj_name)
+        removals: Set[Tuple[str, str, Optional[str]]] = {
+            (module, symbol, None) for module, symbol in obsolete_imports(context)
+        }
+        removals.update(obsolete_aliases(context))
+        for module, obj, alias in context.scratch.get(RemoveImportsVisitor.CONTEXT_KEY, ()):
+            if not _is_supported(module, obj, alias):
+                return False
+            removals.add((module, obj, None))
+        if additions:
+            self.additions.append(additions)
+        self.removals.update(removals)
+        self.modules.update(additions)
+        self.modules.update(module for module, _, _ in removals)
+        return True
+
+    @property
+    def removed_symbols(self) -> Set[str]:
+        """The names the imports to remove bind."""
+        return {alias or symbol for _, symbol, alias in self.removals}
+
+    def apply(self, module: cst.Module, referenced: AbstractSet[str]) -> cst.Module:
+        """``module`` with the recorded imports added, and removed unless ``referenced``."""
+        body = list(module.body)
+        # The names of the ``from`` imports of the modules recorded, by line
+        # and position in it.
+        names: Dict[Tuple[int, int], List[cst.ImportAlias]] = {}
+        owners: Dict[Tuple[int, int], str] = {}
+        first: Dict[str, Tuple[int, int]] = {}
+        imported: Dict[str, Set[str]] = defaultdict(set)
+        starred: Set[str] = set()
+        last_import: Optional[int] = None
+        for i, statement in enumerate(body):
+            if not isinstance(statement, cst.SimpleStatementLine):
+                continue
+            for j, small_statement in enumerate(statement.body):
+                if isinstance(small_statement, (cst.Import, cst.ImportFrom)):
+                    last_import = i
+                module_name = _module(small_statement, self.modules)
+                if module_name is None:
+                    continue
+                aliases = small_statement.names  # type: ignore
+                if isinstance(aliases, cst.ImportStar):
+                    starred.add(module_name)
+                    continue
+                first.setdefault(module_name, (i, j))
+                names[(i, j)] = list(aliases)
+                owners[(i, j)] = module_name
+                imported[module_name].update(
+                    alias.evaluated_name for alias in aliases if alias.asname is None
+                )
+
+        # New imports, by module, in the order they are added.
+        created: Dict[str, List[str]] = {}
+        for additions in self.additions:
+            for module_name in sorted(additions):
+                missing = sorted(additions[module_name] - imported[module_name])
+                if module_name in starred or not missing:
+                    continue
+                imported[module_name].update(missing)
+                if module_name in first:
+                    position = first[module_name]
+                    names[position] = [
+                        *(cst.ImportAlias(name=cst.Name(name)) for name in missing),
+                        *names[position],
+                    ]
+                else:
+                    created[module_name] = [*missing, *created.get(module_name, ())]
+
+        unused: Dict[str, Set[Tuple[str, Optional[str]]]] = defaultdict(set)
+        for module_name, symbol, alias in self.removals:
+            if (alias or symbol) not in referenced:
+                unused[module_name].add((symbol, alias))
+        lines: Dict[int, List[cst.BaseSmallStatement]] = {}
+        for (i, j), aliases in names.items():
+            import_from: cst.ImportFrom = body[i].body[j]  # type: ignore
+            import_from = _without_names(import_from, aliases, unused[owners[(i, j)]])
+            if import_from is not body[i].body[j]:  # type: ignore
+                small_statements = lines.setdefault(i, list(body[i].body))  # type: ignore
+                small_statements[j] = import_from
+        if not lines and not created:
+            # Keep the module any metadata was computed for, see codemods.metadata.
+            return module
+        for i, small_statements in lines.items():
+            kept = [statement for statement in small_statements if statement is not _REMOVED]
+            body[i] = body[i].with_changes(body=kept) if kept else _REMOVED  # type: ignore
+
+        if created:
+            location = _import_location(module, last_import)
+            if location < len(body):
+                body[location] = _with_empty_line(body[location])
+            body[location:location] = [
+                cst.parse_statement(
+                    f"from {module_name} import {', '.join(created[module_name])}",
+                    config=module.config_for_parsing,
+                )
+                for module_name in created
+            ]
+        return module.with_changes(
+            body=[statement for statement in body if statement is not _REMOVED]
+        )
+
+
+# Placeholder for the statements the ledger removes.
+_REMOVED = cst.Pass()
+
+
+def _is_supported(module: str, obj: Optional[str], alias: Optional[str]) -> bool:
+    # AddImportsVisitor places __future__ imports first.
+    return module != "__future__" and obj is not None and alias is None
+
+
+def _module(statement: cst.BaseSmallStatement, modules: AbstractSet[str]) -> Optional[str]:
+    if not isinstance(statement, cst.ImportFrom) or statement.relative or statement.module is None:
+        return None
+    module_name = get_full_name_for_node(statement.module)
+    return module_name if module_name in modules else None
+
+
+def _without_names(
+    import_from: cst.ImportFrom,
+    aliases: List[cst.ImportAlias],
+    unused: AbstractSet[Tuple[str, Optional[str]]],
+) -> cst.BaseSmallStatement:
+    """``import_from`` importing ``aliases`` except the ``unused`` (name, alias) ones.
+
+    Keeps comments and commas as ``RemoveImportsVisitor`` does.
+    """
+    updates = {}
+    kept: List[cst.ImportAlias] = []
+    for alias in aliases:
+        if (alias.evaluated_name, alias.evaluated_alias) not in unused:
+            kept.append(alias)
+            continue
+        comma = alias.comma
+        if not isinstance(comma, cst.Comma):
+            continue
+        if kept:
+            previous = kept[-1]
+            if isinstance(previous.comma, cst.Comma):
+                kept[-1] = previous.with_deep_changes(
+                    previous.comma,
+                    whitespace_after=_merge_whitespace_after(
+                        previous.comma.whitespace_after, comma.whitespace_after
+                    ),
+                )
+            else:
+                kept[-1] = previous.with_changes(comma=comma)
+        elif isinstance(import_from.lpar, cst.LeftParen):
+            updates["lpar"] = import_from.lpar.with_changes(
+                whitespace_after=_merge_whitespace_after(
+                    import_from.lpar.whitespace_after, comma.whitespace_after
+                )
+            )
+    if not kept:
+        return _REMOVED
+    if len(kept) == len(import_from.names) and all(map(operator.is_, kept, import_from.names)):
+        return import_from
+    if kept[-1] is not aliases[-1]:
+        kept[-1] = kept[-1].with_changes(comma=cst.MaybeSentinel.DEFAULT)
+    return import_from.with_changes(names=kept, **updates)
+
+
+def _merge_whitespace_after(
+    left: cst.BaseParenthesizableWhitespace, right: cst.BaseParenthesizableWhitespace
+) -> cst.BaseParenthesizableWhitespace:
+    if not isinstance(right, cst.ParenthesizedWhitespace):
+        return left
+    if not isinstance(left, cst.ParenthesizedWhitespace):
+        return right
+    return left.with_changes(
+        empty_lines=tuple(line for line in right.empty_lines if line.comment is not None)
+    )
+
+
+def _import_location(module: cst.Module, last_import: Optional[int]) -> int:
+    """Where ``AddImportsVisitor`` would add new imports to ``module``."""
+    location = 0
+    if module.body and _is_header(module.body[0]):
+        location = 1
+    if last_import is not None:
+        location = max(location, last_import + 1)
+    return location
+
+
+def _is_header(statement: cst.BaseStatement) -> bool:
+    """Whether ``statement`` is a docstring or sets ``__strict__``."""
+    if not isinstance(statement, cst.SimpleStatementLine) or len(statement.body) != 1:
+        return False
+    small_statement = statement.body[0]
+    if isinstance(small_statement, cst.Expr):
+        return isinstance(small_statement.value, cst.SimpleString)
+    return (
+        isinstance(small_statement, cst.Assign)
+        and len(small_statement.targets) == 1
+        and isinstance(small_statement.targets[0].target, cst.Name)
+        and small_statement.targets[0].target.value == "__strict__"
+    )
+
+
+def _with_empty_line(statement: cst.BaseStatement) -> cst.BaseStatement:
+    leading_lines = statement.leading_lines
+    if leading_lines and leading_lines[0].comment is None:
+        return statement
+    return statement.with_changes(leading_lines=(cst.EmptyLine(), *leading_lines))
+
+
+class _NameFinder(cst.CSTVisitor):
+    def __init__(self, names: AbstractSet[str]) -> None:
+        super().__init__()
+        self.names = names
+        self.found: Set[str] = set()
+
+    def visit_Name(self, node: cst.Name) -> None:
+        if node.value in self.names:
+            self.found.add(node.value)
+
+
+class _StringFinder(cst.CSTVisitor):
+    def __init__(self) -> None:
+        super().__init__()
+        self.strings: List[str] = []
+
+    def visit_SimpleString(self, node: cst.SimpleString) -> None:
+        self.strings.append(node.value)
+
+
+def _statements(
+    module: cst.Module, tracker: Optional[StatementTracker]
+) -> Tuple[Set[int], AbstractSet[int], Optional[StatementTracker]]:
+    """The top-level imports of ``module``, the statements to search, and the tracker, if usable.
+
+    The tracker knows what the statements that aren't searched contain.
+    """
+    imports = {
+        i
+        for i, statement in enumerate(module.body)
+        if isinstance(statement, cst.SimpleStatementLine)
+        and all(isinstance(small, (cst.Import, cst.ImportFrom)) for small in statement.body)
+    }
+    if tracker is not None and not tracker.reshaped and len(tracker._top_level) == len(module.body):
+        return imports, tracker.changed | tracker.unscanned, tracker
+    return imports, set(range(len(module.body))), None
+
+
+def referenced_names(
+    module: cst.Module, names: AbstractSet[str], tracker: Optional[StatementTracker] = None
+) -> Set[str]:
+    """Those of ``names`` that occur in ``module`` outside of its top-level imports.
+
+    With the :class:`~codemods.tracking.StatementTracker` of the traversal that
+    produced ``module``, only the statements it changed or didn't fully scan are
+    searched, the names of the others being known. Any name, attribute or
+    keyword spelled like an imported name counts as a reference to it, but
+    names only mentioned in strings don't, see :func:`mentioned_in_strings`.
+    """
+    if not names:
+        return set()
+    imports, searched, tracker = _statements(module, tracker)
+    found: Set[str] = set()
+    if tracker is not None:
+        found = {
+            name
+            for name in names
+            if any(i not in searched and i not in imports for i in tracker.names.get(name, ()))
+        }
+    finder = _NameFinder(set(names) - found)
+    for i in sorted(searched - imports):
+        if finder.names - finder.found:
+            module.body[i].visit(finder)
+    return found | finder.found
+
+
+def mentioned_in_strings(
+    module: cst.Module, names: AbstractSet[str], tracker: Optional[StatementTracker] = None
+) -> bool:
+    """Whether a string literal of ``module`` contains one of ``names`` as a word.
+
+    Such strings may reference the imported names, as those of ``__all__`` or
+    string annotations do, which only the scope analysis of
+    ``RemoveImportsVisitor`` tells apart from the others.
+    """
+    if not names:
+        return False
+    pattern = re.compile(r"\b(?:%s)\b" % "|".join(map(re.escape, sorted(names))))
+    imports, searched, tracker = _statements(module, tracker)
+    finder = _StringFinder()
+    if tracker is not None:
+        finder.strings.extend(value for i, value in tracker.strings if i not in searched)
+    for i in sorted(searched - imports):
+        module.body[i].visit(finder)
+    return any(pattern.search(value) for value in finder.strings)
@@ -1,11 +1,29 @@
 import argparse
 from ast import literal_eval
-from typing import Union, Sequence, Set, Optional
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Union, Sequence, Set, Optional, Tuple
 
 import libcst as cst
+import yaml
 from libcst.codemod import CodemodContext, VisitorBasedCodemodCommand
 from libcst.codemod.visitors import AddImportsVisitor
 
+from codemods.dagster_imports import collect, dagster_imports
+from codemods.matching import call_name
+
+
+@dataclass(frozen=True)
+class ArgumentRule:
+    """Renames, or deletes, an argument of the invocations of ``symbol``."""
+
+    symbol: str
+    original_arg: str
+    # Position the argument has when it is passed positionally.
+    original_arg_position: int
+    # None to delete the argument.
+    replacement_arg: Optional[str] = None
+
 
 class SwitchInvocationArgumentsCommand(VisitorBasedCodemodCommand):
 
@@ -23,21 +41,21 @@ class SwitchInvocationArgumentsCommand(VisitorBasedCodemodCommand):
             dest="symbol",
             metavar="STRING",
             help="Function/class being invoked",
-            required=True,
+            required=False,
         )
         arg_parser.add_argument(
             "--orig_arg",
             dest="original_arg",
             metavar="STRING",
             help="Original argument to change",
-            required=True,
+            required=False,
         )
         arg_parser.add_argument(
             "--orig_arg_pos",
             dest="original_arg_position",
             metavar="INT",
             help="Position of original argument",
-            required=True,
+            required=False,
         )
         arg_parser.add_argument(
             "--replace_arg",
@@ -46,70 +64,124 @@ class SwitchInvocationArgumentsCommand(VisitorBasedCodemodCommand):
             help="Argument to change to.",
             required=False,
         )
+        arg_parser.add_argument(
+            "--rules",
+            dest="rules_file",
+            metavar="FILE",
+            help="YAML file listing rules with the keys symbol, orig_arg, orig_arg_pos and "
+            "replace_arg, applied along with the one given by the other arguments, if any.",
+            required=False,
+        )
 
     def __init__(
         self,
         context: CodemodContext,
-        symbol: str,
-        original_arg: str,
-        original_arg_position: int,
-        replacement_arg: Optional[str],
+        symbol: Optional[str] = None,
+        original_arg: Optional[str] = None,
+        original_arg_position: Optional[int] = None,
+        replacement_arg: Optional[str] = None,
+        rules_file: Optional[str] = None,
     ) -> None:
         # Initialize the base class with context, and save our args. Remember, the
         # "dest" for each argument we added above must match a parameter name in
         # this init.
         super().__init__(context)
-        self.symbol = symbol
-        self.original_arg = original_arg
-        self.original_arg_position = int(original_arg_position)
-        self.replacement_arg = replacement_arg
+        rules = load_rules(rules_file) if rules_file is not None else []
+        if symbol is not None:
+            if original_arg is None or original_arg_position is None:
+                raise ValueError("--symbol requires --orig_arg and --orig_arg_pos.")
+            rules.insert(
+                0,
+                ArgumentRule(symbol, original_arg, int(original_arg_position), replacement_arg),
+            )
+        # The rules for the invocations of each symbol, in the order they are applied.
+        self.rules: Dict[str, Tuple[ArgumentRule, ...]] = _by_symbol(rules)
+
+    def visit_Module(self, node: cst.Module) -> None:
+        collect(self.context, node)
 
     def leave_Call(self, original_node: cst.Call, updated_node: cst.Call) -> cst.Call:
-        if isinstance(original_node.func, cst.Name) and original_node.func.value == self.symbol:
-            return self._replace_arg_in_invocation(original_node)
+        rules = self.rules.get(call_name(original_node, dagster_imports(self.context)))  # type: ignore
+        if rules is not None:
+            return self._replace_args_in_invocation(original_node, rules)
         # This isn't an invocation we're concerned with, so leave it unchanged.
         return updated_node
 
-    def _replace_arg_in_invocation(self, node: cst.Call) -> cst.Call:
-        arg_position = self._get_arg_pos(node.args)
-        if arg_position is None:
+    def _replace_args_in_invocation(
+        self, node: cst.Call, rules: Sequence[ArgumentRule]
+    ) -> cst.Call:
+        # Every rule is resolved against the arguments as written, so that
+        # deleting an argument doesn't shift the positions of the others. The
+        # first rule matching an argument applies to it.
+        replacements: Dict[int, Optional[str]] = {}
+        for rule in rules:
+            arg_position = self._get_arg_pos(node.args, rule)
+            if arg_position is not None and arg_position not in replacements:
+                replacements[arg_position] = rule.replacement_arg
+        if not replacements:
             return node
-        if self.replacement_arg:
-            arg = node.args[arg_position]
-            old_keyword = arg.keyword
-            new_keyword = cst.Name(
-                value=self.replacement_arg, lpar=old_keyword.lpar, rpar=old_keyword.rpar
-            )
-            new_arg = cst.Arg(
-                value=arg.value,
-                keyword=new_keyword,
-                equal=arg.equal,
-                comma=arg.comma,
-                star=arg.star,
-                whitespace_after_star=arg.whitespace_after_star,
-                whitespace_after_arg=arg.whitespace_after_arg,
-            )
-            new_arg_list = [
-                node.args[i] if i != arg_position else new_arg for i in range(len(node.args))
-            ]
-        else:
-            new_arg_list = [node.args[i] for i in range(len(node.args)) if i != arg_position]
-        return cst.Call(
-            func=node.func,
-            args=new_arg_list,
-            lpar=node.lpar,
-            rpar=node.rpar,
-            whitespace_after_func=node.whitespace_after_func,
-            whitespace_before_args=node.whitespace_before_args,
-        )
+        new_arg_list = []
+        for i, arg in enumerate(node.args):
+            if i not in replacements:
+                new_arg_list.append(arg)
+            elif replacements[i]:
+                old_keyword = arg.keyword
+                new_keyword = cst.Name(
+                    value=replacements[i], lpar=old_keyword.lpar, rpar=old_keyword.rpar
+                )
+                new_arg_list.append(arg.with_changes(keyword=new_keyword))
+        if new_arg_list and len(new_arg_list) < len(node.args):
+            # The last argument left takes the comma, if any, of the last argument.
+            new_arg_list[-1] = new_arg_list[-1].with_changes(comma=node.args[-1].comma)
+        return node.with_changes(args=new_arg_list)
 
-    def _get_arg_pos(self, arg_list: Sequence[cst.Arg]) -> Optional[int]:
+    def _get_arg_pos(self, arg_list: Sequence[cst.Arg], rule: ArgumentRule) -> Optional[int]:
         for i, arg in enumerate(arg_list):
-            if arg.keyword and arg.keyword.value == self.original_arg:
+            if arg.keyword and arg.keyword.value == rule.original_arg:
                 return i
         if (
-            len(arg_list) > self.original_arg_position
-            and arg_list[self.original_arg_position].keyword is None
+            len(arg_list) > rule.original_arg_position
+            and arg_list[rule.original_arg_position].keyword is None
         ):
-            return self.original_arg_position
+            return rule.original_arg_position
         return None
+
+
+def load_rules(path: str) -> List[ArgumentRule]:
+    """Read the rules of a YAML file listing them with the keys of the command line::
+
+        - symbol: ScheduleDefinition
+          orig_arg: foo
+          orig_arg_pos: 2
+          replace_arg: baz
+        - symbol: the_func
+          orig_arg: bar
+          orig_arg_pos: 0
+
+    The positions of the rules for a symbol all refer to the arguments of the
+    invocation as written, before any rule deleted one of them.
+    """
+    with open(path, "r") as fp:
+        config = yaml.safe_load(fp.read())
+    if not isinstance(config, list):
+        raise ValueError(f"{path} must list the rules to apply.")
+    rules = []
+    for entry in config:
+        if not isinstance(entry, dict) or not {"symbol", "orig_arg", "orig_arg_pos"} <= set(entry):
+            raise ValueError(f"{path}: rules need a symbol, orig_arg and orig_arg_pos: {entry}")
+        rules.append(
+            ArgumentRule(
+                symbol=str(entry["symbol"]),
+                original_arg=str(entry["orig_arg"]),
+                original_arg_position=int(entry["orig_arg_pos"]),
+                replacement_arg=entry.get("replace_arg"),
+            )
+        )
+    return rules
+
+
+def _by_symbol(rules: Sequence[ArgumentRule]) -> Dict[str, Tuple[ArgumentRule, ...]]:
+    by_symbol: Dict[str, List[ArgumentRule]] = defaultdict(list)
+    for rule in rules:
+        by_symbol[rule.symbol].append(rule)
+    return {symbol: tuple(symbol_rules) for symbol, symbol_rules in by_symbol.items()}
@@ -1,16 +1,24 @@
 import argparse
 from ast import literal_eval
-from typing import Union, List, Set
+from typing import Dict, Union, List, Optional, Set, Tuple
 
 import libcst as cst
+import yaml
 from libcst.codemod import CodemodContext, VisitorBasedCodemodCommand
 from libcst.codemod.visitors import AddImportsVisitor
+from libcst.helpers import get_full_name_for_node
+
+# Where the symbols given with --imported are moved from and to.
+DEFAULT_MOVE: Tuple[str, str] = ("dagster", "dagster._legacy")
 
 
 class LegacyImportCommand(VisitorBasedCodemodCommand):
 
     # Add a description so that future codemodders can see what this does.
-    DESCRIPTION: str = "Converts dagster imports to dagster._legacy imports."
+    DESCRIPTION: str = (
+        "Converts dagster imports to dagster._legacy imports, or applies the moves of a "
+        "mapping file."
+    )
 
     @staticmethod
     def add_args(arg_parser: argparse.ArgumentParser) -> None:
@@ -22,61 +30,94 @@ class LegacyImportCommand(VisitorBasedCodemodCommand):
             metavar="LIST",
             help="Imported symbols to move to `dagster._legacy",
             nargs="+",
-            required=True,
+        )
+        arg_parser.add_argument(
+            "--moves",
+            dest="moves_file",
+            metavar="FILE",
+            help="YAML file mapping modules to the symbols to move out of them, each to its new "
+            "module",
         )
 
-    def __init__(self, context: CodemodContext, symbols: List[str]) -> None:
+    def __init__(
+        self,
+        context: CodemodContext,
+        symbols: Optional[List[str]] = None,
+        moves_file: Optional[str] = None,
+    ) -> None:
         # Initialize the base class with context, and save our args. Remember, the
         # "dest" for each argument we added above must match a parameter name in
         # this init.
         super().__init__(context)
-        self.symbols = set(symbols)
+        source, target = DEFAULT_MOVE
+        # The module each moved symbol goes to, by module and symbol it is imported from.
+        self.moves: Dict[Tuple[str, str], str] = {
+            (source, symbol): target for symbol in symbols or ()
+        }
+        if moves_file is not None:
+            self.moves.update(load_moves(moves_file))
+        self.modules: Set[str] = {module for module, _ in self.moves}
 
     def leave_ImportFrom(
         self, original_node: cst.ImportFrom, updated_node: cst.ImportFrom
     ) -> Union[cst.ImportFrom, cst.RemovalSentinel]:
-        if (
-            original_node.module
-            and original_node.module.value == "dagster"
-            and _stmt_imports_symbol(original_node, self.symbols)
-        ):
-            # Check to see if the string matches what we want to replace. If so,
-            # then we do the replacement. We also know at this point that we need
-            # to import the constant itself.
-            for symbol in sorted(
-                list(_get_imported_symbols_to_change(original_node, self.symbols))
-            ):
-                AddImportsVisitor.add_needed_import(
-                    self.context,
-                    "dagster._legacy",
-                    symbol,
-                )
-            return _get_import_without_symbols(original_node, self.symbols)
+        module = _get_module(original_node)
+        if module in self.modules:
+            moved = _get_moved_symbols(original_node, module, self.moves)
+            if moved:
+                # We know at this point that we need to import the moved
+                # symbols from their new modules.
+                for (symbol, alias), target in moved.items():
+                    AddImportsVisitor.add_needed_import(self.context, target, symbol, alias)
+                return _get_import_without_symbols(original_node, set(moved))
         # This isn't an import we're concerned with, so leave it unchanged.
         return updated_node
 
 
-def _stmt_imports_symbol(node: cst.ImportFrom, symbols: Set[str]) -> bool:
-    for name in node.names:
-        if name.name.value in symbols:
-            return True
-    return False
+def load_moves(path: str) -> Dict[Tuple[str, str], str]:
+    """Read the moves of a YAML file mapping modules to the symbols to move out of them::
+
+        dagster:
+          pipeline: dagster._legacy
+          solid: dagster._legacy
+    """
+    with open(path, "r") as fp:
+        config = yaml.safe_load(fp.read())
+    if not isinstance(config, dict):
+        raise ValueError(f"{path} must map modules to the symbols moved out of them.")
+    moves = {}
+    for module, symbols in config.items():
+        if not isinstance(symbols, dict):
+            raise ValueError(f"{path} must map the symbols moved out of {module} to modules.")
+        for symbol, target in symbols.items():
+            moves[(str(module), str(symbol))] = str(target)
+    return moves
+
+
+def _get_module(node: cst.ImportFrom) -> Optional[str]:
+    if node.relative or node.module is None or isinstance(node.names, cst.ImportStar):
+        return None
+    return get_full_name_for_node(node.module)
 
 
-def _get_imported_symbols_to_change(node: cst.ImportFrom, symbols: Set[str]) -> List[str]:
-    used_symbols = []
+def _get_moved_symbols(
+    node: cst.ImportFrom, module: str, moves: Dict[Tuple[str, str], str]
+) -> Dict[Tuple[str, Optional[str]], str]:
+    """The modules the symbols of ``node`` move to, by symbol and alias they are imported as."""
+    moved_symbols = {}
     for import_alias in node.names:
-        if import_alias.name.value in symbols:
-            used_symbols.append(import_alias.name.value)
-    return used_symbols
+        target = moves.get((module, import_alias.name.value))
+        if target is not None:
+            moved_symbols[(import_alias.name.value, import_alias.evaluated_alias)] = target
+    return moved_symbols
 
 
 def _get_import_without_symbols(
-    node: cst.ImportFrom, symbols: Set[str]
+    node: cst.ImportFrom, symbols: Set[Tuple[str, Optional[str]]]
 ) -> Union[cst.ImportFrom, cst.RemovalSentinel]:
     imports = []
     for i, import_alias in enumerate(node.names):
-        if import_alias.name.value not in symbols:
+        if (import_alias.name.value, import_alias.evaluated_alias) not in symbols:
             imports.append(
                 # Reconstruct import alias to remove trailing whitespace.
                 cst.ImportAlias(
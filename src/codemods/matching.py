@@ -0,0 +1,128 @@
+"""
+Matchers compiled into plain predicates.
+
+``m.matches(node, pattern)`` interprets ``pattern`` anew on every call, and
+patterns written inline in a handler are also rebuilt on every call.
+:func:`compile_matcher` turns a pattern into a predicate once, at import time,
+by composing a check per field the pattern constrains: an ``isinstance`` and
+comparisons for nodes and values, ``any`` over the options of
+``m.OneOf``, and a single scan for sequences of the form
+``(m.ZeroOrMore(), pattern, m.ZeroOrMore())``, as used to find a decorator.
+Patterns with parts it doesn't know how to compile, such as ``m.MatchIfTrue``,
+metadata or other wildcards, are left to ``m.matches``.
+
+The helpers below cover the most common checks of the codemods, on the names
+of decorators, called functions and keyword arguments. Given the imports of the
+module, the names of decorators and called functions are those of the dagster
+APIs they refer to, see :mod:`codemods.dagster_imports`.
+"""
+
+import dataclasses
+from typing import Any, Callable, Optional, Sequence
+
+import libcst as cst
+import libcst.matchers as m
+from libcst.matchers._matcher_base import BaseMatcherNode
+
+from codemods.dagster_imports import DagsterImports
+
+Predicate = Callable[[Any], bool]
+
+
+def compile_matcher(pattern: Any) -> Predicate:
+    """A predicate equivalent to ``lambda node: m.matches(node, pattern)``."""
+    if isinstance(pattern, m.OneOf):
+        options = tuple(compile_matcher(option) for option in pattern.options)
+        return lambda node: any(option(node) for option in options)
+    if isinstance(pattern, BaseMatcherNode) and dataclasses.is_dataclass(pattern):
+        return _compile_node(pattern)
+    return lambda node: m.matches(node, pattern)
+
+
+def _compile_node(pattern: BaseMatcherNode) -> Predicate:
+    node_type = getattr(cst, type(pattern).__name__)
+    checks = []
+    for field in dataclasses.fields(pattern):
+        value = getattr(pattern, field.name)
+        if value is m.DoNotCare():
+            continue
+        check = _compile_field(value) if field.name != "metadata" else None
+        if check is None:
+            return lambda node: m.matches(node, pattern)
+        checks.append((field.name, check))
+    if not checks:
+        return lambda node: isinstance(node, node_type)
+    if len(checks) == 1:
+        ((name, check),) = checks
+        return lambda node: isinstance(node, node_type) and check(getattr(node, name))
+    return lambda node: isinstance(node, node_type) and all(
+        check(getattr(node, name)) for name, check in checks
+    )
+
+
+def _compile_field(value: Any) -> Optional[Predicate]:
+    if isinstance(value, (str, int, bool)):
+        return lambda field: field == value
+    if isinstance(value, (m.OneOf, BaseMatcherNode)):
+        return compile_matcher(value)
+    if isinstance(value, (tuple, list)):
+        return _compile_sequence(value)
+    return None
+
+
+def _compile_sequence(patterns: Sequence[Any]) -> Optional[Predicate]:
+    if any(isinstance(pattern, (m.AtLeastN, m.AtMostN)) for pattern in patterns):
+        if len(patterns) == 3 and _is_wildcard(patterns[0]) and _is_wildcard(patterns[2]):
+            element = compile_matcher(patterns[1])
+            if not isinstance(patterns[1], (m.AtLeastN, m.AtMostN)):
+                return lambda sequence: any(element(item) for item in sequence)
+        return None
+    elements = tuple(compile_matcher(pattern) for pattern in patterns)
+    return lambda sequence: len(sequence) == len(elements) and all(
+        element(item) for element, item in zip(elements, sequence)
+    )
+
+
+def _is_wildcard(pattern: Any) -> bool:
+    return isinstance(pattern, m.AtLeastN) and pattern.n == 0 and pattern.matcher is m.DoNotCare()
+
+
+def decorator_name(
+    decorator: cst.Decorator, imports: Optional[DagsterImports] = None
+) -> Optional[str]:
+    """Name of the function ``@name`` or ``@name(...)`` decorates with.
+
+    With the :class:`~codemods.dagster_imports.DagsterImports` of the module,
+    aliases of dagster APIs and attributes of dagster modules are resolved too.
+    """
+    expression = decorator.decorator
+    if isinstance(expression, cst.Call):
+        expression = expression.func
+    return _name_of(expression, imports)
+
+
+def decorated_with(
+    node: cst.FunctionDef, *names: str, imports: Optional[DagsterImports] = None
+) -> bool:
+    """Whether any decorator of ``node`` is one of ``names``, bare or called."""
+    return any(decorator_name(decorator, imports) in names for decorator in node.decorators)
+
+
+def call_name(node: cst.CSTNode, imports: Optional[DagsterImports] = None) -> Optional[str]:
+    """Name of the function ``name(...)`` calls, resolved as by :func:`decorator_name`."""
+    if isinstance(node, cst.Call):
+        return _name_of(node.func, imports)
+    return None
+
+
+def _name_of(expression: cst.BaseExpression, imports: Optional[DagsterImports]) -> Optional[str]:
+    if imports is not None:
+        return imports.resolve(expression)
+    if isinstance(expression, cst.Name):
+        return expression.value
+    return None
+
+
+def keyword_name(arg: cst.Arg) -> Optional[str]:
+    """Keyword of ``keyword=value``, None for positional arguments."""
+    return arg.keyword.value if arg.keyword is not None else None
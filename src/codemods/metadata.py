@@ -0,0 +1,74 @@
+"""
+Metadata shared by the codemods run over a file.
+
+Before every codemod, ``Codemod.transform_module`` wraps the module in a new
+``MetadataWrapper``, a deep copy of the module, and the providers the codemod
+depends on, such as ``ScopeProvider``, are computed anew for that copy, even
+when they were just computed for the same module. A :class:`MetadataCache`
+keeps the wrapper of the module a chain of codemods is at and hands it to
+every codemod of the chain, see :func:`transform_module`, so that each
+provider is computed at most once per module. Modules are only wrapped, hence
+copied, for codemods that depend on metadata.
+
+The metadata stays valid for as long as codemods return the module they were
+given, which :class:`~codemods.multiplex.MultiplexedCodemod` and
+:class:`~codemods.imports.ImportLedger` do when they replace no node. Once a
+node was replaced, the metadata of the new module is computed from scratch:
+the scopes, qualified names and positions of the statements left untouched
+depend on the rest of the module.
+"""
+
+from contextlib import ExitStack, contextmanager
+from dataclasses import replace
+from typing import Iterator, Optional, Sequence
+
+import libcst as cst
+from libcst.codemod import Codemod
+from libcst.metadata import MetadataWrapper
+
+
+class MetadataCache:
+    """The metadata of the latest module of a chain of codemods."""
+
+    def __init__(self) -> None:
+        self.wrapper: Optional[MetadataWrapper] = None
+        # The module the wrapper copied.
+        self._source: Optional[cst.Module] = None
+
+    def wrap(self, module: cst.Module) -> MetadataWrapper:
+        """The wrapper of ``module``, reusing the current one if it wraps ``module``."""
+        if self.wrapper is None or (
+            module is not self.wrapper.module and module is not self._source
+        ):
+            self.wrapper = MetadataWrapper(module)
+            self._source = module
+        return self.wrapper
+
+    @contextmanager
+    def resolve(self, codemods: Sequence[Codemod], module: cst.Module) -> Iterator[cst.Module]:
+        """Resolve the metadata ``codemods`` depend on, yielding the module to transform.
+
+        The codemods find the wrapper in their context, as in ``Codemod.transform_module``.
+        If none of them depends on metadata, nothing is computed and ``module``
+        itself is yielded.
+        """
+        dependent = [codemod for codemod in codemods if codemod.get_inherited_dependencies()]
+        if not dependent:
+            yield module
+            return
+        wrapper = self.wrap(module)
+        with ExitStack() as stack:
+            for codemod in dependent:
+                stack.enter_context(codemod.resolve(wrapper))
+                codemod.context = replace(codemod.context, wrapper=wrapper)
+            try:
+                yield wrapper.module
+            finally:
+                for codemod in dependent:
+                    codemod.context = replace(codemod.context, wrapper=None)
+
+
+def transform_module(codemod: Codemod, tree: cst.Module, cache: MetadataCache) -> cst.Module:
+    """``codemod.transform_module(tree)``, with the metadata of ``cache``."""
+    with cache.resolve([codemod], tree) as module:
+        return codemod.transform_module_impl(module)
@@ -0,0 +1,740 @@
+"""
+Console script that migrates a tree of legacy dagster code (solids, pipelines,
+composite solids, modes) to ops, jobs and graphs.
+
+Every file is read and parsed once, the migration codemods are applied in
+sequence to the in-memory tree and the result is written back once, all inside
+a single interpreter. A cheap textual check first decides which codemods could
+apply to a file at all, so files with nothing to migrate are never parsed, and
+generated files are skipped. Results are cached by file contents, so reruns
+only migrate the files (or codemods) that changed since the previous run. This
+replaces the per-file loop in ``run.sh`` which started a separate
+``python -m libcst.tool codemod`` process for every codemod/file pair.
+
+Files are spread over a pool of worker processes, one CPU per worker by
+default. Installing the package provides the ``dagster-migrate`` command::
+
+    dagster-migrate --jobs 8 path/to/dagster_project
+
+References:
+    - https://setuptools.pypa.io/en/latest/userguide/entry_point.html
+"""
+
+import argparse
+import functools
+import logging
+import os
+import sys
+import traceback
+from collections import defaultdict
+from contextlib import ExitStack
+from dataclasses import dataclass, replace
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Type
+
+import libcst as cst
+from libcst.codemod import Codemod, SkipFile
+from libcst.helpers import calculate_module_and_package
+
+from codemods import __version__
+from codemods.cache import DEFAULT_CACHE_PATH, ResultCache, content_hash, transform_key
+from codemods.convert_composite_to_graph import ConvertCompositeToGraph
+from codemods.convert_pipeline_to_job import ConvertPipelineToJob
+from codemods.convert_solid_to_op import ConvertSolidToOp
+from codemods.execute_pipeline_to_in_process import ConvertExecutePipeline
+from codemods.formatting import BLACK_FORMATTER, format_code, update_black_cache
+from codemods.multiplex import MultiplexedCodemod
+from codemods.patch import diff_bytes, unified_diff
+from codemods.progress import DEFAULT_INTERVAL, ProgressReporter
+from codemods.prefilter import (
+    DEFAULT_GENERATED_CODE_MARKER,
+    applicable_codemods,
+    is_generated,
+    load_generated_code_marker,
+)
+from codemods.rename_index import IndexEntry, PropagateRenames, RenameIndex, activate, index_source
+from codemods.results import FileResult, FileStats, FileStatus, MigrationSummary
+from codemods.runner import available_cpu_count, imap, imap_unordered
+from codemods.timings import TimingReport
+
+__author__ = "Chris DeCarolis"
+__copyright__ = "Chris DeCarolis"
+__license__ = "MIT"
+
+_logger = logging.getLogger(__name__)
+
+# The codemods run by ``run.sh``, in the order it runs them.
+MIGRATION_CODEMODS: Sequence[Type[Codemod]] = (
+    ConvertSolidToOp,
+    ConvertPipelineToJob,
+    ConvertCompositeToGraph,
+    ConvertExecutePipeline,
+)
+
+# Same formatter as the one configured in ``.libcst.codemod.yaml``, run
+# in-process when black is installed, see :mod:`codemods.formatting`.
+DEFAULT_FORMATTER: Sequence[str] = BLACK_FORMATTER
+
+
+# ---- Python API ----
+# The functions defined in this section can be imported by users in their
+# Python scripts/interactive interpreter, e.g. via
+# `from codemods.migrate import migrate_file`,
+# when using this Python module as a library.
+
+
+def transform_tree(
+    tree: cst.Module,
+    codemods: Sequence[Type[Codemod]] = MIGRATION_CODEMODS,
+    filename: Optional[str] = None,
+) -> cst.Module:
+    """Apply ``codemods`` in order to an already parsed module
+
+    The codemods are multiplexed into a single traversal of the tree, see
+    :class:`~codemods.multiplex.MultiplexedCodemod`. Each codemod gets a fresh
+    :class:`~libcst.codemod.CodemodContext`, exactly as it would when run on its
+    own by ``libcst.tool``, so scratch state (renames, required imports) never
+    leaks from one codemod into the next.
+
+    Args:
+      tree (libcst.Module): parsed module
+      codemods (Sequence[Type[Codemod]]): codemod classes taking only a context
+      filename (Optional[str]): path of the module, made available to the codemods
+
+    Returns:
+      libcst.Module: the transformed module
+    """
+    return MultiplexedCodemod.from_classes(codemods, filename).transform_module(tree)
+
+
+def migrate_source(
+    source: bytes,
+    codemods: Sequence[Type[Codemod]] = MIGRATION_CODEMODS,
+    filename: Optional[str] = None,
+) -> bytes:
+    """Apply the ``codemods`` that could change ``source`` and return the new code
+
+    Codemods are routed with :func:`~codemods.prefilter.applicable_codemods`
+    first, and ``source`` is only parsed if at least one of them could apply.
+
+    Args:
+      source (bytes): contents of a python module
+      codemods (Sequence[Type[Codemod]]): codemod classes taking only a context
+      filename (Optional[str]): path of the module, made available to the codemods
+
+    Returns:
+      bytes: the transformed module, in the encoding of the original
+    """
+    codemods = applicable_codemods(source, codemods)
+    if not codemods:
+        return source
+    return transform_tree(cst.parse_module(source), codemods, filename).bytes
+
+
+@dataclass(frozen=True)
+class MigrationConfig:
+    """Settings for migrating files, shared by every worker of a run."""
+
+    # Codemod classes taking only a context, applied in order.
+    codemods: Sequence[Type[Codemod]] = MIGRATION_CODEMODS
+    # Formatter command reading code on stdin and writing it to stdout, run on
+    # changed files only. Empty to leave the output unformatted.
+    formatter: Sequence[str] = ()
+    # Files containing this marker are skipped. None to migrate them as well.
+    generated_code_marker: Optional[str] = DEFAULT_GENERATED_CODE_MARKER
+    # Path of the result cache, see :mod:`codemods.cache`. None to disable it.
+    cache_path: Optional[str] = None
+    # Compute the diff of every changed file instead of writing it. Dry runs
+    # don't use the cache either, so that they leave no file behind.
+    dry_run: bool = False
+    # Also rename, in the other modules, the imports of and references to the
+    # functions the codemods rename, see :mod:`codemods.rename_index`.
+    propagate_renames: bool = False
+
+
+def migrate_contents(
+    source: bytes,
+    config: MigrationConfig = MigrationConfig(),
+    filename: Optional[str] = None,
+    stats: Optional[FileStats] = None,
+) -> Optional[bytes]:
+    """Migrate the contents of a python module
+
+    The output is only formatted if the codemods changed the module. When a
+    cache is configured, contents that were already migrated by the same
+    codemods get the stored output instead of being parsed again.
+
+    Args:
+      source (bytes): contents of a python module
+      config (MigrationConfig): codemods to apply and how to apply them
+      filename (Optional[str]): path of the module, made available to the codemods
+      stats (Optional[FileStats]): filled with what the migration involved
+
+    Returns:
+      Optional[bytes]: the migrated module, or None if it was left unchanged
+
+    Raises:
+      SkipFile: if the module is generated code
+    """
+    stats = stats if stats is not None else FileStats()
+    stats.bytes_in = stats.bytes_out = len(source)
+    if config.generated_code_marker and is_generated(source, config.generated_code_marker):
+        raise SkipFile("Generated file.")
+    codemods = applicable_codemods(source, config.codemods)
+    stats.codemods = tuple(codemod.__name__ for codemod in codemods)
+    if not codemods:
+        return None
+
+    cache = (
+        ResultCache.open(config.cache_path) if config.cache_path and not config.dry_run else None
+    )
+    if cache is not None:
+        with stats.timed("cache"):
+            digest = content_hash(source)
+            key = transform_key(codemods, config.formatter, filename)
+            found, migrated = cache.get(digest, key)
+        if found:
+            if migrated is not None:
+                stats.bytes_out = len(migrated)
+            return migrated
+
+    with stats.timed("parse"):
+        tree = cst.parse_module(source)
+    multiplexed = MultiplexedCodemod.from_classes(codemods, filename)
+    with stats.timed("transform"):
+        tree = multiplexed.transform_module(tree)
+    # Split the extra passes out of the traversal.
+    for phase, seconds in multiplexed.timings.items():
+        stats.timings["transform"] -= seconds
+        stats.timings[phase] = stats.timings.get(phase, 0.0) + seconds
+    stats.nodes_changed = multiplexed.nodes_changed
+    with stats.timed("codegen"):
+        migrated = tree.bytes
+    if migrated == source:
+        migrated = None
+    elif config.formatter:
+        with stats.timed("format"):
+            migrated = format_code(config.formatter, migrated)
+    if cache is not None:
+        with stats.timed("cache"):
+            cache.put(digest, key, migrated)
+    if migrated is not None:
+        stats.bytes_out = len(migrated)
+    return migrated
+
+
+def migrate_file(
+    path: str,
+    config: MigrationConfig = MigrationConfig(),
+    copies: Sequence[str] = (),
+    stats: Optional[FileStats] = None,
+) -> bool:
+    """Migrate a single file in place
+
+    The file is only written if the codemods changed it, see
+    :func:`migrate_contents`.
+
+    Args:
+      path (str): path of the python module to migrate
+      config (MigrationConfig): codemods to apply and how to apply them
+      copies (Sequence[str]): paths of files with the same contents as ``path``,
+          which get the same output without being migrated again
+      stats (Optional[FileStats]): filled with what the migration involved
+
+    Returns:
+      bool: whether the file was changed
+
+    Raises:
+      SkipFile: if the file is generated code
+    """
+    stats = stats if stats is not None else FileStats()
+    with stats.timed("read"):
+        with open(path, "rb") as fp:
+            source = fp.read()
+    migrated = migrate_contents(source, config, filename=path, stats=stats)
+    if migrated is None or migrated == source:
+        return False
+    with stats.timed("write"):
+        for target in (path, *copies):
+            with open(target, "wb") as fp:
+                fp.write(migrated)
+    return True
+
+
+def diff_file(
+    path: str, config: MigrationConfig = MigrationConfig(), stats: Optional[FileStats] = None
+) -> Optional[str]:
+    """Compute the changes migrating a single file would make, without writing it
+
+    Args:
+      path (str): path of the python module to migrate
+      config (MigrationConfig): codemods to apply and how to apply them
+      stats (Optional[FileStats]): filled with what the migration involved
+
+    Returns:
+      Optional[str]: unified diff of the changes, see :mod:`codemods.patch`,
+      or None if the file would be left unchanged
+
+    Raises:
+      SkipFile: if the file is generated code
+    """
+    stats = stats if stats is not None else FileStats()
+    with stats.timed("read"):
+        with open(path, "rb") as fp:
+            source = fp.read()
+    migrated = migrate_contents(source, config, filename=path, stats=stats)
+    if migrated is None or migrated == source:
+        return None
+    with stats.timed("diff"):
+        return unified_diff(path, source, migrated)
+
+
+def process_files(
+    paths: Sequence[str], config: MigrationConfig = MigrationConfig()
+) -> List[FileResult]:
+    """Migrate files with identical contents in place, capturing any error
+
+    Only the first file is actually migrated; the others share its result. In
+    a dry run, each file is diffed instead, see :func:`diff_file`.
+
+    Args:
+      paths (Sequence[str]): paths of python modules with the same contents
+      config (MigrationConfig): codemods to apply and how to apply them
+
+    Returns:
+      List[FileResult]: whether each file was changed, left unchanged, skipped
+      or failed
+    """
+    if config.dry_run and len(paths) > 1:
+        return [result for path in paths for result in process_files([path], config)]
+    stats = FileStats()
+    diff = None
+    error = None
+    try:
+        if config.dry_run:
+            diff = diff_file(paths[0], config, stats=stats)
+            changed = diff is not None
+        else:
+            changed = migrate_file(paths[0], config, copies=paths[1:], stats=stats)
+    except SkipFile as ex:
+        status, message = FileStatus.SKIPPED, str(ex)
+    except Exception as ex:
+        status, message = FileStatus.FAILED, traceback.format_exc()
+        error = type(ex).__name__
+    else:
+        status = FileStatus.CHANGED if changed else FileStatus.UNCHANGED
+        message = None
+    return [
+        FileResult(path, status, message, diff=diff, error=error, stats=stats if i == 0 else None)
+        for i, path in enumerate(paths)
+    ]
+
+
+def run_migration(
+    paths: Iterable[str],
+    jobs: Optional[int] = None,
+    config: MigrationConfig = MigrationConfig(),
+    roots: Optional[Sequence[str]] = None,
+) -> Iterator[FileResult]:
+    """Migrate every python file under ``paths`` using a pool of processes
+
+    Files with identical contents (vendored copies, empty ``__init__.py``) are
+    migrated once. Files are handed to workers one at a time as they free up,
+    and results are yielded in completion order. Once every file is done, the
+    changed files are recorded in black's cache in one go.
+
+    Dry runs leave the tree untouched and yield results in path order instead,
+    holding only a bounded number of diffs in memory, so that they can be
+    streamed as a single patch.
+
+    Args:
+      paths (Iterable[str]): files and/or directories to migrate
+      jobs (Optional[int]): number of worker processes, defaults to the number
+          of CPUs available to this process
+      config (MigrationConfig): codemods to apply and how to apply them
+      roots (Optional[Sequence[str]]): directories module names are relative
+          to when propagating renames, see :func:`index_renames`
+
+    Yields:
+      FileResult: the result of each file
+    """
+    jobs = jobs or available_cpu_count()
+    initargs = ()
+    if config.propagate_renames:
+        paths = list(paths)
+        initargs = (index_renames(paths, jobs, config, roots),)
+        config = replace(config, codemods=(*config.codemods, PropagateRenames))
+    initializer = activate if initargs else None
+    worker = functools.partial(process_files, config=config)
+    if config.dry_run:
+        files = ((path,) for path in iter_python_files(paths))
+        for results in imap(worker, files, jobs, initializer, initargs):
+            yield from results
+        return
+
+    if config.propagate_renames:
+        # Relative imports resolve differently from each copy of a file.
+        groups: Iterable[Tuple[str, ...]] = ((path,) for path in iter_python_files(paths))
+    else:
+        groups = group_identical_files(iter_python_files(paths))
+    changed = []
+    for results in imap_unordered(worker, groups, jobs, initializer, initargs):
+        for result in results:
+            if result.status is FileStatus.CHANGED:
+                changed.append(result.path)
+            yield result
+    if config.formatter:
+        update_black_cache(config.formatter, changed)
+
+
+def index_renames(
+    paths: Sequence[str],
+    jobs: Optional[int] = None,
+    config: MigrationConfig = MigrationConfig(),
+    roots: Optional[Sequence[str]] = None,
+) -> RenameIndex:
+    """Index the functions the codemods rename in every python file under ``paths``
+
+    Files are indexed in a pool of processes, like they are migrated. Module
+    names are relative to the innermost of ``roots`` containing the file, or to
+    its directory. Roots default to those of :func:`rename_roots`.
+
+    Args:
+      paths (Sequence[str]): files and/or directories to migrate
+      jobs (Optional[int]): number of worker processes, defaults to the number
+          of CPUs available to this process
+      config (MigrationConfig): codemods to apply and how to apply them
+      roots (Optional[Sequence[str]]): directories module names are relative to
+
+    Returns:
+      RenameIndex: the renamed functions of every module, see
+      :mod:`codemods.rename_index`
+    """
+    roots = rename_roots(paths) if roots is None else list(roots)
+    files = ((path, _root_of(path, roots)) for path in iter_python_files(paths))
+    worker = functools.partial(index_file, config=config)
+    entries = imap_unordered(worker, files, jobs or available_cpu_count())
+    return RenameIndex.from_entries(roots, (entry for entry in entries if entry is not None))
+
+
+def rename_roots(paths: Iterable[str]) -> List[str]:
+    """The directories in ``paths``, and the directories of the files in ``paths``"""
+    return [path if os.path.isdir(path) else os.path.dirname(path) for path in paths]
+
+
+def _root_of(path: str, roots: Sequence[str]) -> str:
+    absolute = os.path.abspath(path)
+    containing = [
+        root for root in roots if absolute.startswith(os.path.join(os.path.abspath(root), ""))
+    ]
+    return max(
+        containing, key=lambda root: len(os.path.abspath(root)), default=os.path.dirname(path)
+    )
+
+
+def index_file(
+    path_and_root: Tuple[str, str], config: MigrationConfig = MigrationConfig()
+) -> Optional[IndexEntry]:
+    """Index the functions the codemods rename in a single file, see :func:`index_renames`
+
+    Args:
+      path_and_root (Tuple[str, str]): path of the python module, and the
+          directory its module name is relative to
+      config (MigrationConfig): codemods to apply and how to apply them
+
+    Returns:
+      Optional[IndexEntry]: what the file defines and imports, or None if it
+      is skipped or can't be parsed
+    """
+    path, root = path_and_root
+    with open(path, "rb") as fp:
+        source = fp.read()
+    if config.generated_code_marker and is_generated(source, config.generated_code_marker):
+        return None
+    module = calculate_module_and_package(os.path.abspath(root or "."), os.path.abspath(path))
+    try:
+        return index_source(source, module, config.codemods)
+    except Exception:
+        # Reported when the file fails to migrate.
+        _logger.debug("Failed to index %s", path, exc_info=True)
+        return None
+
+
+def group_identical_files(paths: Iterable[str]) -> Iterator[Tuple[str, ...]]:
+    """Group ``paths`` by contents
+
+    Files are first grouped by size, so only files that share their size with
+    another file are actually read.
+
+    Args:
+      paths (Iterable[str]): paths of files
+
+    Yields:
+      Tuple[str, ...]: paths of files with identical contents
+    """
+    by_size: Dict[int, List[str]] = defaultdict(list)
+    for path in paths:
+        by_size[os.path.getsize(path)].append(path)
+    for same_size in by_size.values():
+        if len(same_size) == 1:
+            yield tuple(same_size)
+            continue
+        by_contents: Dict[str, List[str]] = defaultdict(list)
+        for path in same_size:
+            with open(path, "rb") as fp:
+                by_contents[content_hash(fp.read())].append(path)
+        yield from (tuple(identical) for identical in by_contents.values())
+
+
+def iter_python_files(paths: Iterable[str]) -> Iterator[str]:
+    """Yield every python file found under ``paths``, in a stable order
+
+    Args:
+      paths (Iterable[str]): files and/or directories
+
+    Yields:
+      str: path of a ``.py`` file
+    """
+    for path in paths:
+        if os.path.isfile(path):
+            yield path
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                if name.endswith(".py"):
+                    yield os.path.join(root, name)
+
+
+# ---- CLI ----
+# The functions defined in this section are wrappers around the main Python
+# API allowing them to be called directly from the terminal as a CLI
+# executable/script.
+
+
+def parse_args(args):
+    """Parse command line parameters
+
+    Args:
+      args (List[str]): command line parameters as list of strings
+          (for example  ``["--help"]``).
+
+    Returns:
+      :obj:`argparse.Namespace`: command line parameters namespace
+    """
+    parser = argparse.ArgumentParser(
+        description="Migrate legacy dagster solids/pipelines to ops/jobs in place"
+    )
+    parser.add_argument(
+        "--version",
+        action="version",
+        version="codemods {ver}".format(ver=__version__),
+    )
+    parser.add_argument(
+        dest="paths",
+        help="files or directories to migrate",
+        nargs="+",
+        metavar="PATH",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        dest="jobs",
+        help="number of worker processes (default: number of available CPUs)",
+        type=int,
+        metavar="INT",
+    )
+    parser.add_argument(
+        "--no-format",
+        dest="formatter",
+        help="do not run {} on migrated files".format(" ".join(DEFAULT_FORMATTER)),
+        action="store_const",
+        const=(),
+        default=DEFAULT_FORMATTER,
+    )
+    parser.add_argument(
+        "--diff",
+        dest="dry_run",
+        help="write a unified diff of the changes instead of migrating files in place",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--diff-output",
+        dest="diff_path",
+        help="write the diff of --diff to PATH (default: stdout), implies --diff",
+        metavar="PATH",
+    )
+    parser.add_argument(
+        "--progress",
+        dest="progress_path",
+        help="write JSON-lines progress records to PATH ('-' for stderr)",
+        metavar="PATH",
+    )
+    parser.add_argument(
+        "--progress-interval",
+        dest="progress_interval",
+        help="seconds between two throughput records (default: {})".format(DEFAULT_INTERVAL),
+        type=float,
+        default=DEFAULT_INTERVAL,
+        metavar="SECONDS",
+    )
+    parser.add_argument(
+        "--timings",
+        dest="slowest",
+        help="report the N slowest files (default: 10) and percentiles of the time "
+        "spent in each phase",
+        nargs="?",
+        type=int,
+        const=10,
+        metavar="N",
+    )
+    parser.add_argument(
+        "--cache",
+        dest="cache_path",
+        help="path of the result cache (default: {})".format(DEFAULT_CACHE_PATH),
+        default=DEFAULT_CACHE_PATH,
+        metavar="PATH",
+    )
+    parser.add_argument(
+        "--no-cache",
+        dest="cache_path",
+        help="migrate every file again, ignoring and not updating the cache",
+        action="store_const",
+        const=None,
+    )
+    parser.add_argument(
+        "--across-modules",
+        dest="propagate_renames",
+        help="also rename the imports of renamed solids, pipelines and composite solids in "
+        "other modules, after indexing every file",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--include-generated",
+        dest="include_generated",
+        help="also migrate files containing the generated code marker",
+        action="store_true",
+    )
+    parser.add_argument(
+        "-v",
+        "--verbose",
+        dest="loglevel",
+        help="set loglevel to INFO",
+        action="store_const",
+        const=logging.INFO,
+    )
+    parser.add_argument(
+        "-vv",
+        "--very-verbose",
+        dest="loglevel",
+        help="set loglevel to DEBUG",
+        action="store_const",
+        const=logging.DEBUG,
+    )
+    namespace = parser.parse_args(args)
+    if namespace.diff_path is not None:
+        namespace.dry_run = True
+        if _is_input_file(namespace.diff_path, namespace.paths):
+            parser.error(f"--diff-output {namespace.diff_path} is one of the files to migrate")
+    return namespace
+
+
+def _is_input_file(path: str, paths: Sequence[str]) -> bool:
+    path = os.path.realpath(path)
+    return any(os.path.realpath(file) == path for file in iter_python_files(paths))
+
+
+def setup_logging(loglevel):
+    """Setup basic logging
+
+    Args:
+      loglevel (int): minimum loglevel for emitting messages
+    """
+    logformat = "[%(asctime)s] %(levelname)s:%(name)s:%(message)s"
+    logging.basicConfig(
+        level=loglevel, stream=sys.stderr, format=logformat, datefmt="%Y-%m-%d %H:%M:%S"
+    )
+
+
+def main(args: List[str]) -> int:
+    """Migrate every python file under the given paths
+
+    Args:
+      args (List[str]): command line parameters as list of strings
+          (for example  ``["--verbose", "src/"]``).
+
+    Returns:
+      int: process exit code, non-zero if any file failed to migrate
+    """
+    args = parse_args(args)
+    setup_logging(args.loglevel)
+    config = MigrationConfig(
+        formatter=args.formatter,
+        generated_code_marker=None if args.include_generated else load_generated_code_marker(),
+        cache_path=args.cache_path,
+        dry_run=args.dry_run,
+        propagate_renames=args.propagate_renames,
+    )
+    paths = args.paths
+    # Computed before the paths are listed file by file, see index_renames.
+    roots = rename_roots(paths) if config.propagate_renames else None
+    with ExitStack() as stack:
+        # The patch is written as bytes, in the encodings of the files.
+        if args.diff_path is None or args.diff_path == "-":
+            patch = sys.stdout.buffer
+        else:
+            patch = stack.enter_context(open(args.diff_path, "wb"))
+        progress = None
+        if args.progress_path is not None:
+            # Listing the files upfront gives the throughput records an ETA.
+            paths = list(iter_python_files(paths))
+            stream = (
+                sys.stderr
+                if args.progress_path == "-"
+                else stack.enter_context(open(args.progress_path, "w"))
+            )
+            progress = ProgressReporter(stream, total=len(paths), interval=args.progress_interval)
+        timings = TimingReport(args.slowest) if args.slowest is not None else None
+        summary = MigrationSummary()
+        for result in run_migration(paths, args.jobs, config, roots):
+            summary.record(result)
+            if progress is not None:
+                progress.record(result)
+            if timings is not None:
+                timings.record(result)
+            if result.status is FileStatus.FAILED:
+                _logger.error("Failed to migrate %s\n%s", result.path, result.message)
+            elif result.status is FileStatus.CHANGED:
+                _logger.info("Migrated %s", result.path)
+            if result.diff:
+                patch.write(diff_bytes(result.diff))
+                patch.flush()
+        if progress is not None:
+            progress.finish()
+    # Keep the summary out of a patch written to stdout.
+    output = sys.stderr if args.dry_run and args.diff_path in (None, "-") else sys.stdout
+    if timings is not None:
+        print(timings.format(), file=output)
+    print(summary.format(), file=output)
+    return 1 if summary.failures else 0
+
+
+def run():
+    """Calls :func:`main` passing the CLI arguments extracted from :obj:`sys.argv`
+
+    This function can be used as entry point to create console scripts with setuptools.
+    """
+    sys.exit(main(sys.argv[1:]))
+
+
+if __name__ == "__main__":
+    # ^  This is a guard statement that will prevent the following code from
+    #    being executed in the case someone imports this file instead of
+    #    executing it as a script.
+    #    https://docs.python.org/3/library/__main__.html
+
+    # After installing your project with pip, users can also run your Python
+    # modules as scripts via the ``-m`` flag, as defined in PEP 338::
+    #
+    #     python -m codemods.migrate path/to/project
+    #
+    run()
@@ -0,0 +1,274 @@
+import time
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Optional, Sequence, Tuple, Type, Union
+
+import libcst as cst
+from libcst.codemod import Codemod, CodemodCommand, CodemodContext
+from libcst.codemod._visitor import ContextAwareTransformer
+from libcst.codemod.visitors import AddImportsVisitor, RemoveImportsVisitor
+
+from codemods.cleanup import obsolete_aliases, obsolete_imports, remove_obsolete_imports
+from codemods.dagster_imports import CONTEXT_KEY as IMPORTS_KEY
+from codemods.dagster_imports import DagsterImports
+from codemods.imports import ImportLedger, mentioned_in_strings, referenced_names
+from codemods.metadata import MetadataCache
+from codemods.metadata import transform_module as transform_with_metadata
+from codemods.pruning import PruningCodemodCommand
+from codemods.tracking import CONTEXT_KEY as TRACKER_KEY
+from codemods.tracking import StatementTracker, TrackedCodemodCommand
+
+# Transforms CodemodCommand.transform_module runs after a command, when the
+# command scheduled work for them in its context scratch.
+SUPPORTED_TRANSFORMS: Dict[str, Type[Codemod]] = {
+    AddImportsVisitor.CONTEXT_KEY: AddImportsVisitor,
+    RemoveImportsVisitor.CONTEXT_KEY: RemoveImportsVisitor,
+}
+
+
+class MultiplexedCodemod(ContextAwareTransformer):
+    """Runs several visitor based codemods in a single traversal of the tree.
+
+    Each node is visited once, and the ``visit_*``/``leave_*`` handlers of every
+    codemod interested in its type are called in the order the codemods were
+    given. ``leave_*`` handlers are chained: each one receives the true
+    ``original_node`` and the ``updated_node`` returned by the previous codemod.
+    If a handler replaces a node by a node of another type (or removes it),
+    later codemods don't see that node. A codemod that returns ``False`` from a
+    ``visit_*`` handler only stops receiving calls for that subtree; the others
+    still traverse it. Likewise for the ``SKIPPED_SUBTREES`` of codemods
+    deriving from :class:`~codemods.pruning.PruningCodemodCommand`: the
+    traversal only skips a subtree when every codemod skips it.
+
+    Every codemod keeps its own context, so scratch state such as renames and
+    scheduled imports stays separate, and the imports scheduled by each codemod
+    are applied after the traversal. The imports of every codemod, scheduled
+    and marked obsolete, are applied in a single edit of the top-level imports
+    by an :class:`~codemods.imports.ImportLedger`, unless string literals
+    mention the imports to remove, which are then removed with scope analysis,
+    see :mod:`codemods.cleanup`. If a codemod scheduled
+    imports the ledger doesn't support, they are applied as ``CodemodCommand``
+    would, each codemod in turn, and the imports every codemod marked obsolete
+    are then removed in a single pass, see :mod:`codemods.cleanup`.
+
+    The shared traversal is tracked by a single
+    :class:`~codemods.tracking.StatementTracker`, which every codemod finds in
+    its context, as do the :class:`~codemods.dagster_imports.DagsterImports` of
+    the module, collected once for all of them. The codemods that depend on
+    metadata, and the import passes, share a
+    :class:`~codemods.metadata.MetadataCache`, so that each provider is
+    computed once per module; when no codemod depends on any, the module isn't
+    wrapped at all.
+    """
+
+    def __init__(
+        self, context: CodemodContext, codemods: Sequence[ContextAwareTransformer]
+    ) -> None:
+        super().__init__(context)
+        for codemod in codemods:
+            _check_can_multiplex(type(codemod))
+        self.codemods: Tuple[ContextAwareTransformer, ...] = tuple(codemods)
+        # For each codemod, the node it returned False from visit on, if any.
+        self._pruned_at: List[Optional[cst.CSTNode]] = [None] * len(self.codemods)
+        self._active = len(self.codemods)
+        self._node_handlers: Dict[type, Tuple[int, ...]] = {}
+        self._attribute_handlers: Dict[type, Tuple[int, ...]] = {}
+        self._handled_types = [_handled_types(codemod) for codemod in self.codemods]
+        self._skipped_types = [
+            getattr(codemod, "SKIPPED_SUBTREES", frozenset()) for codemod in self.codemods
+        ]
+        # Nodes the codemods replaced, counting each node once.
+        self.nodes_changed = 0
+        self.tracker = StatementTracker(self)
+        # Seconds spent in the codemods' leave_Module handlers, which is where
+        # they run their extra passes, and in the import passes that follow.
+        self.timings: Dict[str, float] = {"leave_module": 0.0, "imports": 0.0}
+        # Metadata of the module being transformed, and of the modules the
+        # import passes produce from it.
+        self.metadata_cache = MetadataCache()
+
+    @classmethod
+    def from_classes(
+        cls, codemods: Sequence[Type[ContextAwareTransformer]], filename: Optional[str] = None
+    ) -> "MultiplexedCodemod":
+        """Multiplexes codemods that only take a context, each with a fresh context."""
+        return cls(
+            CodemodContext(filename=filename),
+            [codemod(CodemodContext(filename=filename)) for codemod in codemods],
+        )
+
+    def transform_module(self, tree: cst.Module) -> cst.Module:
+        self.metadata_cache = MetadataCache()
+        with self.metadata_cache.resolve(self.codemods, tree) as module:
+            nodes_changed = self.nodes_changed
+            tree = self.transform_module_impl(module)
+            if self.nodes_changed == nodes_changed:
+                # Keep the module the metadata was computed for.
+                tree = module
+        start = time.perf_counter()
+        try:
+            return self._apply_imports(tree)
+        finally:
+            self.timings["imports"] += time.perf_counter() - start
+
+    def _apply_imports(self, tree: cst.Module) -> cst.Module:
+        ledger = ImportLedger()
+        if all(ledger.record(codemod.context) for codemod in self.codemods):
+            removed = ledger.removed_symbols
+            if not mentioned_in_strings(tree, removed, self.tracker):
+                return ledger.apply(tree, referenced_names(tree, removed, self.tracker))
+            # Strings may reference the removed names, which only the scope
+            # analysis tells, so the ledger only adds imports.
+            return remove_obsolete_imports(
+                self.context,
+                ledger.apply(tree, removed),
+                {(module, symbol) for module, symbol, alias in ledger.removals if alias is None},
+                self.metadata_cache,
+                {removal for removal in ledger.removals if removal[2] is not None},
+            )
+        for codemod in self.codemods:
+            for key, transform in SUPPORTED_TRANSFORMS.items():
+                if key in codemod.context.scratch:
+                    tree = transform_with_metadata(
+                        transform(codemod.context), tree, self.metadata_cache
+                    )
+        obsolete = set()
+        aliases = set()
+        for codemod in self.codemods:
+            obsolete.update(obsolete_imports(codemod.context))
+            aliases.update(obsolete_aliases(codemod.context))
+        return remove_obsolete_imports(self.context, tree, obsolete, self.metadata_cache, aliases)
+
+    def on_visit(self, node: cst.CSTNode) -> bool:
+        if type(node) is cst.Module:
+            self.tracker = StatementTracker(self)
+            imports = DagsterImports.from_module(node)
+            for codemod in self.codemods:
+                codemod.context.scratch[TRACKER_KEY] = self.tracker
+                codemod.context.scratch[IMPORTS_KEY] = imports
+        self.tracker.visit(node)
+        node_type = type(node)
+        for i in self._handlers_for(node_type):
+            if self._pruned_at[i] is None and (
+                node_type in self._skipped_types[i] or not self.codemods[i].on_visit(node)
+            ):
+                self._pruned_at[i] = node
+                self._active -= 1
+        if self._active > 0:
+            return True
+        self.tracker.prune(node)
+        return False
+
+    def on_leave(
+        self, original_node: cst.CSTNode, updated_node: cst.CSTNode
+    ) -> Union[cst.CSTNode, cst.RemovalSentinel, cst.FlattenSentinel]:
+        node_type = type(original_node)
+        if node_type is cst.Module:
+            start = time.perf_counter()
+            try:
+                return self._leave(node_type, original_node, updated_node)
+            finally:
+                self.timings["leave_module"] += time.perf_counter() - start
+        return self._leave(node_type, original_node, updated_node)
+
+    def _leave(
+        self, node_type: type, original_node: cst.CSTNode, updated_node: cst.CSTNode
+    ) -> Union[cst.CSTNode, cst.RemovalSentinel, cst.FlattenSentinel]:
+        result: Union[cst.CSTNode, cst.RemovalSentinel, cst.FlattenSentinel] = updated_node
+        for i in self._handlers_for(node_type):
+            pruned_at = self._pruned_at[i]
+            if pruned_at is original_node:
+                self._pruned_at[i] = None
+                self._active += 1
+            elif pruned_at is not None:
+                continue
+            if type(result) is node_type:
+                result = self.codemods[i].on_leave(original_node, result)
+        changed = result is not updated_node
+        if changed:
+            self.nodes_changed += 1
+        self.tracker.leave(original_node, result, changed)
+        return result
+
+    def on_visit_attribute(self, node: cst.CSTNode, attribute: str) -> None:
+        for i in self._attribute_handlers_for(type(node)):
+            if self._pruned_at[i] is None:
+                self.codemods[i].on_visit_attribute(node, attribute)
+
+    def on_leave_attribute(self, original_node: cst.CSTNode, attribute: str) -> None:
+        for i in self._attribute_handlers_for(type(original_node)):
+            if self._pruned_at[i] is None:
+                self.codemods[i].on_leave_attribute(original_node, attribute)
+
+    def _handlers_for(self, node_type: type) -> Tuple[int, ...]:
+        handlers = self._node_handlers.get(node_type)
+        if handlers is None:
+            handlers = self._node_handlers[node_type] = tuple(
+                i
+                for i, handled in enumerate(self._handled_types)
+                if handled is None
+                or node_type.__name__ in handled[0]
+                or node_type in self._skipped_types[i]
+            )
+        return handlers
+
+    def _attribute_handlers_for(self, node_type: type) -> Tuple[int, ...]:
+        handlers = self._attribute_handlers.get(node_type)
+        if handlers is None:
+            handlers = self._attribute_handlers[node_type] = tuple(
+                i
+                for i, handled in enumerate(self._handled_types)
+                if handled is None or node_type.__name__ in handled[1]
+            )
+        return handlers
+
+
+def _check_can_multiplex(codemod: Type[ContextAwareTransformer]) -> None:
+    if not issubclass(codemod, ContextAwareTransformer):
+        raise TypeError(f"{codemod.__name__} is not a visitor based codemod")
+    # Anything done outside of the visitor callbacks would be silently skipped.
+    for method in ("transform_module", "transform_module_impl"):
+        if getattr(codemod, method) not in (
+            getattr(CodemodCommand, method),
+            getattr(ContextAwareTransformer, method),
+        ):
+            raise TypeError(f"{codemod.__name__} overrides {method} and cannot be multiplexed")
+
+
+def _handled_types(
+    codemod: ContextAwareTransformer,
+) -> Optional[Tuple[FrozenSet[str], FrozenSet[str]]]:
+    """Names of the node types ``codemod`` has node and attribute handlers for.
+
+    Returns None when the codemod needs to see every node, which is the case
+    when it uses matcher decorators or overrides the generic ``on_*`` callbacks.
+    """
+    if codemod._matchers or codemod._extra_visit_funcs or codemod._extra_leave_funcs:
+        return None
+    return _handled_types_for_class(type(codemod))
+
+
+@lru_cache(maxsize=None)
+def _handled_types_for_class(
+    cls: Type[ContextAwareTransformer],
+) -> Optional[Tuple[FrozenSet[str], FrozenSet[str]]]:
+    # The generic callbacks of these base classes only track the traversal and
+    # prune SKIPPED_SUBTREES, which the multiplexer does itself.
+    if cls.on_visit not in (
+        ContextAwareTransformer.on_visit,
+        PruningCodemodCommand.on_visit,
+        TrackedCodemodCommand.on_visit,
+    ) or cls.on_leave not in (ContextAwareTransformer.on_leave, TrackedCodemodCommand.on_leave):
+        return None
+    node_types = set()
+    attribute_types = set()
+    for name in dir(cls):
+        if not name.startswith(("visit_", "leave_")):
+            continue
+        if getattr(cls, name) is getattr(ContextAwareTransformer, name, None):
+            continue
+        type_name, _, attribute = name[len("visit_") :].partition("_")
+        if attribute:
+            attribute_types.add(type_name)
+        else:
+            node_types.add(type_name)
+    return frozenset(node_types), frozenset(attribute_types)
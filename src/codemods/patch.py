@@ -0,0 +1,46 @@
+"""
+Unified diffs of migrated files, for reviewing a migration without applying it.
+
+Diffs use ``a/`` and ``b/`` prefixed paths relative to the current directory,
+so the concatenated diffs of a run, taken from the repository root, form a
+patch that ``git apply`` (or ``patch -p1``) accepts.
+
+Files are compared line by line as git compares them: lines only end at
+``\\n``. Contents are decoded as UTF-8 with ``surrogateescape``, so that files
+in other encodings, which libcst accepts through a coding cookie, are diffed
+too; :func:`diff_bytes` encodes a diff back to the bytes of the files.
+"""
+
+import difflib
+import os
+import re
+from typing import List
+
+NO_NEWLINE_AT_END_OF_FILE = "\\ No newline at end of file\n"
+
+
+def unified_diff(path: str, before: bytes, after: bytes) -> str:
+    """Unified diff turning ``before`` into ``after``, both contents of ``path``."""
+    name = os.path.relpath(path).replace(os.sep, "/")
+    lines = difflib.unified_diff(
+        _lines(before),
+        _lines(after),
+        fromfile=f"a/{name}",
+        tofile=f"b/{name}",
+    )
+    # difflib leaves the last line of a file without a trailing newline as is,
+    # which would run it into the next line of the patch.
+    return "".join(
+        line if line.endswith("\n") else f"{line}\n{NO_NEWLINE_AT_END_OF_FILE}" for line in lines
+    )
+
+
+def diff_bytes(diff: str) -> bytes:
+    """The bytes of a diff :func:`unified_diff` computed, to write to a patch."""
+    return diff.encode("utf-8", "surrogateescape")
+
+
+def _lines(contents: bytes) -> List[str]:
+    # Unlike str.splitlines, which also splits at form feeds among others.
+    text = contents.decode("utf-8", "surrogateescape")
+    return [line for line in re.split(r"(?<=\n)", text) if line]
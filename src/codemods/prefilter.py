@@ -0,0 +1,66 @@
+"""
+Cheap textual checks deciding which codemods could possibly change a file,
+so that files with nothing to do are never parsed.
+
+A codemod opts in by listing, in a ``PREFILTER_KEYWORDS`` class attribute, byte
+strings at least one of which must appear in a module for the codemod to
+change it. Codemods without the attribute are assumed to always apply.
+"""
+
+import os
+from typing import Dict, List, Optional, Sequence, Type, TypeVar
+
+import yaml
+from libcst.codemod import Codemod
+
+CONFIG_FILE_NAME = ".libcst.codemod.yaml"
+# Spelled this way so that this module isn't itself considered generated.
+DEFAULT_GENERATED_CODE_MARKER = f"@gen{''}erated"
+
+_Codemod = TypeVar("_Codemod", bound=Type[Codemod])
+
+
+def is_generated(source: bytes, generated_code_marker: str) -> bool:
+    return generated_code_marker.encode("utf-8") in source
+
+
+def applicable_codemods(source: bytes, codemods: Sequence[_Codemod]) -> List[_Codemod]:
+    """Filter ``codemods`` down to the ones that could change ``source``.
+
+    Each keyword is searched for at most once per file, and every search is a
+    plain substring scan of the raw bytes.
+    """
+    found: Dict[bytes, bool] = {}
+    applicable = []
+    for codemod in codemods:
+        keywords = getattr(codemod, "PREFILTER_KEYWORDS", None)
+        if keywords is None:
+            applicable.append(codemod)
+            continue
+        for keyword in keywords:
+            if keyword not in found:
+                found[keyword] = keyword in source
+            if found[keyword]:
+                applicable.append(codemod)
+                break
+    return applicable
+
+
+def load_generated_code_marker(start_dir: Optional[str] = None) -> str:
+    """Read ``generated_code_marker`` from the nearest ``.libcst.codemod.yaml``.
+
+    The directories from ``start_dir`` (the current directory by default) up to
+    the filesystem root are searched, just like ``libcst.tool`` does.
+    """
+    current_dir = os.path.abspath(start_dir or os.getcwd())
+    previous_dir = None
+    while current_dir != previous_dir:
+        config_file = os.path.join(current_dir, CONFIG_FILE_NAME)
+        if os.path.isfile(config_file):
+            with open(config_file, "r") as fp:
+                config = yaml.safe_load(fp.read())
+            marker = config.get("generated_code_marker") if isinstance(config, dict) else None
+            return marker if isinstance(marker, str) else DEFAULT_GENERATED_CODE_MARKER
+        previous_dir = current_dir
+        current_dir = os.path.dirname(current_dir)
+    return DEFAULT_GENERATED_CODE_MARKER
@@ -0,0 +1,94 @@
+"""
+Machine readable progress of a migration run, as a stream of JSON records, one
+per line, meant to be tailed while the run is still going.
+
+Three kinds of records are written, told apart by their ``type``:
+
+``file``
+    one per file, as soon as its result comes in: ``path``, ``status``,
+    ``codemods`` it was routed to, ``nodes_changed``, ``bytes_in``,
+    ``bytes_out``, ``timings`` in seconds per phase and the ``error`` class of
+    failures.
+``throughput``
+    every ``interval`` seconds: ``files`` done so far, ``elapsed`` seconds,
+    ``files_per_second``, ``mb_per_second`` (of input read) and, when the total
+    number of files is known, ``total`` and ``eta_seconds``.
+``summary``
+    once, at the end: the count of each status and the final throughput.
+"""
+
+import json
+import time
+from typing import IO, Any, Callable, Dict, Optional
+
+from codemods.results import FileResult, FileStatus, MigrationSummary
+
+# Default number of seconds between two throughput records.
+DEFAULT_INTERVAL = 5.0
+
+
+class ProgressReporter:
+    """Writes the progress records of a run to ``stream``."""
+
+    def __init__(
+        self,
+        stream: IO[str],
+        total: Optional[int] = None,
+        interval: float = DEFAULT_INTERVAL,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.stream = stream
+        self.total = total
+        self.interval = interval
+        self.clock = clock
+        self.summary = MigrationSummary()
+        self.bytes_in = 0
+        self.started = clock()
+        self._last_throughput = self.started
+
+    def record(self, result: FileResult) -> None:
+        self.summary.record(result)
+        stats = result.stats
+        if stats is not None:
+            self.bytes_in += stats.bytes_in
+        self._write(
+            {
+                "type": "file",
+                "path": result.path,
+                "status": result.status.value,
+                "codemods": list(stats.codemods) if stats else None,
+                "nodes_changed": stats.nodes_changed if stats else None,
+                "bytes_in": stats.bytes_in if stats else None,
+                "bytes_out": stats.bytes_out if stats else None,
+                "timings": stats.timings if stats else None,
+                "error": result.error,
+            }
+        )
+        now = self.clock()
+        if now - self._last_throughput >= self.interval:
+            self._last_throughput = now
+            self._write({"type": "throughput", **self._throughput(now)})
+
+    def finish(self) -> None:
+        counts = {status.value: self.summary.counts[status] for status in FileStatus}
+        self._write({"type": "summary", **counts, **self._throughput(self.clock())})
+
+    def _throughput(self, now: float) -> Dict[str, Any]:
+        files = self.summary.total
+        elapsed = now - self.started
+        record: Dict[str, Any] = {
+            "files": files,
+            "elapsed": round(elapsed, 3),
+            "files_per_second": round(files / elapsed, 3) if elapsed > 0 else None,
+            "mb_per_second": round(self.bytes_in / 1e6 / elapsed, 3) if elapsed > 0 else None,
+        }
+        if self.total is not None:
+            record["total"] = self.total
+            record["eta_seconds"] = (
+                round((self.total - files) * elapsed / files, 1) if files else None
+            )
+        return record
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        self.stream.write(json.dumps(record) + "\n")
+        self.stream.flush()
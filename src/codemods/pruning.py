@@ -0,0 +1,67 @@
+"""
+Pruning of the subtrees a codemod has nothing to do in.
+
+A codemod deriving from :class:`PruningCodemodCommand` lists in
+``SKIPPED_SUBTREES`` the node types whose children can't contain anything it
+changes. Its traversal doesn't descend into the children of those nodes; its
+``leave_*`` handler for the node itself, if any, is still called, as when a
+``visit_*`` handler returns False. :class:`~codemods.multiplex.MultiplexedCodemod`
+prunes the same subtrees for each codemod, and stops descending when every
+codemod pruned.
+"""
+
+from typing import FrozenSet, Type
+
+import libcst as cst
+from libcst.codemod import VisitorBasedCodemodCommand
+
+# Nodes whose subtrees are only whitespace, comments and punctuation.
+TRIVIA: FrozenSet[Type[cst.CSTNode]] = frozenset(
+    {
+        cst.SimpleWhitespace,
+        cst.ParenthesizedWhitespace,
+        cst.TrailingWhitespace,
+        cst.EmptyLine,
+        cst.Newline,
+        cst.Comment,
+        cst.Comma,
+        cst.Colon,
+        cst.Semicolon,
+        cst.Dot,
+        cst.AssignEqual,
+        cst.ImportStar,
+        cst.Asynchronous,
+        cst.LeftParen,
+        cst.RightParen,
+        cst.LeftSquareBracket,
+        cst.RightSquareBracket,
+        cst.LeftCurlyBrace,
+        cst.RightCurlyBrace,
+        *(
+            operator
+            for base in (
+                cst.BaseBinaryOp,
+                cst.BaseBooleanOp,
+                cst.BaseCompOp,
+                cst.BaseUnaryOp,
+                cst.BaseAugOp,
+            )
+            for operator in base.__subclasses__()
+            # Skips the classes the slots of libcst's dataclasses replaced.
+            if getattr(cst, operator.__name__, None) is operator
+        ),
+    }
+)
+
+IMPORTS: FrozenSet[Type[cst.CSTNode]] = frozenset({cst.Import, cst.ImportFrom})
+
+
+class PruningCodemodCommand(VisitorBasedCodemodCommand):
+    """A visitor based codemod that doesn't descend into ``SKIPPED_SUBTREES``."""
+
+    SKIPPED_SUBTREES: FrozenSet[Type[cst.CSTNode]] = frozenset()
+
+    def on_visit(self, node: cst.CSTNode) -> bool:
+        if type(node) in self.SKIPPED_SUBTREES:
+            return False
+        return super().on_visit(node)
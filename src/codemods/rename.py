@@ -0,0 +1,83 @@
+"""
+Rename engine shared by the rename visitors of every codemod.
+
+A :class:`RenameTable` compiles all of its renames into a single regular
+expression, so that each string literal or identifier is scanned once however
+many renames there are, instead of once per rename.
+"""
+
+import re
+from functools import lru_cache
+from typing import Mapping, Optional, Pattern, Tuple
+
+import libcst as cst
+from libcst.codemod import CodemodContext
+from libcst.codemod._visitor import ContextAwareTransformer
+
+
+class RenameTable:
+    """A set of renames, applied to whole names or within text.
+
+    With ``boundaries`` (the default), renames only apply to whole identifiers
+    within text: renaming ``my_solid`` changes ``"run my_solid"`` but not
+    ``"my_solid_config"``. Without, they apply to any substring, which is what
+    renaming ``solid`` to ``op`` inside ``context.solid_config`` needs.
+    """
+
+    def __init__(self, renames: Mapping[str, str], boundaries: bool = True) -> None:
+        self.renames = dict(renames)
+        self._pattern = _compile(tuple(self.renames), boundaries)
+
+    def __bool__(self) -> bool:
+        return bool(self.renames)
+
+    def rename(self, name: str) -> Optional[str]:
+        """New name of ``name`` if it is renamed as a whole, else None."""
+        return self.renames.get(name)
+
+    def search(self, text: str) -> bool:
+        """Whether any rename applies within ``text``."""
+        return self._pattern is not None and self._pattern.search(text) is not None
+
+    def sub(self, text: str) -> str:
+        """Apply every rename to ``text`` in a single scan."""
+        if self._pattern is None:
+            return text
+        return self._pattern.sub(self._replacement, text)
+
+    def _replacement(self, match: "re.Match[str]") -> str:
+        return self.renames[match.group(0)]
+
+
+@lru_cache(maxsize=256)
+def _compile(names: Tuple[str, ...], boundaries: bool) -> Optional[Pattern[str]]:
+    if not names:
+        return None
+    # Longest first, so that the longest rename wins where several start at the
+    # same position.
+    alternatives = "|".join(re.escape(name) for name in sorted(names, key=len, reverse=True))
+    if boundaries:
+        return re.compile(rf"(?<!\w)(?:{alternatives})(?!\w)")
+    return re.compile(alternatives)
+
+
+class RenameTransformer(ContextAwareTransformer):
+    """Renames names, and identifiers within string literals, as per ``table``."""
+
+    def __init__(self, context: CodemodContext, table: RenameTable) -> None:
+        super().__init__(context)
+        self.table = table
+
+    def leave_Name(self, original_node: cst.Name, updated_node: cst.Name) -> cst.Name:
+        new_name = self.table.rename(original_node.value)
+        if new_name is not None:
+            return updated_node.with_changes(value=new_name)
+        return updated_node
+
+    def leave_SimpleString(
+        self, original_node: cst.SimpleString, updated_node: cst.SimpleString
+    ) -> cst.SimpleString:
+        new_value = self.table.sub(updated_node.value)
+        if new_value != updated_node.value:
+            return updated_node.with_changes(value=new_value)
+        return updated_node
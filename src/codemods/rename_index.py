@@ -0,0 +1,253 @@
+"""
+Renames across modules.
+
+The codemods rename the solids, pipelines and composite solids they convert,
+and every mention of them, but only within the module defining them: a module
+importing ``the_solid`` from it is left importing a name that no longer exists.
+Migrating a tree in two phases fixes those modules as well. An indexing pass,
+spread over worker processes like the migration itself, first records the
+top-level definitions the codemods will rename in each module, see
+:func:`index_source`, and the names each module imports from others, so that
+renames also follow re-exports such as those of a package's ``__init__.py``.
+The resulting :class:`RenameIndex` is handed once to each worker process, see
+:func:`activate`, and :class:`PropagateRenames` then rewrites the imports of
+renamed definitions in other modules, along with the references to them.
+
+Module names are relative to the directories being migrated, and are computed
+as ``libcst.tool`` computes them.
+"""
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, Mapping, Optional, Sequence, Tuple, Type
+
+import libcst as cst
+from libcst.codemod import Codemod, CodemodContext
+from libcst.helpers import (
+    ModuleNameAndPackage,
+    calculate_module_and_package,
+    get_absolute_module_from_package_for_import,
+    get_full_name_for_node,
+)
+
+from codemods.dagster_imports import collect
+from codemods.pruning import TRIVIA
+from codemods.rename import RenameTable, RenameTransformer
+from codemods.tracking import TrackedCodemodCommand, revisit_statements
+
+# One of these appears in every name the codemods rename, hence in every
+# module defining, importing or re-exporting such a name.
+INDEX_KEYWORDS: Tuple[bytes, ...] = (b"solid", b"pipeline", b"composite")
+
+
+@dataclass(frozen=True)
+class IndexEntry:
+    """What indexing a single module found."""
+
+    module: str
+    # The definitions the codemods rename, and their new names.
+    renames: Mapping[str, str]
+    # The modules names are imported from without an alias, and the names.
+    imports: Tuple[Tuple[str, str], ...] = ()
+
+
+@dataclass(frozen=True)
+class RenameIndex:
+    """The definitions each module renames, with their new names, by module name."""
+
+    # Directories the module names are relative to.
+    roots: Tuple[str, ...]
+    renames: Mapping[str, Mapping[str, str]]
+
+    @classmethod
+    def from_entries(cls, roots: Sequence[str], entries: Iterable[IndexEntry]) -> "RenameIndex":
+        """Index ``entries``, following the renamed names modules import from others."""
+        entries = list(entries)
+        renames = {entry.module: dict(entry.renames) for entry in entries}
+        changed = True
+        while changed:
+            changed = False
+            for entry in entries:
+                for source, name in entry.imports:
+                    new_name = renames.get(source, {}).get(name)
+                    if new_name is not None and name not in renames[entry.module]:
+                        renames[entry.module][name] = new_name
+                        changed = True
+        return cls(
+            # Longest first, so that nested directories take precedence.
+            roots=tuple(sorted((os.path.abspath(root) for root in roots), key=len, reverse=True)),
+            renames={module: names for module, names in renames.items() if names},
+        )
+
+    @property
+    def keywords(self) -> Tuple[bytes, ...]:
+        """The renamed names, one of which appears in any module to propagate renames to."""
+        return tuple(
+            sorted({name.encode("utf-8") for names in self.renames.values() for name in names})
+        )
+
+    def digest(self) -> str:
+        encoded = json.dumps([self.roots, self.renames], sort_keys=True).encode("utf-8")
+        return hashlib.blake2b(encoded, digest_size=20).hexdigest()
+
+    def module_of(self, filename: str) -> Optional[ModuleNameAndPackage]:
+        path = os.path.abspath(filename)
+        for root in self.roots:
+            if path.startswith(os.path.join(root, "")):
+                return calculate_module_and_package(root, path)
+        return None
+
+
+def index_source(
+    source: bytes, module: ModuleNameAndPackage, codemods: Sequence[Type[Codemod]]
+) -> IndexEntry:
+    """Index a module, renamed by those of ``codemods`` that have a ``renames`` method.
+
+    Those codemods are only shown the top-level functions of the module, with
+    their ``visit_FunctionDef`` and ``leave_FunctionDef`` handlers, and the
+    imports of the module, see :mod:`codemods.dagster_imports`, after which
+    ``renames`` returns the :class:`~codemods.rename.RenameTable` of the
+    functions they rename.
+    """
+    if not any(keyword in source for keyword in INDEX_KEYWORDS):
+        return IndexEntry(module.name, {})
+    tree = cst.parse_module(source)
+    functions = [statement for statement in tree.body if isinstance(statement, cst.FunctionDef)]
+    renames: Dict[str, str] = {}
+    for codemod_class in codemods:
+        if not hasattr(codemod_class, "renames"):
+            continue
+        codemod = codemod_class(CodemodContext())  # type: ignore
+        collect(codemod.context, tree)
+        for function in functions:
+            if hasattr(codemod, "visit_FunctionDef"):
+                codemod.visit_FunctionDef(function)
+            if hasattr(codemod, "leave_FunctionDef"):
+                codemod.leave_FunctionDef(function, function)
+        for name, new_name in codemod.renames().renames.items():
+            renames.setdefault(name, new_name)
+    imports = []
+    for statement in tree.body:
+        if not isinstance(statement, cst.SimpleStatementLine):
+            continue
+        for small_statement in statement.body:
+            if isinstance(small_statement, cst.ImportFrom) and not isinstance(
+                small_statement.names, cst.ImportStar
+            ):
+                source_module = get_absolute_module_from_package_for_import(
+                    module.package, small_statement
+                )
+                if source_module is not None:
+                    imports.extend(
+                        (source_module, alias.name.value)
+                        for alias in small_statement.names
+                        if alias.asname is None and isinstance(alias.name, cst.Name)
+                    )
+    return IndexEntry(module.name, renames, tuple(imports))
+
+
+def activate(index: Optional[RenameIndex]) -> None:
+    """Make ``index`` the one :class:`PropagateRenames` uses in this process."""
+    PropagateRenames.index = index
+    PropagateRenames.PREFILTER_KEYWORDS = index.keywords if index is not None else ()
+
+
+class PropagateRenames(TrackedCodemodCommand):
+
+    # Add a description so that future codemodders can see what this does.
+    DESCRIPTION: str = (
+        "Renames the imports of the functions other modules renamed, and the references to them."
+    )
+
+    # The index of the current run, see activate. Without one, there is
+    # nothing to do.
+    index: Optional[RenameIndex] = None
+
+    # Byte strings one of which must appear in a module for this codemod to change it.
+    PREFILTER_KEYWORDS: Tuple[bytes, ...] = ()
+
+    # Nodes whose children this codemod never changes, see codemods.pruning.
+    SKIPPED_SUBTREES: FrozenSet[Type[cst.CSTNode]] = TRIVIA
+
+    def __init__(self, context: CodemodContext) -> None:
+        super().__init__(context)
+        module = None
+        if self.index is not None and context.filename is not None:
+            module = self.index.module_of(context.filename)
+        self.package: Optional[str] = module.package if module is not None else None
+        # New names of the names imports bound.
+        self.references: Dict[str, str] = {}
+        # Renamed attributes of the imported modules, by the name bound to them.
+        self.attributes: Dict[str, Mapping[str, str]] = {}
+
+    @classmethod
+    def state_key(cls, filename: Optional[str]) -> str:
+        """Identifies the output this codemod produces for ``filename``, for the cache."""
+        if cls.index is None:
+            return ""
+        module = cls.index.module_of(filename) if filename is not None else None
+        return f"{cls.index.digest()}:{module.name if module is not None else ''}"
+
+    def leave_ImportFrom(
+        self, original_node: cst.ImportFrom, updated_node: cst.ImportFrom
+    ) -> cst.ImportFrom:
+        module = self._module_of(original_node)
+        if module is None:
+            return updated_node
+        renames = self.index.renames.get(module)  # type: ignore
+        if isinstance(updated_node.names, cst.ImportStar):
+            if renames:
+                self.references.update(renames)
+            return updated_node
+        aliases = []
+        for alias in updated_node.names:
+            name = alias.name.value if isinstance(alias.name, cst.Name) else None
+            # ``from pkg import mod`` binds a module whose attributes are renamed.
+            submodule = self.index.renames.get(f"{module}.{name}")  # type: ignore
+            if submodule:
+                self.attributes[alias.evaluated_alias or name] = submodule  # type: ignore
+            new_name = renames.get(name) if renames and name is not None else None
+            if new_name is None:
+                aliases.append(alias)
+                continue
+            if alias.asname is None:
+                self.references[name] = new_name  # type: ignore
+            aliases.append(alias.with_changes(name=cst.Name(new_name)))
+        if not renames:
+            return updated_node
+        return updated_node.with_changes(names=aliases)
+
+    def leave_Import(self, original_node: cst.Import, updated_node: cst.Import) -> cst.Import:
+        if self.index is not None:
+            for alias in original_node.names:
+                module = get_full_name_for_node(alias.name)
+                renames = self.index.renames.get(module) if module is not None else None
+                if renames:
+                    self.attributes[alias.evaluated_alias or alias.evaluated_name] = renames
+        return updated_node
+
+    def leave_Attribute(
+        self, original_node: cst.Attribute, updated_node: cst.Attribute
+    ) -> cst.Attribute:
+        if self.attributes:
+            value = get_full_name_for_node(updated_node.value)
+            renames = self.attributes.get(value) if value is not None else None
+            if renames and updated_node.attr.value in renames:
+                return updated_node.with_changes(attr=cst.Name(renames[updated_node.attr.value]))
+        return updated_node
+
+    def leave_Module(self, original_node: cst.Module, updated_node: cst.Module) -> cst.Module:
+        if self.references:
+            updated_node = revisit_statements(
+                self.context,
+                updated_node,
+                RenameTransformer(self.context, RenameTable(self.references)),
+            )
+        return updated_node
+
+    def _module_of(self, node: cst.ImportFrom) -> Optional[str]:
+        if self.index is None:
+            return None
+        return get_absolute_module_from_package_for_import(self.package, node)
@@ -0,0 +1,78 @@
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+class FileStatus(Enum):
+    """Outcome of migrating a single file."""
+
+    CHANGED = "changed"
+    UNCHANGED = "unchanged"
+    SKIPPED = "skipped"
+    FAILED = "failed"
+
+
+@dataclass
+class FileStats:
+    """What migrating a single file involved, and how long each phase took."""
+
+    # Names of the codemods the file was routed to.
+    codemods: Tuple[str, ...] = ()
+    # Nodes replaced by the codemods' handlers.
+    nodes_changed: int = 0
+    bytes_in: int = 0
+    bytes_out: int = 0
+    # Seconds spent in each phase: read, cache, parse, transform (the traversal),
+    # leave_module (the codemods' extra passes), imports, codegen, format, write.
+    timings: Dict[str, float] = field(default_factory=dict)
+
+    @contextmanager
+    def timed(self, phase: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[phase] = self.timings.get(phase, 0.0) + time.perf_counter() - start
+
+
+@dataclass(frozen=True)
+class FileResult:
+    """Result of migrating a single file. Instances are sent back from worker
+    processes, so everything on them must be pickleable."""
+
+    path: str
+    status: FileStatus
+    # Reason for skipping, or the formatted traceback of a failure.
+    message: Optional[str] = None
+    # Unified diff of the changes, for dry runs only.
+    diff: Optional[str] = None
+    # Class name of the exception a failure was caused by.
+    error: Optional[str] = None
+    # Only set on the file that was actually migrated, not on its copies.
+    stats: Optional[FileStats] = None
+
+
+@dataclass
+class MigrationSummary:
+    """Aggregates the :class:`FileResult` of every file in a run."""
+
+    counts: Dict[FileStatus, int] = field(
+        default_factory=lambda: {status: 0 for status in FileStatus}
+    )
+    failures: List[FileResult] = field(default_factory=list)
+
+    def record(self, result: FileResult) -> None:
+        self.counts[result.status] += 1
+        if result.status is FileStatus.FAILED:
+            self.failures.append(result)
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    def format(self) -> str:
+        return f"{self.total} file(s): " + ", ".join(
+            f"{self.counts[status]} {status.value}" for status in FileStatus
+        )
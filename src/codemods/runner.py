@@ -0,0 +1,122 @@
+import math
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from itertools import islice
+from typing import Any, Callable, Deque, Iterable, Iterator, Optional, Set, Tuple, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# How many tasks to keep queued per worker. Tasks are handed out one at a time
+# as workers free up, so a few slow files never hold up a whole batch, while the
+# bounded queue keeps the parent from materializing every pending task at once.
+TASKS_PER_WORKER = 2
+
+
+def available_cpu_count() -> int:
+    """Number of CPUs this process may actually use.
+
+    Takes the CPU affinity mask and any cgroup CPU quota (as set by docker,
+    kubernetes and friends) into account, both of which ``os.cpu_count`` ignores.
+    """
+    try:
+        count = len(os.sched_getaffinity(0))
+    except AttributeError:  # pragma: no cover
+        # sched_getaffinity is not available on macOS.
+        count = os.cpu_count() or 1
+    quota = _cgroup_cpu_quota()
+    if quota is not None:
+        count = min(count, math.ceil(quota))
+    return max(count, 1)
+
+
+def _cgroup_cpu_quota() -> Optional[float]:
+    # cgroup v2: "<quota> <period>", or "max <period>" when unlimited.
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as fp:
+            quota, period = fp.read().split()
+        if quota != "max":
+            return int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    # cgroup v1: a quota of -1 means unlimited.
+    try:
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as fp:
+            quota_us = int(fp.read())
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as fp:
+            period_us = int(fp.read())
+        if quota_us > 0 and period_us > 0:
+            return quota_us / period_us
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def imap_unordered(
+    fn: Callable[[T], R],
+    items: Iterable[T],
+    jobs: int,
+    initializer: Optional[Callable[..., None]] = None,
+    initargs: Tuple[Any, ...] = (),
+) -> Iterator[R]:
+    """Apply ``fn`` to every item in a pool of ``jobs`` processes.
+
+    Results are yielded as soon as they complete, in no particular order. With a
+    single job everything runs in the current process, which keeps tracebacks
+    and debuggers usable. ``fn`` and the items must be pickleable. When given,
+    ``initializer(*initargs)`` is called once in each process before any item,
+    which shares read-only state with the workers without sending it along
+    with every item.
+    """
+    if jobs <= 1:
+        if initializer is not None:
+            initializer(*initargs)
+        yield from map(fn, items)
+        return
+
+    items = iter(items)
+    with ProcessPoolExecutor(
+        max_workers=jobs, initializer=initializer, initargs=initargs
+    ) as executor:
+        pending: Set[Future] = {
+            executor.submit(fn, item) for item in islice(items, jobs * TASKS_PER_WORKER)
+        }
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+                for item in islice(items, 1):
+                    pending.add(executor.submit(fn, item))
+
+
+def imap(
+    fn: Callable[[T], R],
+    items: Iterable[T],
+    jobs: int,
+    initializer: Optional[Callable[..., None]] = None,
+    initargs: Tuple[Any, ...] = (),
+) -> Iterator[R]:
+    """Like :func:`imap_unordered`, but results are yielded in the order of ``items``.
+
+    At most ``jobs * TASKS_PER_WORKER`` results are held at once: a result that
+    completes ahead of its turn waits for the ones before it, and no new task is
+    submitted until the oldest pending one has been yielded.
+    """
+    if jobs <= 1:
+        if initializer is not None:
+            initializer(*initargs)
+        yield from map(fn, items)
+        return
+
+    items = iter(items)
+    with ProcessPoolExecutor(
+        max_workers=jobs, initializer=initializer, initargs=initargs
+    ) as executor:
+        pending: Deque[Future] = deque(
+            executor.submit(fn, item) for item in islice(items, jobs * TASKS_PER_WORKER)
+        )
+        while pending:
+            yield pending.popleft().result()
+            for item in islice(items, 1):
+                pending.append(executor.submit(fn, item))
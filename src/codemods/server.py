@@ -0,0 +1,327 @@
+"""
+Long-lived migration server, so that editors, pre-commit hooks and other tools
+can migrate single files without paying for interpreter startup and the libcst
+import on every call.
+
+The codemods are imported and warmed up once, when the server starts, after
+which requests are answered from the resident process. Requests and responses
+are JSON objects, one per line, read from stdin and written to stdout, or
+exchanged over a Unix socket with ``--socket``. A request either carries the
+``source`` of a module, whose migrated source is returned, or the ``path`` of
+a file, which is migrated in place::
+
+    > {"id": 1, "source": "@solid\\ndef hello():\\n    pass\\n", "path": "hello.py"}
+    < {"id": 1, "status": "changed", "source": "from dagster import op\\n..."}
+    > {"id": 2, "path": "hello.py"}
+    < {"id": 2, "status": "unchanged"}
+
+``status`` is one of ``changed``, ``unchanged``, ``skipped`` or ``failed``, in
+which case ``message`` holds the reason. The ``id`` of a request, if any, is
+echoed back in its response.
+
+References:
+    - https://jsonlines.org/
+"""
+
+import argparse
+import json
+import logging
+import os
+import socketserver
+import sys
+import threading
+import traceback
+from dataclasses import replace
+from typing import IO, Any, Dict, Iterable, List
+
+from libcst.codemod import SkipFile
+
+from codemods import __version__
+from codemods.cache import DEFAULT_CACHE_PATH
+from codemods.migrate import (
+    DEFAULT_FORMATTER,
+    MigrationConfig,
+    migrate_contents,
+    process_files,
+    setup_logging,
+)
+from codemods.prefilter import load_generated_code_marker
+from codemods.results import FileStatus
+
+__author__ = "Chris DeCarolis"
+__copyright__ = "Chris DeCarolis"
+__license__ = "MIT"
+
+_logger = logging.getLogger(__name__)
+
+# Exercises every migration codemod, so that everything they load lazily (the
+# parser, metadata providers, matchers) is loaded before the first request.
+WARM_UP_SOURCE = b"""
+from dagster import pipeline, solid, composite_solid, execute_pipeline
+
+@solid(input_defs=[InputDefinition("x")], output_defs=[OutputDefinition()])
+def the_solid(context, x):
+    context.log.info(context.solid_config)
+
+@composite_solid
+def the_composite():
+    return the_solid()
+
+@pipeline
+def the_pipeline():
+    the_composite()
+
+execute_pipeline(the_pipeline, run_config={})
+"""
+
+
+# ---- Python API ----
+# The functions defined in this section can be imported by users in their
+# Python scripts/interactive interpreter, e.g. via
+# `from codemods.server import handle_request`,
+# when using this Python module as a library.
+
+
+def warm_up(config: MigrationConfig = MigrationConfig()) -> None:
+    """Run the codemods of ``config`` once, without the cache or the formatter
+
+    Args:
+      config (MigrationConfig): codemods to warm up
+    """
+    migrate_contents(WARM_UP_SOURCE, replace(config, formatter=(), cache_path=None))
+
+
+def handle_request(
+    request: Dict[str, Any], config: MigrationConfig = MigrationConfig()
+) -> Dict[str, Any]:
+    """Answer a single request
+
+    Args:
+      request (Dict[str, Any]): decoded request, see the module documentation
+      config (MigrationConfig): codemods to apply and how to apply them
+
+    Returns:
+      Dict[str, Any]: the response, ready to be encoded
+    """
+    response: Dict[str, Any] = {"id": request.get("id")} if "id" in request else {}
+    if "source" in request:
+        try:
+            source = request["source"].encode("utf-8")
+            migrated = migrate_contents(source, config, filename=request.get("path"))
+        except SkipFile as ex:
+            response.update(status=FileStatus.SKIPPED.value, message=str(ex))
+        except Exception:
+            response.update(status=FileStatus.FAILED.value, message=traceback.format_exc())
+        else:
+            if migrated is None or migrated == source:
+                response.update(status=FileStatus.UNCHANGED.value)
+            else:
+                response.update(status=FileStatus.CHANGED.value, source=migrated.decode("utf-8"))
+    elif "path" in request:
+        [result] = process_files([request["path"]], config)
+        response.update(status=result.status.value)
+        if result.message is not None:
+            response.update(message=result.message)
+    else:
+        response.update(
+            status=FileStatus.FAILED.value, message="A request needs a 'source' or a 'path'."
+        )
+    return response
+
+
+def serve_lines(
+    lines: Iterable[str], output: IO[str], config: MigrationConfig = MigrationConfig()
+) -> None:
+    """Answer JSON-lines requests until ``lines`` is exhausted
+
+    Each response is flushed as soon as it is written. Blank lines are ignored.
+
+    Args:
+      lines (Iterable[str]): encoded requests, one per line
+      output (IO[str]): stream the encoded responses are written to
+      config (MigrationConfig): codemods to apply and how to apply them
+    """
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("A request must be a JSON object.")
+        except ValueError as ex:
+            response = {"status": FileStatus.FAILED.value, "message": f"Invalid request: {ex}"}
+        else:
+            response = handle_request(request, config)
+        output.write(json.dumps(response) + "\n")
+        output.flush()
+
+
+class MigrationServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Unix socket server answering JSON-lines requests, see :func:`serve_lines`
+
+    Every connection may send any number of requests. Connections are handled
+    in their own thread, but requests are answered one at a time.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, config: MigrationConfig = MigrationConfig()) -> None:
+        self.config = config
+        self.lock = threading.Lock()
+        super().__init__(socket_path, _RequestHandler)
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    server: MigrationServer
+
+    def handle(self) -> None:
+        output = _TextWriter(self.wfile)
+        for line in self.rfile:
+            with self.server.lock:
+                serve_lines([line.decode("utf-8")], output, self.server.config)
+
+
+class _TextWriter:
+    """Text writer over a binary socket file, for :func:`serve_lines`."""
+
+    def __init__(self, wfile: IO[bytes]) -> None:
+        self._wfile = wfile
+
+    def write(self, text: str) -> None:
+        self._wfile.write(text.encode("utf-8"))
+
+    def flush(self) -> None:
+        self._wfile.flush()
+
+
+# ---- CLI ----
+# The functions defined in this section are wrappers around the main Python
+# API allowing them to be called directly from the terminal as a CLI
+# executable/script.
+
+
+def parse_args(args):
+    """Parse command line parameters
+
+    Args:
+      args (List[str]): command line parameters as list of strings
+          (for example  ``["--help"]``).
+
+    Returns:
+      :obj:`argparse.Namespace`: command line parameters namespace
+    """
+    parser = argparse.ArgumentParser(
+        description="Answer migration requests on stdin/stdout or on a Unix socket"
+    )
+    parser.add_argument(
+        "--version",
+        action="version",
+        version="codemods {ver}".format(ver=__version__),
+    )
+    parser.add_argument(
+        "--socket",
+        dest="socket_path",
+        help="listen on this Unix socket instead of stdin/stdout",
+        metavar="PATH",
+    )
+    parser.add_argument(
+        "--no-format",
+        dest="formatter",
+        help="do not run {} on migrated files".format(" ".join(DEFAULT_FORMATTER)),
+        action="store_const",
+        const=(),
+        default=DEFAULT_FORMATTER,
+    )
+    parser.add_argument(
+        "--cache",
+        dest="cache_path",
+        help="path of the result cache (default: {})".format(DEFAULT_CACHE_PATH),
+        default=DEFAULT_CACHE_PATH,
+        metavar="PATH",
+    )
+    parser.add_argument(
+        "--no-cache",
+        dest="cache_path",
+        help="neither read nor update the result cache",
+        action="store_const",
+        const=None,
+    )
+    parser.add_argument(
+        "--include-generated",
+        dest="include_generated",
+        help="also migrate files containing the generated code marker",
+        action="store_true",
+    )
+    parser.add_argument(
+        "-v",
+        "--verbose",
+        dest="loglevel",
+        help="set loglevel to INFO",
+        action="store_const",
+        const=logging.INFO,
+    )
+    parser.add_argument(
+        "-vv",
+        "--very-verbose",
+        dest="loglevel",
+        help="set loglevel to DEBUG",
+        action="store_const",
+        const=logging.DEBUG,
+    )
+    return parser.parse_args(args)
+
+
+def main(args: List[str]) -> int:
+    """Serve migration requests until stdin is closed or the server is interrupted
+
+    Args:
+      args (List[str]): command line parameters as list of strings
+          (for example  ``["--socket", "/tmp/dagster-migrate.sock"]``).
+
+    Returns:
+      int: process exit code
+    """
+    args = parse_args(args)
+    setup_logging(args.loglevel)
+    config = MigrationConfig(
+        formatter=args.formatter,
+        generated_code_marker=None if args.include_generated else load_generated_code_marker(),
+        cache_path=args.cache_path,
+    )
+    warm_up(config)
+    if args.socket_path is None:
+        _logger.info("Serving on stdin/stdout")
+        serve_lines(sys.stdin, sys.stdout, config)
+        return 0
+
+    with MigrationServer(args.socket_path, config) as server:
+        _logger.info("Serving on %s", args.socket_path)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.unlink(args.socket_path)
+    return 0
+
+
+def run():
+    """Calls :func:`main` passing the CLI arguments extracted from :obj:`sys.argv`
+
+    This function can be used as entry point to create console scripts with setuptools.
+    """
+    sys.exit(main(sys.argv[1:]))
+
+
+if __name__ == "__main__":
+    # ^  This is a guard statement that will prevent the following code from
+    #    being executed in the case someone imports this file instead of
+    #    executing it as a script.
+    #    https://docs.python.org/3/library/__main__.html
+
+    # After installing your project with pip, users can also run your Python
+    # modules as scripts via the ``-m`` flag, as defined in PEP 338::
+    #
+    #     python -m codemods.server --socket /tmp/dagster-migrate.sock
+    #
+    run()
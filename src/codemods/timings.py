@@ -0,0 +1,67 @@
+"""
+End of run report of where the time went: the slowest files, with the phase
+that dominated each, and the p50/p95/p99 of every phase across all files.
+
+Phases are the ones recorded in :attr:`codemods.results.FileStats.timings`.
+Only the slowest files are kept in full, so memory grows with the number of
+files by a few floats each.
+"""
+
+import heapq
+import math
+from collections import defaultdict
+from typing import Dict, List, Sequence, Tuple
+
+from codemods.results import FileResult
+
+PERCENTILES: Sequence[int] = (50, 95, 99)
+
+
+def percentile(sorted_values: Sequence[float], percent: float) -> float:
+    """Nearest-rank percentile of already sorted, non-empty ``sorted_values``."""
+    rank = max(math.ceil(percent / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+class TimingReport:
+    """Collects the phase timings of every file of a run."""
+
+    def __init__(self, top: int = 10) -> None:
+        self.top = top
+        self.phases: Dict[str, List[float]] = defaultdict(list)
+        # Min-heap of (total, path, timings) for the slowest files so far.
+        self._slowest: List[Tuple[float, str, Dict[str, float]]] = []
+
+    def record(self, result: FileResult) -> None:
+        if result.stats is None or not result.stats.timings:
+            return
+        timings = result.stats.timings
+        for phase, seconds in timings.items():
+            self.phases[phase].append(seconds)
+        entry = (sum(timings.values()), result.path, timings)
+        if len(self._slowest) < self.top:
+            heapq.heappush(self._slowest, entry)
+        elif self.top:
+            heapq.heappushpop(self._slowest, entry)
+
+    def slowest(self) -> List[Tuple[float, str, Dict[str, float]]]:
+        return sorted(self._slowest, reverse=True)
+
+    def format(self) -> str:
+        lines = [f"Slowest {len(self._slowest)} file(s):"]
+        for total, path, timings in self.slowest():
+            phase, seconds = max(timings.items(), key=lambda item: item[1])
+            lines.append(
+                f"  {total * 1e3:9.1f} ms  {phase} {seconds / total:4.0%}  {path}"
+                if total > 0
+                else f"  {0:9.1f} ms  -  {path}"
+            )
+        header = "".join(f"{f'p{percent}':>10}" for percent in PERCENTILES)
+        lines.append(f"Per phase (ms):     files{header}")
+        for phase, values in sorted(self.phases.items()):
+            values.sort()
+            columns = "".join(
+                f"{percentile(values, percent) * 1e3:10.1f}" for percent in PERCENTILES
+            )
+            lines.append(f"  {phase:12} {len(values):10}{columns}")
+        return "\n".join(lines)
@@ -0,0 +1,141 @@
+"""
+Tracking of the top-level statements a traversal changed, so that the passes
+codemods run afterwards, such as renaming the references to the functions they
+renamed, only revisit the statements they may change.
+
+While a codemod traverses a module, a :class:`StatementTracker` records which
+top-level statements it changed, and which names and string literals each
+top-level statement contains. :func:`revisit_statements` then runs a
+:class:`~codemods.rename.RenameTransformer` over the changed statements and
+the ones mentioning a renamed name only, and reuses every other statement as
+is, so that its cost grows with the size of the edit rather than of the module.
+
+Statements the traversal didn't fully descend into, see :mod:`codemods.pruning`,
+are revisited whenever there is a rename. Codemods deriving from
+:class:`TrackedCodemodCommand` track their own traversal. When they are multiplexed, the
+:class:`~codemods.multiplex.MultiplexedCodemod` tracks the shared traversal
+instead.
+"""
+
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+import libcst as cst
+from libcst.codemod import CodemodContext
+
+from codemods.pruning import TRIVIA, PruningCodemodCommand
+from codemods.rename import RenameTransformer
+
+CONTEXT_KEY = "StatementTracker"
+
+
+class StatementTracker:
+    """What a traversal of a module saw and changed, per top-level statement."""
+
+    def __init__(self, owner: object) -> None:
+        # The visitor whose traversal is tracked.
+        self.owner = owner
+        self.changed: Set[int] = set()
+        self.names: Dict[str, Set[int]] = defaultdict(set)
+        self.strings: List[Tuple[int, str]] = []
+        # Statements containing subtrees that were not visited.
+        self.unscanned: Set[int] = set()
+        # Set when top-level statements were removed or replaced by several,
+        # which breaks the correspondence of indices before and after.
+        self.reshaped = False
+        self._top_level: Dict[int, int] = {}
+        self._current: Optional[int] = None
+
+    def visit(self, node: cst.CSTNode) -> None:
+        node_type = type(node)
+        if node_type is cst.Name:
+            if self._current is not None:
+                self.names[node.value].add(self._current)  # type: ignore
+        elif node_type is cst.SimpleString:
+            if self._current is not None:
+                self.strings.append((self._current, node.value))  # type: ignore
+        elif node_type is cst.Module:
+            self._top_level = {id(statement): i for i, statement in enumerate(node.body)}  # type: ignore
+        else:
+            index = self._top_level.get(id(node))
+            if index is not None:
+                self._current = index
+
+    def prune(self, node: cst.CSTNode) -> None:
+        """Record that the children of ``node`` are not visited."""
+        if self._current is not None and type(node) not in TRIVIA:
+            self.unscanned.add(self._current)
+
+    def leave(
+        self,
+        original_node: cst.CSTNode,
+        result: Union[cst.CSTNode, cst.RemovalSentinel, cst.FlattenSentinel],
+        changed: bool,
+    ) -> None:
+        if changed and self._current is not None:
+            self.changed.add(self._current)
+        if id(original_node) in self._top_level:
+            if changed and not isinstance(result, cst.CSTNode):
+                self.reshaped = True
+            self._current = None
+
+    def referencing(self, transformer: RenameTransformer) -> Set[int]:
+        """Top-level statements ``transformer`` may change."""
+        statements = self.changed | self.unscanned
+        for name in transformer.table.renames:
+            statements.update(self.names.get(name, ()))
+        statements.update(index for index, value in self.strings if transformer.table.search(value))
+        return statements
+
+
+def track(context: CodemodContext, owner: object) -> StatementTracker:
+    """Start tracking the traversal of ``owner``, unless another visitor already tracks it."""
+    tracker = context.scratch.get(CONTEXT_KEY)
+    if tracker is None or tracker.owner is owner:
+        tracker = context.scratch[CONTEXT_KEY] = StatementTracker(owner)
+    return tracker
+
+
+def revisit_statements(
+    context: CodemodContext, module: cst.Module, transformer: RenameTransformer
+) -> cst.Module:
+    """Run ``transformer`` over the top-level statements of ``module`` it may change.
+
+    Falls back to running it over the whole module when the traversal of
+    ``module`` was not tracked.
+    """
+    tracker: Optional[StatementTracker] = context.scratch.get(CONTEXT_KEY)
+    if tracker is None or tracker.reshaped or len(tracker._top_level) != len(module.body):
+        return module.visit(transformer)
+    body = list(module.body)
+    statements = tracker.referencing(transformer)
+    for index in sorted(statements):
+        body[index] = body[index].visit(transformer)  # type: ignore
+    # The names in revisited statements may have changed since they were seen.
+    tracker.changed.update(statements)
+    return module.with_changes(body=body)
+
+
+class TrackedCodemodCommand(PruningCodemodCommand):
+    """A visitor based codemod that tracks its traversal, see :class:`StatementTracker`."""
+
+    def on_visit(self, node: cst.CSTNode) -> bool:
+        if type(node) is cst.Module:
+            track(self.context, self)
+        tracker = self.context.scratch.get(CONTEXT_KEY)
+        if tracker is None or tracker.owner is not self:
+            return super().on_visit(node)
+        tracker.visit(node)
+        visit_children = super().on_visit(node)
+        if not visit_children:
+            tracker.prune(node)
+        return visit_children
+
+    def on_leave(
+        self, original_node: cst.CSTNode, updated_node: cst.CSTNode
+    ) -> Union[cst.CSTNode, cst.RemovalSentinel, cst.FlattenSentinel]:
+        result = super().on_leave(original_node, updated_node)
+        tracker = self.context.scratch.get(CONTEXT_KEY)
+        if tracker is not None and tracker.owner is self:
+            tracker.leave(original_node, result, result is not updated_node)
+        return result
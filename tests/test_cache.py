@@ -0,0 +1,66 @@
+from codemods.cache import (
+    ResultCache,
+    codemod_fingerprint,
+    content_hash,
+    package_dependencies,
+    transform_key,
+)
+from codemods.execute_pipeline_to_in_process import ConvertExecutePipeline
+from codemods.convert_solid_to_op import ConvertSolidToOp
+from codemods.migrate import MigrationConfig, migrate_file
+
+LEGACY_MODULE = "@solid\ndef the_solid():\n    pass\n"
+MIGRATED_MODULE = "from dagster import op\n\n@op\ndef the_op():\n    pass\n"
+
+
+def test_codemod_fingerprint():
+    assert codemod_fingerprint(ConvertSolidToOp) == codemod_fingerprint(ConvertSolidToOp)
+    assert codemod_fingerprint(ConvertSolidToOp) != codemod_fingerprint(ConvertExecutePipeline)
+
+
+def test_package_dependencies():
+    dependencies = package_dependencies("codemods.convert_solid_to_op")
+    # TRIVIA comes from pruning, and metadata is only imported through cleanup.
+    assert {"codemods.pruning", "codemods.cleanup", "codemods.metadata"} <= dependencies
+    assert "codemods.multiplex" not in dependencies
+    assert "codemods.convert_pipeline_to_job" not in dependencies
+
+
+def test_transform_key():
+    key = transform_key([ConvertSolidToOp], ("black", "-"))
+    assert "ConvertSolidToOp" in key
+    assert key != transform_key([ConvertSolidToOp])
+    assert key != transform_key([ConvertSolidToOp, ConvertExecutePipeline], ("black", "-"))
+
+
+def test_result_cache(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache.sqlite"))
+    digest = content_hash(b"x = 1\n")
+
+    assert cache.get(digest, "key") == (False, None)
+    cache.put(digest, "key", None)
+    assert cache.get(digest, "key") == (True, None)
+    cache.put(digest, "other", b"y = 1\n")
+    assert cache.get(digest, "other") == (True, b"y = 1\n")
+    cache.close()
+
+    assert ResultCache(str(tmp_path / "cache.sqlite")).get(digest, "other") == (True, b"y = 1\n")
+
+
+def test_migrate_file_uses_cache(tmp_path, monkeypatch):
+    config = MigrationConfig(cache_path=str(tmp_path / "cache.sqlite"))
+    first = tmp_path / "first.py"
+    first.write_text(LEGACY_MODULE)
+    second = tmp_path / "second.py"
+    second.write_text(LEGACY_MODULE)
+
+    assert migrate_file(str(first), config)
+    assert first.read_text() == MIGRATED_MODULE
+
+    def fail(*args, **kwargs):
+        raise AssertionError("parsed a file whose result is cached")
+
+    monkeypatch.setattr("codemods.migrate.cst.parse_module", fail)
+    assert migrate_file(str(second), config)
+    assert second.read_text() == MIGRATED_MODULE
+    assert not migrate_file(str(second), config)
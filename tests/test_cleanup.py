@@ -0,0 +1,135 @@
+from textwrap import dedent
+
+import libcst as cst
+from libcst.codemod import CodemodContext
+
+from codemods.cleanup import (
+    mark_obsolete_import,
+    mark_obsolete_name,
+    obsolete_aliases,
+    obsolete_imports,
+    remove_obsolete_imports,
+)
+from codemods.migrate import migrate_source
+
+
+def test_mark_obsolete_import():
+    context = CodemodContext()
+    mark_obsolete_import(context, "solid", "pipeline")
+
+    assert obsolete_imports(context) == {
+        ("dagster", "solid"),
+        ("dagster._legacy", "solid"),
+        ("dagster", "pipeline"),
+        ("dagster._legacy", "pipeline"),
+    }
+    assert obsolete_imports(CodemodContext()) == set()
+
+
+def test_mark_obsolete_name():
+    context = CodemodContext()
+    mark_obsolete_name(context, "solid", "solid")
+    mark_obsolete_name(context, "s", "solid")
+
+    assert obsolete_imports(context) == {("dagster", "solid"), ("dagster._legacy", "solid")}
+    assert obsolete_aliases(context) == {
+        ("dagster", "solid", "s"),
+        ("dagster._legacy", "solid", "s"),
+    }
+
+
+def test_remove_obsolete_imports():
+    tree = cst.parse_module(
+        dedent(
+            """
+            import os
+            from dagster import op, solid, pipeline, Field
+            from dagster._legacy import composite_solid
+
+            pipeline
+            """
+        )
+    )
+    obsolete = {("dagster", "solid"), ("dagster", "pipeline"), ("dagster._legacy", "composite_solid")}
+
+    assert remove_obsolete_imports(CodemodContext(), tree, obsolete).code == dedent(
+        """
+        import os
+        from dagster import op, pipeline, Field
+
+        pipeline
+        """
+    )
+
+
+def test_migration_removes_obsolete_imports():
+    source = dedent(
+        """
+        from dagster import solid, pipeline, execute_pipeline, Field
+        from dagster._legacy import composite_solid
+
+        @solid(config_schema=Field(int))
+        def my_solid():
+            pass
+
+        @composite_solid
+        def my_composite():
+            my_solid()
+
+        @pipeline
+        def my_pipeline():
+            my_composite()
+
+        execute_pipeline(my_pipeline)
+        """
+    )
+
+    assert migrate_source(source.encode()).decode() == dedent(
+        """
+        from dagster import graph, job, op, Field
+
+        @op(config_schema=Field(int))
+        def my_op():
+            pass
+
+        @graph
+        def my_graph():
+            my_op()
+
+        @job
+        def my_job():
+            my_graph()
+
+        my_job.execute_in_process()
+        """
+    )
+
+
+def test_migration_keeps_imports_still_in_use():
+    source = "from dagster import solid\n\n@solid\ndef my_solid():\n    pass\n\nDECORATOR = solid\n"
+
+    assert migrate_source(source.encode()).decode() == (
+        "from dagster import op, solid\n\n@op\ndef my_op():\n    pass\n\nDECORATOR = solid\n"
+    )
+
+
+def test_migration_keeps_imports_of_unconverted_classes():
+    source = dedent(
+        """
+        from dagster import solid, OutputDefinition, DynamicOutputDefinition
+
+        @solid(output_defs=[OutputDefinition(int)])
+        def my_solid():
+            pass
+        """
+    )
+
+    assert migrate_source(source.encode()).decode() == dedent(
+        """
+        from dagster import Out, op, DynamicOutputDefinition
+
+        @op(out=Out(int))
+        def my_op():
+            pass
+        """
+    )
@@ -137,3 +137,31 @@ class TestInputOutputDefsChange(CodemodTest):
         """
 
         self.assertCodemod(before, after)
+
+    def test_aliased_imports(self) -> None:
+        before = """
+            import dagster as dg
+            from dagster import solid as s
+
+            @dg.solid(input_defs=[InputDefinition("hi", dagster_type=str)])
+            def first_solid(context):
+                context.solid_config
+
+            @s
+            def second_solid():
+                pass
+        """
+        after = """
+            import dagster as dg
+            from dagster import In, op, solid as s
+
+            @dg.op(ins = {"hi": In(dagster_type=str)})
+            def first_op(context):
+                context.op_config
+
+            @op
+            def second_op():
+                pass
+        """
+
+        self.assertCodemod(before, after)
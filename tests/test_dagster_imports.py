@@ -0,0 +1,84 @@
+from textwrap import dedent
+
+import libcst as cst
+from libcst.codemod import CodemodContext
+
+from codemods.dagster_imports import DagsterImports, collect, dagster_imports
+from codemods.migrate import migrate_source
+
+
+def _resolve(imports: DagsterImports, expression: str):
+    return imports.resolve(cst.parse_expression(expression))
+
+
+def test_resolves_aliases_and_module_attributes():
+    imports = DagsterImports.from_module(
+        cst.parse_module(
+            dedent(
+                """
+                import os, dagster as dg
+                import dagster._legacy
+                from dagster import solid as s, pipeline
+                from other import op as solid
+                """
+            )
+        )
+    )
+    assert _resolve(imports, "s") == "solid"
+    assert _resolve(imports, "pipeline") == "pipeline"
+    assert _resolve(imports, "dg.solid") == "solid"
+    assert _resolve(imports, "dagster._legacy.pipeline") == "pipeline"
+    assert _resolve(imports, "os.path") is None
+    assert _resolve(imports, "dg.solid()") is None
+
+
+def test_unimported_names_resolve_to_themselves():
+    imports = DagsterImports.from_module(cst.parse_module("from dagster import *\n"))
+    assert _resolve(imports, "solid") == "solid"
+    assert _resolve(imports, "dagster.solid") is None
+
+
+def test_collected_once_per_module():
+    context = CodemodContext()
+    module = cst.parse_module("import dagster as dg\n")
+    assert dagster_imports(context).modules == set()
+    imports = collect(context, module)
+    assert collect(context, module) is imports
+    assert dagster_imports(context) is imports
+    assert collect(context, cst.parse_module("import dagster as dg\n")) is not imports
+
+
+def test_migration_resolves_aliases():
+    source = dedent(
+        """
+        import dagster as dg
+        from dagster import solid as s, execute_pipeline as run
+
+        @s
+        def my_solid():
+            pass
+
+        @dg.pipeline(mode_defs=[dg.ModeDefinition(resource_defs={})])
+        def my_pipeline():
+            my_solid()
+
+        run(my_pipeline)
+        """
+    )
+
+    assert migrate_source(source.encode()).decode() == dedent(
+        """
+        import dagster as dg
+        from dagster import op
+
+        @op
+        def my_op():
+            pass
+
+        @dg.job(resource_defs={})
+        def my_job():
+            my_op()
+
+        my_job.execute_in_process()
+        """
+    )
@@ -0,0 +1,25 @@
+import pytest
+
+from codemods.formatting import BLACK_FORMATTER, format_code, formatter_key, is_black
+
+black = pytest.importorskip("black")
+
+
+def test_format_code_in_process(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("started a formatter subprocess")
+
+    monkeypatch.setattr("codemods.formatting.invoke_formatter", fail)
+    assert is_black(BLACK_FORMATTER)
+    assert format_code(BLACK_FORMATTER, b"x = {  'a':1 }\n") == b'x = {"a": 1}\n'
+    assert format_code(BLACK_FORMATTER, b"x = 1\n") == b"x = 1\n"
+
+
+def test_format_code_with_other_formatter():
+    assert not is_black(("cat",))
+    assert format_code(("cat",), b"x = {  'a':1 }\n") == b"x = {  'a':1 }\n"
+
+
+def test_formatter_key():
+    assert formatter_key(BLACK_FORMATTER).startswith(f"black=={black.__version__} ")
+    assert formatter_key(("cat",)) == "cat"
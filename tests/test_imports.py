@@ -0,0 +1,165 @@
+from textwrap import dedent
+
+import libcst as cst
+from libcst.codemod import CodemodContext
+from libcst.codemod.visitors import AddImportsVisitor
+
+from codemods.cleanup import mark_obsolete_import, mark_obsolete_name, remove_obsolete_imports
+from codemods.imports import ImportLedger, mentioned_in_strings, referenced_names
+from codemods.migrate import migrate_source
+
+
+def _ledger(*contexts: CodemodContext) -> ImportLedger:
+    ledger = ImportLedger()
+    for context in contexts:
+        assert ledger.record(context)
+    return ledger
+
+
+def _scheduling(*imports) -> CodemodContext:
+    context = CodemodContext()
+    for module, obj in imports:
+        AddImportsVisitor.add_needed_import(context, module, obj)
+    return context
+
+
+def _sequential(code: str, *contexts: CodemodContext) -> str:
+    tree = cst.parse_module(code)
+    for context in contexts:
+        tree = AddImportsVisitor(context).transform_module(tree)
+    return tree.code
+
+
+def test_adds_like_add_imports_visitor():
+    code = dedent(
+        '''
+        """Docstring."""
+        from dagster import InputDefinition
+        import os
+        # A comment.
+        x = InputDefinition()
+        '''
+    )
+    first = _scheduling(("dagster", "op"), ("dagster", "In"), ("dagster._legacy", "solid"))
+    second = _scheduling(("dagster", "job"), ("dagster._legacy", "pipeline"))
+    result = _ledger(first, second).apply(cst.parse_module(code), set()).code
+    assert result == _sequential(code, first, second)
+    assert "from dagster import job, In, op, InputDefinition\n" in result
+    assert "import os\nfrom dagster._legacy import pipeline, solid\n\n# A comment." in result
+
+
+def test_adds_after_docstring():
+    code = '"""Docstring."""\n@op\ndef f():\n    pass\n'
+    context = _scheduling(("dagster", "op"))
+    result = _ledger(context).apply(cst.parse_module(code), set()).code
+    assert result == _sequential(code, context)
+    assert result.startswith('"""Docstring."""\nfrom dagster import op\n\n@op')
+
+
+def test_skips_imported_names():
+    code = "from dagster import op\nfrom dagster._legacy import *\n"
+    context = _scheduling(("dagster", "op"), ("dagster._legacy", "solid"))
+    assert _ledger(context).apply(cst.parse_module(code), set()).code == code
+
+
+def test_removes_unreferenced_names():
+    code = dedent(
+        """
+        from dagster import (
+            op,
+            solid,  # The old name.
+        )
+        from dagster._legacy import pipeline as legacy_pipeline, solid
+
+        @op
+        def f():
+            pass
+        """
+    )
+    context = CodemodContext()
+    mark_obsolete_import(context, "solid", "pipeline")
+    tree = cst.parse_module(code)
+    ledger = _ledger(context)
+    result = ledger.apply(tree, referenced_names(tree, ledger.removed_symbols))
+    expected = remove_obsolete_imports(
+        CodemodContext(),
+        tree,
+        {(m, s) for m in ("dagster", "dagster._legacy") for s in ("solid", "pipeline")},
+    )
+    assert result.code == expected.code
+    assert "from dagster._legacy import pipeline as legacy_pipeline\n" in result.code
+
+
+def test_removes_emptied_statements():
+    code = "from dagster import solid\nfrom dagster._legacy import solid\n\nx = 1\n"
+    context = CodemodContext()
+    mark_obsolete_import(context, "solid")
+    assert _ledger(context).apply(cst.parse_module(code), set()).code == "\nx = 1\n"
+
+
+def test_removes_unreferenced_aliases():
+    code = "from dagster import solid as s, pipeline as p, op\n\n@op\ndef f():\n    p\n"
+    context = CodemodContext()
+    mark_obsolete_name(context, "s", "solid")
+    mark_obsolete_name(context, "p", "pipeline")
+    tree = cst.parse_module(code)
+    ledger = _ledger(context)
+    result = ledger.apply(tree, referenced_names(tree, ledger.removed_symbols))
+    expected = remove_obsolete_imports(
+        CodemodContext(),
+        tree,
+        (),
+        aliases={("dagster", "solid", "s"), ("dagster", "pipeline", "p")},
+    )
+    assert result.code == expected.code
+    assert result.code.startswith("from dagster import pipeline as p, op\n")
+
+
+def test_referenced_names_skip_imports():
+    tree = cst.parse_module("from dagster import solid, pipeline\n\n@solid\ndef f():\n    pass\n")
+    assert referenced_names(tree, {"solid", "pipeline"}) == {"solid"}
+
+
+def test_unsupported_imports_are_not_recorded():
+    context = CodemodContext()
+    AddImportsVisitor.add_needed_import(context, "dagster", "op", asname="dagster_op")
+    ledger = ImportLedger()
+    assert not ledger.record(context)
+    assert not ledger.additions
+
+
+def test_mentioned_in_strings():
+    tree = cst.parse_module('__all__ = ["solid"]\nx: "List[pipeline]"\ny = "solids"\n')
+    assert mentioned_in_strings(tree, {"solid"})
+    assert mentioned_in_strings(tree, {"pipeline"})
+    assert not mentioned_in_strings(tree, {"op", "solids_"})
+
+
+def test_migration_keeps_names_exported_by_all():
+    source = 'from dagster import solid\n\n__all__ = ["solid"]\n\n@solid\ndef f():\n    pass\n'
+    assert migrate_source(source.encode()).decode() == (
+        'from dagster import op, solid\n\n__all__ = ["solid"]\n\n@op\ndef f():\n    pass\n'
+    )
+
+
+def test_migration_keeps_names_of_string_annotations():
+    source = dedent(
+        """
+        from dagster import ModeDefinition, pipeline
+
+        def modes() -> "ModeDefinition":
+            pass
+
+        @pipeline(mode_defs=[ModeDefinition(resource_defs={})])
+        def my_pipeline():
+            pass
+        """
+    )
+    assert "from dagster import job, ModeDefinition\n" in migrate_source(source.encode()).decode()
+
+
+def test_migration_removes_names_only_mentioned_in_docstrings():
+    source = 'from dagster import solid\n\n@solid\ndef my_solid():\n    """A solid."""\n'
+    assert migrate_source(source.encode()).decode() == (
+        'from dagster import op\n\n@op\ndef my_op():\n    """A solid."""\n'
+    )
@@ -67,3 +67,25 @@ class TestInputOutputDefsChange(CodemodTest):
         """
 
         self.assertCodemod(before, after)
+
+    def test_substitution_graph(self) -> None:
+        before = """
+            @graph(input_defs=[InputDefinition("hi")], output_defs=[OutputDefinition(dagster_type=str)])
+            def the_graph():
+                the_op()
+
+            @op(input_defs=[InputDefinition("hi")], output_defs=[OutputDefinition(name="bar")])
+            def the_op():
+                pass
+        """
+        after = """
+            @graph(ins = {"hi": GraphIn()}, out = GraphOut(dagster_type=str))
+            def the_graph():
+                the_op()
+
+            @op(ins = {"hi": In()}, out = {"bar": Out()})
+            def the_op():
+                pass
+        """
+
+        self.assertCodemod(before, after)
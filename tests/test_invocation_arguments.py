@@ -1,6 +1,26 @@
+import os
+import tempfile
+from textwrap import dedent
+
 from libcst.codemod import CodemodTest
 from codemods.invocation_arguments import SwitchInvocationArgumentsCommand
 
+RULES = dedent(
+    """
+    - symbol: the_func
+      orig_arg: foo
+      orig_arg_pos: 2
+      replace_arg: baz
+    - symbol: the_func
+      orig_arg: qux
+      orig_arg_pos: 3
+    - symbol: ScheduleDefinition
+      orig_arg: cron
+      orig_arg_pos: 1
+      replace_arg: cron_schedule
+    """
+)
+
 
 class TestSwitchInvocationArgumentsCommand(CodemodTest):
 
@@ -101,7 +121,7 @@ class TestSwitchInvocationArgumentsCommand(CodemodTest):
             the_func(a, b, foo=bar)
         """
         after = """
-            the_func(a, b, )
+            the_func(a, b)
         """
 
         self.assertCodemod(
@@ -118,7 +138,7 @@ class TestSwitchInvocationArgumentsCommand(CodemodTest):
             the_func(a, b, foo)
         """
         after = """
-            the_func(a, b, )
+            the_func(a, b)
         """
 
         self.assertCodemod(
@@ -129,3 +149,46 @@ class TestSwitchInvocationArgumentsCommand(CodemodTest):
             original_arg_position=2,
             replacement_arg=None,
         )
+
+    def test_deletions_refer_to_the_original_positions(self) -> None:
+        before = """
+            the_func(x, y, z)
+            the_func(x, y, z,)
+        """
+        after = """
+            the_func(z)
+            the_func(z,)
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            rules_file = os.path.join(directory, "rules.yaml")
+            with open(rules_file, "w") as fp:
+                fp.write(
+                    dedent(
+                        """
+                        - symbol: the_func
+                          orig_arg: first
+                          orig_arg_pos: 0
+                        - symbol: the_func
+                          orig_arg: second
+                          orig_arg_pos: 1
+                        """
+                    )
+                )
+            self.assertCodemod(before, after, rules_file=rules_file)
+
+    def test_rules_file(self) -> None:
+        before = """
+            the_func(a, b, foo=bar, qux=1)
+            ScheduleDefinition(job, cron="* * * * *")
+            other_func(foo=bar)
+        """
+        after = """
+            the_func(a, b, baz=bar)
+            ScheduleDefinition(job, cron_schedule="* * * * *")
+            other_func(foo=bar)
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            rules_file = os.path.join(directory, "rules.yaml")
+            with open(rules_file, "w") as fp:
+                fp.write(RULES)
+            self.assertCodemod(before, after, rules_file=rules_file)
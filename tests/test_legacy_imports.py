@@ -1,5 +1,19 @@
+import os
+import tempfile
+from textwrap import dedent
+
 from libcst.codemod import CodemodTest
-from codemods.legacy_dagster_imports import LegacyImportCommand
+from codemods.legacy_dagster_imports import LegacyImportCommand, load_moves
+
+MOVES = dedent(
+    """
+    dagster:
+      pipeline: dagster._legacy
+      file_relative_path: dagster._utils
+    dagster.utils:
+      make_email_on_run_failure_sensor: dagster._utils.alert
+    """
+)
 
 
 class TestLegacyImportCommand(CodemodTest):
@@ -101,3 +115,43 @@ class TestLegacyImportCommand(CodemodTest):
             after,
             symbols=["AssetGroup", "pipeline", "PipelineDefinition", "ModeDefinition"],
         )
+
+    def test_substitution_keeps_aliases(self) -> None:
+        before = """
+            from dagster import ModeDefinition as Mode, pipeline as legacy_pipeline, op
+
+            @legacy_pipeline(mode_defs=[Mode()])
+            def the_pipeline():
+                pass
+        """
+        after = """
+            from dagster import op
+            from dagster._legacy import ModeDefinition as Mode, pipeline as legacy_pipeline
+
+            @legacy_pipeline(mode_defs=[Mode()])
+            def the_pipeline():
+                pass
+        """
+
+        self.assertCodemod(before, after, symbols=["pipeline", "ModeDefinition"])
+
+    def test_moves_file(self) -> None:
+        before = """
+            from dagster import file_relative_path, op, pipeline
+            from dagster.utils import make_email_on_run_failure_sensor
+        """
+        after = """
+            from dagster import op
+            from dagster._legacy import pipeline
+            from dagster._utils import file_relative_path
+            from dagster._utils.alert import make_email_on_run_failure_sensor
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            moves_file = os.path.join(directory, "moves.yaml")
+            with open(moves_file, "w") as fp:
+                fp.write(MOVES)
+            self.assertEqual(
+                load_moves(moves_file)[("dagster.utils", "make_email_on_run_failure_sensor")],
+                "dagster._utils.alert",
+            )
+            self.assertCodemod(before, after, moves_file=moves_file)
@@ -0,0 +1,80 @@
+import libcst as cst
+import libcst.matchers as m
+import pytest
+
+from codemods.dagster_imports import DagsterImports
+from codemods.matching import (
+    call_name,
+    compile_matcher,
+    decorated_with,
+    decorator_name,
+    keyword_name,
+)
+
+DEFINITIONS = [
+    "@solid\ndef f(): pass\n",
+    "@solid(config_schema=int)\ndef f(): pass\n",
+    "@other\n@lambda_solid\n@another()\ndef f(): pass\n",
+    "@module.solid\ndef f(): pass\n",
+    "@op\ndef f(): pass\n",
+    "def f(): pass\n",
+]
+
+PATTERNS = [
+    m.FunctionDef(
+        decorators=(
+            m.ZeroOrMore(),
+            m.Decorator(
+                decorator=m.Name(value="solid")
+                | m.Call(func=m.Name(value="solid"))
+                | m.Name(value="lambda_solid")
+            ),
+            m.ZeroOrMore(),
+        )
+    ),
+    m.FunctionDef(decorators=(m.Decorator(decorator=m.Name(value="solid")),)),
+    m.FunctionDef(decorators=(m.Decorator(decorator=m.Call(args=(m.Arg(keyword=m.Name()),))),)),
+    m.FunctionDef(decorators=(m.AtLeastN(n=2),)),
+    m.FunctionDef(name=m.MatchIfTrue(lambda name: name.value == "f")),
+]
+
+
+@pytest.mark.parametrize("pattern", PATTERNS)
+@pytest.mark.parametrize("source", DEFINITIONS)
+def test_compile_matcher(pattern, source):
+    node = cst.parse_statement(source)
+    assert compile_matcher(pattern)(node) == m.matches(node, pattern)
+
+
+def test_compile_matcher_other_types():
+    matcher = compile_matcher(m.Name(value="solid"))
+    assert matcher(cst.Name("solid"))
+    assert not matcher(cst.Name("op"))
+    assert not matcher(cst.Call(func=cst.Name("solid")))
+    assert not matcher(None)
+
+
+def test_helpers():
+    node = cst.parse_statement("@other\n@solid(name='x')\ndef f(): pass\n")
+    assert [decorator_name(decorator) for decorator in node.decorators] == ["other", "solid"]
+    assert decorated_with(node, "solid", "lambda_solid")
+    assert not decorated_with(node, "op")
+    call = cst.parse_expression("execute_pipeline(p, run_config={})")
+    assert call_name(call) == "execute_pipeline"
+    assert call_name(cst.parse_expression("p.execute()")) is None
+    assert [keyword_name(arg) for arg in call.args] == [None, "run_config"]
+
+
+def test_helpers_with_imports():
+    imports = DagsterImports.from_module(
+        cst.parse_module("import dagster as dg\nfrom dagster import solid as s\n")
+    )
+    node = cst.parse_statement("@dg.pipeline\n@s(name='x')\ndef f(): pass\n")
+    assert [decorator_name(decorator, imports) for decorator in node.decorators] == [
+        "pipeline",
+        "solid",
+    ]
+    assert decorated_with(node, "solid", imports=imports)
+    assert not decorated_with(node, "solid")
+    assert call_name(cst.parse_expression("dg.execute_pipeline(p)"), imports) == "execute_pipeline"
+    assert call_name(cst.parse_expression("p.execute()"), imports) is None
@@ -0,0 +1,77 @@
+from typing import List
+
+import libcst as cst
+from libcst.codemod import CodemodContext, VisitorBasedCodemodCommand
+from libcst.metadata import BatchableMetadataProvider, ScopeProvider
+
+from codemods.cleanup import remove_obsolete_imports
+from codemods.metadata import MetadataCache
+from codemods.multiplex import MultiplexedCodemod
+
+SOURCE = "from dagster import solid, op\n\n@op\ndef f():\n    pass\n"
+
+
+class _CountingProvider(BatchableMetadataProvider[int]):
+    computed: List[cst.Module] = []
+
+    def visit_Module(self, node: cst.Module) -> None:
+        self.computed.append(node)
+        self.set_metadata(node, len(self.computed))
+
+
+class _Dependent(VisitorBasedCodemodCommand):
+    METADATA_DEPENDENCIES = (_CountingProvider, ScopeProvider)
+
+    def visit_Module(self, node: cst.Module) -> None:
+        self.seen = self.get_metadata(_CountingProvider, node)
+
+
+class _Independent(VisitorBasedCodemodCommand):
+    def leave_Name(self, original_node: cst.Name, updated_node: cst.Name) -> cst.Name:
+        if updated_node.value == "f":
+            return updated_node.with_changes(value="g")
+        return updated_node
+
+
+def test_providers_are_computed_once_for_all_codemods():
+    _CountingProvider.computed = []
+    codemods = [_Dependent(CodemodContext()), _Dependent(CodemodContext())]
+    MultiplexedCodemod(CodemodContext(), codemods).transform_module(cst.parse_module(SOURCE))
+    assert len(_CountingProvider.computed) == 1
+    assert codemods[0].seen == codemods[1].seen == 1
+    assert all(codemod.context.wrapper is None for codemod in codemods)
+
+
+def test_nothing_is_computed_without_dependencies():
+    multiplexed = MultiplexedCodemod(CodemodContext(), [_Independent(CodemodContext())])
+    tree = cst.parse_module(SOURCE)
+    assert "def g()" in multiplexed.transform_module(tree).code
+    assert multiplexed.metadata_cache.wrapper is None
+
+
+def test_unchanged_modules_keep_their_metadata():
+    _CountingProvider.computed = []
+    multiplexed = MultiplexedCodemod(CodemodContext(), [_Dependent(CodemodContext())])
+    tree = multiplexed.transform_module(cst.parse_module(SOURCE))
+    wrapper = multiplexed.metadata_cache.wrapper
+    assert wrapper is not None and tree is wrapper.module
+    scopes = wrapper._metadata[ScopeProvider]
+
+    result = remove_obsolete_imports(
+        CodemodContext(), tree, {("dagster", "solid")}, multiplexed.metadata_cache
+    )
+    assert result.code == "from dagster import op\n\n@op\ndef f():\n    pass\n"
+    assert multiplexed.metadata_cache.wrapper is wrapper
+    assert wrapper._metadata[ScopeProvider] is scopes
+    assert len(_CountingProvider.computed) == 1
+
+
+def test_changed_modules_are_wrapped_again():
+    cache = MetadataCache()
+    tree = cst.parse_module(SOURCE)
+    codemod = _Dependent(CodemodContext())
+    with cache.resolve([codemod], tree) as module:
+        first = cache.wrapper
+    assert cache.wrap(tree) is first and cache.wrap(module) is first
+    changed = module.visit(_Independent(CodemodContext()))
+    assert cache.wrap(changed) is not first
@@ -0,0 +1,253 @@
+import json
+import subprocess
+
+import pytest
+from textwrap import dedent
+
+from codemods.migrate import (
+    MigrationConfig,
+    group_identical_files,
+    iter_python_files,
+    main,
+    migrate_file,
+    migrate_source,
+    run_migration,
+)
+from codemods.prefilter import DEFAULT_GENERATED_CODE_MARKER
+from codemods.rename_index import activate
+from codemods.results import FileStatus
+
+LEGACY_MODULE = dedent(
+    """
+    @solid
+    def the_solid():
+        pass
+
+    @composite_solid
+    def the_composite():
+        the_solid()
+
+    @pipeline
+    def the_pipeline():
+        the_composite()
+
+    execute_pipeline(the_pipeline)
+    """
+)
+
+MIGRATED_MODULE = dedent(
+    """
+    from dagster import graph, job, op
+
+    @op
+    def the_op():
+        pass
+
+    @graph
+    def the_graph():
+        the_op()
+
+    @job
+    def the_job():
+        the_graph()
+
+    the_job.execute_in_process()
+    """
+)
+
+
+def test_migrate_source():
+    assert migrate_source(LEGACY_MODULE.encode()).decode() == MIGRATED_MODULE
+
+
+def test_migrate_source_skips_parsing_when_nothing_applies(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("parsed a file with nothing to migrate")
+
+    monkeypatch.setattr("codemods.migrate.cst.parse_module", fail)
+    assert migrate_source(b"x = 1\n") == b"x = 1\n"
+
+
+def test_migrate_file(tmp_path):
+    legacy = tmp_path / "legacy.py"
+    legacy.write_text(LEGACY_MODULE)
+    untouched = tmp_path / "untouched.py"
+    untouched.write_text("x = 1\n")
+
+    assert migrate_file(str(legacy))
+    assert legacy.read_text() == MIGRATED_MODULE
+    assert not migrate_file(str(untouched))
+    assert untouched.read_text() == "x = 1\n"
+
+
+def test_iter_python_files(tmp_path):
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "b.py").write_text("")
+    (tmp_path / "pkg" / "notes.txt").write_text("")
+    (tmp_path / "a.py").write_text("")
+
+    assert list(iter_python_files([str(tmp_path)])) == [
+        str(tmp_path / "a.py"),
+        str(tmp_path / "pkg" / "b.py"),
+    ]
+
+
+def test_group_identical_files(tmp_path):
+    for name, contents in [("a.py", "x = 1\n"), ("b.py", "x = 1\n"), ("c.py", "y = 1\n"), ("d.py", "")]:
+        (tmp_path / name).write_text(contents)
+
+    groups = group_identical_files(iter_python_files([str(tmp_path)]))
+
+    assert sorted(groups) == [
+        (str(tmp_path / "a.py"), str(tmp_path / "b.py")),
+        (str(tmp_path / "c.py"),),
+        (str(tmp_path / "d.py"),),
+    ]
+
+
+def test_run_migration(tmp_path):
+    for i in range(4):
+        (tmp_path / f"legacy_{i}.py").write_text(LEGACY_MODULE)
+    (tmp_path / "untouched.py").write_text("x = 1\n")
+    (tmp_path / "broken.py").write_text("def broken_solid(:\n")
+    (tmp_path / "generated.py").write_text(f"# {DEFAULT_GENERATED_CODE_MARKER}\n{LEGACY_MODULE}")
+
+    results = {result.path: result for result in run_migration([str(tmp_path)], jobs=2)}
+
+    assert len(results) == 7
+    assert results[str(tmp_path / "legacy_0.py")].status is FileStatus.CHANGED
+    assert results[str(tmp_path / "untouched.py")].status is FileStatus.UNCHANGED
+    assert results[str(tmp_path / "broken.py")].status is FileStatus.FAILED
+    assert "ParserSyntaxError" in results[str(tmp_path / "broken.py")].message
+    assert results[str(tmp_path / "generated.py")].status is FileStatus.SKIPPED
+    assert (tmp_path / "legacy_3.py").read_text() == MIGRATED_MODULE
+
+
+def test_run_migration_across_modules(tmp_path):
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "__init__.py").write_text("from .legacy import the_solid\n")
+    (tmp_path / "pkg" / "legacy.py").write_text(LEGACY_MODULE)
+    (tmp_path / "runner.py").write_text("from pkg import the_solid\n\nthe_solid()\n")
+
+    try:
+        config = MigrationConfig(propagate_renames=True)
+        results = list(run_migration([str(tmp_path)], jobs=1, config=config))
+    finally:
+        activate(None)
+
+    assert [result.status for result in results] == [FileStatus.CHANGED] * 3
+    assert (tmp_path / "pkg" / "legacy.py").read_text() == MIGRATED_MODULE
+    assert (tmp_path / "pkg" / "__init__.py").read_text() == "from .legacy import the_op\n"
+    assert (tmp_path / "runner.py").read_text() == "from pkg import the_op\n\nthe_op()\n"
+
+
+def test_main(tmp_path, capsys):
+    """CLI Tests"""
+    (tmp_path / "legacy.py").write_text(LEGACY_MODULE)
+    (tmp_path / "broken.py").write_text("def broken_solid(:\n")
+
+    assert main(["--no-format", "--no-cache", "--jobs", "1", str(tmp_path)]) == 1
+    assert (tmp_path / "legacy.py").read_text() == MIGRATED_MODULE
+    captured = capsys.readouterr()
+    assert "2 file(s): 1 changed, 0 unchanged, 0 skipped, 1 failed" in captured.out
+
+
+def test_main_across_modules_with_progress(tmp_path):
+    project = tmp_path / "project"
+    (project / "pkg").mkdir(parents=True)
+    (project / "pkg" / "__init__.py").write_text("")
+    (project / "pkg" / "legacy.py").write_text(LEGACY_MODULE)
+    (project / "runner.py").write_text("from pkg.legacy import the_solid\n\nthe_solid()\n")
+    progress = tmp_path / "progress.jsonl"
+
+    try:
+        args = ["--no-format", "--no-cache", "--jobs", "1", "--across-modules"]
+        assert main([*args, "--progress", str(progress), str(project)]) == 0
+    finally:
+        activate(None)
+
+    assert (project / "pkg" / "legacy.py").read_text() == MIGRATED_MODULE
+    assert (project / "runner.py").read_text() == "from pkg.legacy import the_op\n\nthe_op()\n"
+
+
+def test_main_progress(tmp_path):
+    (tmp_path / "legacy.py").write_text(LEGACY_MODULE)
+    (tmp_path / "broken.py").write_text("def broken_solid(:\n")
+    progress = tmp_path / "progress.jsonl"
+
+    main(["--no-format", "--no-cache", "--jobs", "1", "--progress", str(progress), str(tmp_path)])
+
+    records = [json.loads(line) for line in progress.read_text().splitlines()]
+    files = {record["path"]: record for record in records if record["type"] == "file"}
+    legacy = files[str(tmp_path / "legacy.py")]
+    assert legacy["status"] == "changed"
+    assert legacy["codemods"] == [
+        "ConvertSolidToOp",
+        "ConvertPipelineToJob",
+        "ConvertCompositeToGraph",
+        "ConvertExecutePipeline",
+    ]
+    assert legacy["nodes_changed"] > 0
+    assert set(legacy["timings"]) >= {"read", "parse", "transform", "write"}
+    assert files[str(tmp_path / "broken.py")]["error"] == "ParserSyntaxError"
+    assert records[-1]["type"] == "summary"
+    assert records[-1]["total"] == 2
+
+
+def test_main_timings(tmp_path, capsys):
+    (tmp_path / "legacy.py").write_text(LEGACY_MODULE)
+
+    assert main(["--no-format", "--no-cache", "--jobs", "1", "--timings", "5", str(tmp_path)]) == 0
+
+    out = capsys.readouterr().out
+    assert "Slowest 1 file(s):" in out
+    assert str(tmp_path / "legacy.py") in out
+    assert "leave_module" in out
+
+
+def test_main_diff(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "pkg").mkdir()
+    for name in ["b.py", "a.py", "pkg/c.py"]:
+        (tmp_path / name).write_text(LEGACY_MODULE)
+    (tmp_path / "untouched.py").write_text("x = 1\n")
+
+    assert main(["--no-format", "--no-cache", "--jobs", "2", "--diff", "."]) == 0
+    captured = capsys.readouterr()
+
+    assert (tmp_path / "a.py").read_text() == LEGACY_MODULE
+    assert "4 file(s): 3 changed, 1 unchanged, 0 skipped, 0 failed" in captured.err
+    headers = [line for line in captured.out.splitlines() if line.startswith("+++")]
+    assert headers == ["+++ b/a.py", "+++ b/b.py", "+++ b/pkg/c.py"]
+
+    (tmp_path / "migration.diff").write_text(captured.out)
+    subprocess.run(["git", "apply", "migration.diff"], check=True, cwd=tmp_path)
+    assert (tmp_path / "pkg" / "c.py").read_text() == MIGRATED_MODULE
+
+
+def test_main_diff_output(tmp_path, capsys):
+    for name in ["a.py", "b.py"]:
+        (tmp_path / name).write_text(LEGACY_MODULE)
+    a, b = str(tmp_path / "a.py"), str(tmp_path / "b.py")
+    patch = tmp_path / "migration.diff"
+
+    assert main(["--no-format", "--no-cache", "--diff", a, b]) == 0
+    diff = capsys.readouterr().out
+    assert main(["--no-format", "--no-cache", "--diff-output", str(patch), a, b]) == 0
+    assert (tmp_path / "a.py").read_text() == (tmp_path / "b.py").read_text() == LEGACY_MODULE
+    assert patch.read_text() == diff
+
+    with pytest.raises(SystemExit):
+        main(["--no-format", "--no-cache", "--diff-output", a, str(tmp_path)])
+    assert "is one of the files to migrate" in capsys.readouterr().err
+    assert (tmp_path / "a.py").read_text() == LEGACY_MODULE
+
+
+def test_main_diff_leaves_no_cache(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "a.py").write_text(LEGACY_MODULE)
+
+    assert main(["--no-format", "--jobs", "1", "--diff", "a.py"]) == 0
+
+    assert "+++ b/a.py" in capsys.readouterr().out
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["a.py"]
@@ -0,0 +1,150 @@
+from textwrap import dedent
+
+import libcst as cst
+import pytest
+from libcst.codemod import CodemodContext, VisitorBasedCodemodCommand
+
+from codemods.change_input_output_defs import ChangeInputOutputDefsCommand
+from codemods.cleanup import obsolete_imports, remove_obsolete_imports
+from codemods.codemod_solid import CodemodSolid
+from codemods.convert_composite_to_graph import ConvertCompositeToGraph
+from codemods.convert_pipeline_to_job import ConvertPipelineToJob
+from codemods.convert_solid_to_op import ConvertSolidToOp
+from codemods.dagster_imports import DagsterImports
+from codemods.execute_pipeline_to_in_process import ConvertExecutePipeline
+from codemods.multiplex import MultiplexedCodemod
+
+CODEMODS = (
+    ConvertSolidToOp,
+    ConvertPipelineToJob,
+    ConvertCompositeToGraph,
+    ConvertExecutePipeline,
+    ChangeInputOutputDefsCommand,
+)
+
+SOURCE = dedent(
+    """
+    from dagster import InputDefinition, OutputDefinition
+
+    @solid(input_defs=[InputDefinition("a")], output_defs=[OutputDefinition(str)])
+    def add_solid(context, a):
+        context.log.info(context.solid_def.name)
+        return a
+
+    @composite_solid(config_schema={"x": int}, config_fn=lambda cfg: cfg)
+    def the_composite():
+        add_solid()
+
+    @pipeline
+    def the_pipeline():
+        the_composite()
+
+    def test_it():
+        @op(input_defs=[InputDefinition("b")])
+        def inner(b):
+            return b
+
+        result = execute_pipeline(the_pipeline, run_config={"solids": {"add_solid": {}}})
+        assert result.success
+    """
+)
+
+
+def _sequential(code: str) -> str:
+    tree = cst.parse_module(code)
+    obsolete = set()
+    for codemod in CODEMODS:
+        context = CodemodContext()
+        tree = codemod(context).transform_module(tree)
+        obsolete.update(obsolete_imports(context))
+    return remove_obsolete_imports(CodemodContext(), tree, obsolete).code
+
+
+def test_matches_sequential_runs():
+    multiplexed = MultiplexedCodemod.from_classes(CODEMODS).transform_module(
+        cst.parse_module(SOURCE)
+    )
+    assert multiplexed.code == _sequential(SOURCE)
+
+
+def test_codemods_keep_separate_contexts():
+    multiplexed = MultiplexedCodemod.from_classes(CODEMODS)
+    multiplexed.transform_module(cst.parse_module(SOURCE))
+
+    solid_to_op, pipeline_to_job = multiplexed.codemods[:2]
+    assert solid_to_op.context is not pipeline_to_job.context
+    assert solid_to_op.required_imports == {"In", "Out", "op"}
+    assert pipeline_to_job.required_imports == {"job"}
+
+
+def test_dagster_imports_are_collected_once(monkeypatch):
+    expected = _sequential(SOURCE)
+    modules = []
+    from_module = DagsterImports.from_module.__func__
+
+    def counting(cls, module):
+        modules.append(module)
+        return from_module(cls, module)
+
+    monkeypatch.setattr(DagsterImports, "from_module", classmethod(counting))
+    multiplexed = MultiplexedCodemod.from_classes(CODEMODS)
+    assert multiplexed.transform_module(cst.parse_module(SOURCE)).code == expected
+    assert len(modules) == 1
+
+
+class _SkipFunctionBodies(VisitorBasedCodemodCommand):
+    def __init__(self, context: CodemodContext) -> None:
+        super().__init__(context)
+        self.names = []
+
+    def visit_FunctionDef(self, node: cst.FunctionDef) -> bool:
+        return False
+
+    def visit_Name(self, node: cst.Name) -> None:
+        self.names.append(node.value)
+
+
+class _CollectNames(_SkipFunctionBodies):
+    def visit_FunctionDef(self, node: cst.FunctionDef) -> bool:
+        return True
+
+
+def test_pruning_is_per_codemod():
+    skipping = _SkipFunctionBodies(CodemodContext())
+    collecting = _CollectNames(CodemodContext())
+    MultiplexedCodemod(CodemodContext(), [skipping, collecting]).transform_module(
+        cst.parse_module("a = 1\ndef f():\n    b = 2\nc = 3\n")
+    )
+
+    assert skipping.names == ["a", "c"]
+    assert collecting.names == ["a", "f", "b", "c"]
+
+
+class _CustomTransformModule(VisitorBasedCodemodCommand):
+    def transform_module(self, tree: cst.Module) -> cst.Module:
+        return super().transform_module(tree)
+
+
+def test_rejects_codemods_with_custom_transform_module():
+    with pytest.raises(TypeError):
+        MultiplexedCodemod.from_classes([_CustomTransformModule])
+
+
+def test_codemod_solid():
+    code = dedent(
+        """
+        @pipeline
+        def the_pipeline():
+            the_solid()
+
+        @solid
+        def the_solid(context):
+            return context.solid_config
+        """
+    )
+    context = CodemodContext()
+    expected = CodemodSolid(context).transform_module(cst.parse_module(code)).code
+    multiplexed = MultiplexedCodemod.from_classes([CodemodSolid])
+    assert multiplexed.transform_module(cst.parse_module(code)).code == expected
+    assert "the_op()" in expected
+    assert "return context.op_config" in expected
@@ -0,0 +1,35 @@
+import subprocess
+
+from codemods.patch import diff_bytes, unified_diff
+
+
+def test_unified_diff(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    assert unified_diff(str(tmp_path / "pkg" / "a.py"), b"x = 1\ny = 2\n", b"x = 1\ny = 3\n") == (
+        "--- a/pkg/a.py\n+++ b/pkg/a.py\n@@ -1,2 +1,2 @@\n x = 1\n-y = 2\n+y = 3\n"
+    )
+
+
+def test_unified_diff_without_newline_at_end_of_file(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "a.py").write_bytes(b"x = 1")
+    (tmp_path / "patch.diff").write_text(unified_diff("a.py", b"x = 1", b"x = 2\n"))
+
+    subprocess.run(["git", "apply", "patch.diff"], check=True, cwd=tmp_path)
+
+    assert (tmp_path / "a.py").read_bytes() == b"x = 2\n"
+
+
+def test_unified_diff_of_other_line_breaks_and_encodings(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    before = b"# -*- coding: latin-1 -*-\nx = '\xe9'\x0c\x1c\xc2\x85\ny = 1\n"
+    after = before.replace(b"y = 1", b"y = 2")
+    (tmp_path / "a.py").write_bytes(before)
+    diff = unified_diff("a.py", before, after)
+    (tmp_path / "patch.diff").write_bytes(diff_bytes(diff))
+
+    assert "@@ -1,3 +1,3 @@" in diff
+    subprocess.run(["git", "apply", "patch.diff"], check=True, cwd=tmp_path)
+
+    assert (tmp_path / "a.py").read_bytes() == after
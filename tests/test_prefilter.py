@@ -0,0 +1,57 @@
+from codemods.change_input_output_defs import ChangeInputOutputDefsCommand
+from codemods.convert_composite_to_graph import ConvertCompositeToGraph
+from codemods.convert_pipeline_to_job import ConvertPipelineToJob
+from codemods.convert_solid_to_op import ConvertSolidToOp
+from codemods.execute_pipeline_to_in_process import ConvertExecutePipeline
+from codemods.legacy_dagster_imports import LegacyImportCommand
+from codemods.prefilter import (
+    DEFAULT_GENERATED_CODE_MARKER,
+    applicable_codemods,
+    is_generated,
+    load_generated_code_marker,
+)
+
+CODEMODS = [
+    ConvertSolidToOp,
+    ConvertPipelineToJob,
+    ConvertCompositeToGraph,
+    ConvertExecutePipeline,
+    ChangeInputOutputDefsCommand,
+]
+
+
+def test_applicable_codemods():
+    assert applicable_codemods(b"import os\n", CODEMODS) == []
+    assert applicable_codemods(b"execute_pipeline(p)\n", CODEMODS) == [
+        ConvertPipelineToJob,
+        ConvertExecutePipeline,
+    ]
+    assert applicable_codemods(b"@composite_solid\ndef c(): pass\n", CODEMODS) == [
+        ConvertSolidToOp,
+        ConvertCompositeToGraph,
+    ]
+    assert applicable_codemods(b"context.pipeline_run\n", CODEMODS) == [
+        ConvertSolidToOp,
+        ConvertPipelineToJob,
+    ]
+    assert applicable_codemods(b"@op(input_defs=[])\n", CODEMODS) == [
+        ChangeInputOutputDefsCommand
+    ]
+
+
+def test_codemods_without_keywords_always_apply():
+    assert applicable_codemods(b"import os\n", [LegacyImportCommand]) == [LegacyImportCommand]
+
+
+def test_is_generated():
+    assert is_generated(f"# {DEFAULT_GENERATED_CODE_MARKER}\n".encode(), "@gen" + "erated")
+    assert not is_generated(b"# handwritten\n", DEFAULT_GENERATED_CODE_MARKER)
+
+
+def test_load_generated_code_marker(tmp_path):
+    nested = tmp_path / "a" / "b"
+    nested.mkdir(parents=True)
+    assert load_generated_code_marker(str(nested)) == DEFAULT_GENERATED_CODE_MARKER
+
+    (tmp_path / ".libcst.codemod.yaml").write_text("generated_code_marker: '@autogen'\n")
+    assert load_generated_code_marker(str(nested)) == "@autogen"
@@ -0,0 +1,60 @@
+import io
+import json
+
+from codemods.progress import ProgressReporter
+from codemods.results import FileResult, FileStats, FileStatus
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _records(stream):
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_progress_reporter():
+    stream = io.StringIO()
+    clock = _Clock()
+    progress = ProgressReporter(stream, total=4, interval=5.0, clock=clock)
+    stats = FileStats(codemods=("ConvertSolidToOp",), nodes_changed=3, bytes_in=500_000)
+    stats.timings["parse"] = 0.5
+
+    clock.now = 1.0
+    progress.record(FileResult("a.py", FileStatus.CHANGED, stats=stats))
+    clock.now = 6.0
+    progress.record(FileResult("b.py", FileStatus.FAILED, "boom", error="ValueError"))
+    clock.now = 8.0
+    progress.finish()
+
+    file_a, file_b, throughput, summary = _records(stream)
+    assert file_a == {
+        "type": "file",
+        "path": "a.py",
+        "status": "changed",
+        "codemods": ["ConvertSolidToOp"],
+        "nodes_changed": 3,
+        "bytes_in": 500_000,
+        "bytes_out": 0,
+        "timings": {"parse": 0.5},
+        "error": None,
+    }
+    assert file_b["error"] == "ValueError"
+    assert file_b["codemods"] is None
+    assert throughput == {
+        "type": "throughput",
+        "files": 2,
+        "elapsed": 6.0,
+        "files_per_second": 0.333,
+        "mb_per_second": 0.083,
+        "total": 4,
+        "eta_seconds": 6.0,
+    }
+    assert summary["type"] == "summary"
+    assert summary["changed"] == 1
+    assert summary["failed"] == 1
+    assert summary["files"] == 2
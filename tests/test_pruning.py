@@ -0,0 +1,56 @@
+from typing import FrozenSet, List, Type
+
+import libcst as cst
+from libcst.codemod import CodemodContext
+
+from codemods.multiplex import MultiplexedCodemod
+from codemods.pruning import TRIVIA, PruningCodemodCommand
+
+SOURCE = "x = a + b\n\ndef f(c):\n    return c\n"
+
+
+class _NamesCollector(PruningCodemodCommand):
+    def __init__(self, context: CodemodContext) -> None:
+        super().__init__(context)
+        self.names: List[str] = []
+        self.visited: List[type] = []
+
+    def on_visit(self, node: cst.CSTNode) -> bool:
+        self.visited.append(type(node))
+        return super().on_visit(node)
+
+    def visit_Name(self, node: cst.Name) -> None:
+        self.names.append(node.value)
+
+
+class _StatementSkipper(_NamesCollector):
+    SKIPPED_SUBTREES: FrozenSet[Type[cst.CSTNode]] = frozenset({cst.SimpleStatementLine})
+
+
+class _TriviaSkipper(_NamesCollector):
+    SKIPPED_SUBTREES: FrozenSet[Type[cst.CSTNode]] = TRIVIA
+
+
+def test_skipped_subtrees():
+    codemod = _StatementSkipper(CodemodContext())
+    codemod.transform_module(cst.parse_module(SOURCE))
+    assert codemod.names == ["f", "c"]
+
+
+def test_trivia_is_not_descended_into():
+    codemod = _TriviaSkipper(CodemodContext())
+    codemod.transform_module(cst.parse_module(SOURCE))
+    collector = _NamesCollector(CodemodContext())
+    collector.transform_module(cst.parse_module(SOURCE))
+    assert codemod.names == collector.names == ["x", "a", "b", "f", "c", "c"]
+    assert cst.Add in codemod.visited
+    assert len(codemod.visited) < len(collector.visited)
+
+
+def test_multiplexed_skipped_subtrees():
+    skipper = _StatementSkipper(CodemodContext())
+    collector = _NamesCollector(CodemodContext())
+    multiplexed = MultiplexedCodemod(CodemodContext(), [skipper, collector])
+    multiplexed.transform_module(cst.parse_module(SOURCE))
+    assert skipper.names == ["f", "c"]
+    assert collector.names == ["x", "a", "b", "f", "c", "c"]
@@ -0,0 +1,35 @@
+import libcst as cst
+from libcst.codemod import CodemodContext
+
+from codemods.rename import RenameTable, RenameTransformer
+
+
+def test_rename():
+    table = RenameTable({"my_solid": "my_op"})
+    assert table.rename("my_solid") == "my_op"
+    assert table.rename("my_solid_2") is None
+
+
+def test_sub_identifier_boundaries():
+    table = RenameTable({"my_solid": "my_op", "my_solid_2": "my_op_2"})
+    assert table.sub('"run my_solid, then my_solid_2"') == '"run my_op, then my_op_2"'
+    assert table.sub('"my_solid_config"') == '"my_solid_config"'
+    assert table.sub('"not_my_solid"') == '"not_my_solid"'
+
+
+def test_sub_without_boundaries():
+    table = RenameTable({"solid": "op", "pipeline_run": "run"}, boundaries=False)
+    assert table.sub("solid_config") == "op_config"
+    assert table.sub("pipeline_run_id") == "run_id"
+
+
+def test_empty_table():
+    table = RenameTable({})
+    assert not table
+    assert table.sub("my_solid") == "my_solid"
+
+
+def test_transformer():
+    tree = cst.parse_module('my_solid()\nNAME = "my_solid"\nOTHER = "other"\n')
+    transformer = RenameTransformer(CodemodContext(), RenameTable({"my_solid": "my_op"}))
+    assert tree.visit(transformer).code == 'my_op()\nNAME = "my_op"\nOTHER = "other"\n'
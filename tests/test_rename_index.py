@@ -0,0 +1,131 @@
+from textwrap import dedent
+
+import libcst as cst
+from libcst.codemod import CodemodContext
+from libcst.helpers import ModuleNameAndPackage
+
+from codemods.migrate import MIGRATION_CODEMODS
+from codemods.rename_index import IndexEntry, PropagateRenames, RenameIndex, activate, index_source
+
+SOLIDS = dedent(
+    """
+    from dagster import pipeline, solid
+
+    @solid
+    def the_solid():
+        pass
+
+    @pipeline
+    def the_pipeline():
+        the_solid()
+
+    def helper_solid():
+        pass
+    """
+)
+
+IMPORTER = dedent(
+    """
+    import pkg.solids as solids
+    from pkg.solids import the_pipeline as renamed
+    from . import the_solid
+
+    def run():
+        the_solid()
+        solids.the_solid()
+        renamed()
+    """
+)
+
+
+def test_index_source():
+    entry = index_source(
+        SOLIDS.encode(), ModuleNameAndPackage("pkg.solids", "pkg"), MIGRATION_CODEMODS
+    )
+    assert entry.renames == {"the_solid": "the_op", "the_pipeline": "the_job"}
+    assert entry.imports == (("dagster", "pipeline"), ("dagster", "solid"))
+
+
+def test_index_follows_reexports():
+    index = RenameIndex.from_entries(
+        ["/repo"],
+        [
+            IndexEntry("pkg", {}, (("pkg.solids", "the_solid"), ("pkg.solids", "helper"))),
+            IndexEntry("pkg.solids", {"the_solid": "the_op"}),
+            IndexEntry("other", {}, (("pkg", "the_solid"),)),
+            IndexEntry("unrelated", {}),
+        ],
+    )
+    assert index.renames == {
+        "pkg": {"the_solid": "the_op"},
+        "pkg.solids": {"the_solid": "the_op"},
+        "other": {"the_solid": "the_op"},
+    }
+    assert index.keywords == (b"the_solid",)
+    assert index.module_of("/repo/pkg/__init__.py") == ModuleNameAndPackage("pkg", "pkg")
+
+
+def test_propagate_renames():
+    index = RenameIndex(
+        ("/repo",),
+        {
+            "pkg": {"the_solid": "the_op"},
+            "pkg.solids": {"the_solid": "the_op", "the_pipeline": "the_job"},
+        },
+    )
+    activate(index)
+    try:
+        context = CodemodContext(filename="/repo/pkg/runner.py")
+        result = PropagateRenames(context).transform_module(cst.parse_module(IMPORTER)).code
+        assert PropagateRenames.PREFILTER_KEYWORDS == (b"the_pipeline", b"the_solid")
+        assert PropagateRenames.state_key("/repo/pkg/runner.py").endswith(":pkg.runner")
+    finally:
+        activate(None)
+    assert result == dedent(
+        """
+        import pkg.solids as solids
+        from pkg.solids import the_job as renamed
+        from . import the_op
+
+        def run():
+            the_op()
+            solids.the_op()
+            renamed()
+        """
+    )
+
+
+def test_propagate_renames_to_imported_submodules():
+    index = RenameIndex(("/repo",), {"pkg.solids": {"the_solid": "the_op"}})
+    code = dedent(
+        """
+        from pkg import solids
+        from . import solids as relative
+
+        solids.the_solid()
+        relative.the_solid()
+        solids.helper()
+        """
+    )
+    activate(index)
+    try:
+        context = CodemodContext(filename="/repo/pkg/runner.py")
+        result = PropagateRenames(context).transform_module(cst.parse_module(code)).code
+    finally:
+        activate(None)
+    assert result == dedent(
+        """
+        from pkg import solids
+        from . import solids as relative
+
+        solids.the_op()
+        relative.the_op()
+        solids.helper()
+        """
+    )
+
+
+def test_propagate_renames_without_index():
+    assert PropagateRenames.PREFILTER_KEYWORDS == ()
+    tree = cst.parse_module(IMPORTER)
+    assert PropagateRenames(CodemodContext()).transform_module(tree).code == IMPORTER
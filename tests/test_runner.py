@@ -0,0 +1,63 @@
+from codemods import runner
+from codemods.results import FileResult, FileStatus, MigrationSummary
+
+
+def _square(x):
+    return x * x
+
+
+def test_available_cpu_count():
+    assert runner.available_cpu_count() >= 1
+
+
+def test_available_cpu_count_honours_cgroup_quota(monkeypatch):
+    monkeypatch.setattr(runner.os, "sched_getaffinity", lambda pid: set(range(40)))
+    monkeypatch.setattr(runner, "_cgroup_cpu_quota", lambda: 2.5)
+    assert runner.available_cpu_count() == 3
+
+
+def test_imap_unordered():
+    assert sorted(runner.imap_unordered(_square, range(20), jobs=3)) == [
+        x * x for x in range(20)
+    ]
+    assert list(runner.imap_unordered(_square, range(5), jobs=1)) == [0, 1, 4, 9, 16]
+
+
+def test_imap():
+    assert list(runner.imap(_square, range(20), jobs=3)) == [x * x for x in range(20)]
+    assert list(runner.imap(_square, range(5), jobs=1)) == [0, 1, 4, 9, 16]
+
+
+_OFFSET = 0
+
+
+def _set_offset(offset):
+    global _OFFSET
+    _OFFSET = offset
+
+
+def _add_offset(x):
+    return x + _OFFSET
+
+
+def test_initializer():
+    assert sorted(runner.imap_unordered(_add_offset, range(5), 2, _set_offset, (10,))) == [
+        10,
+        11,
+        12,
+        13,
+        14,
+    ]
+    assert list(runner.imap(_add_offset, range(3), 1, _set_offset, (100,))) == [100, 101, 102]
+    _set_offset(0)
+
+
+def test_summary():
+    summary = MigrationSummary()
+    summary.record(FileResult("a.py", FileStatus.CHANGED))
+    summary.record(FileResult("b.py", FileStatus.UNCHANGED))
+    summary.record(FileResult("c.py", FileStatus.FAILED, "boom"))
+
+    assert summary.total == 3
+    assert [failure.path for failure in summary.failures] == ["c.py"]
+    assert summary.format() == "3 file(s): 1 changed, 1 unchanged, 0 skipped, 1 failed"
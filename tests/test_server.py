@@ -0,0 +1,65 @@
+import io
+import json
+import socket
+import threading
+
+from codemods.migrate import MigrationConfig
+from codemods.prefilter import DEFAULT_GENERATED_CODE_MARKER
+from codemods.server import MigrationServer, handle_request, serve_lines
+
+LEGACY_MODULE = "@solid\ndef the_solid():\n    pass\n"
+MIGRATED_MODULE = "from dagster import op\n\n@op\ndef the_op():\n    pass\n"
+
+
+def test_handle_source_request():
+    assert handle_request({"id": 1, "source": LEGACY_MODULE}) == {
+        "id": 1,
+        "status": "changed",
+        "source": MIGRATED_MODULE,
+    }
+    assert handle_request({"source": "x = 1\n"}) == {"status": "unchanged"}
+    skipped = handle_request({"source": f"# {DEFAULT_GENERATED_CODE_MARKER}\n{LEGACY_MODULE}"})
+    assert skipped["status"] == "skipped"
+    failed = handle_request({"source": "def broken_solid(:\n"})
+    assert failed["status"] == "failed"
+    assert "ParserSyntaxError" in failed["message"]
+
+
+def test_handle_path_request(tmp_path):
+    path = tmp_path / "legacy.py"
+    path.write_text(LEGACY_MODULE)
+
+    assert handle_request({"id": "a", "path": str(path)}) == {"id": "a", "status": "changed"}
+    assert path.read_text() == MIGRATED_MODULE
+    assert handle_request({"path": str(path)}) == {"status": "unchanged"}
+
+
+def test_serve_lines():
+    output = io.StringIO()
+    lines = [json.dumps({"id": 1, "source": LEGACY_MODULE}), "", "[]", "{}"]
+
+    serve_lines(lines, output)
+
+    responses = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert [response["status"] for response in responses] == ["changed", "failed", "failed"]
+    assert responses[0]["source"] == MIGRATED_MODULE
+    assert "Invalid request" in responses[1]["message"]
+
+
+def test_migration_server(tmp_path):
+    socket_path = str(tmp_path / "server.sock")
+    with MigrationServer(socket_path, MigrationConfig()) as server:
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+                client.connect(socket_path)
+                stream = client.makefile("rwb")
+                for i in range(2):
+                    stream.write(json.dumps({"id": i, "source": LEGACY_MODULE}).encode() + b"\n")
+                    stream.flush()
+                    response = json.loads(stream.readline())
+                    assert response == {"id": i, "status": "changed", "source": MIGRATED_MODULE}
+        finally:
+            server.shutdown()
+            thread.join()
@@ -0,0 +1,30 @@
+from codemods.results import FileResult, FileStats, FileStatus
+from codemods.timings import TimingReport, percentile
+
+
+def _result(path, **timings):
+    return FileResult(path, FileStatus.CHANGED, stats=FileStats(timings=timings))
+
+
+def test_percentile():
+    values = [float(i) for i in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 95) == 95.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([3.0], 99) == 3.0
+
+
+def test_timing_report():
+    report = TimingReport(top=2)
+    report.record(_result("a.py", parse=0.1, transform=0.2))
+    report.record(_result("b.py", parse=0.5, transform=0.1))
+    report.record(_result("c.py", parse=0.05, transform=0.05))
+    report.record(FileResult("d.py", FileStatus.UNCHANGED))
+
+    assert [path for _, path, _ in report.slowest()] == ["b.py", "a.py"]
+    assert sorted(report.phases) == ["parse", "transform"]
+    lines = report.format().splitlines()
+    assert lines[0] == "Slowest 2 file(s):"
+    assert lines[1].split() == ["600.0", "ms", "parse", "83%", "b.py"]
+    assert lines[2].split() == ["300.0", "ms", "transform", "67%", "a.py"]
+    assert lines[4].split() == ["parse", "3", "100.0", "500.0", "500.0"]
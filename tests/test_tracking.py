@@ -0,0 +1,63 @@
+from textwrap import dedent
+
+import libcst as cst
+from libcst.codemod import CodemodContext
+
+from codemods.convert_solid_to_op import ConvertSolidToOp
+from codemods.multiplex import MultiplexedCodemod
+from codemods.rename import RenameTable, RenameTransformer
+from codemods.tracking import CONTEXT_KEY, StatementTracker, revisit_statements
+
+SOURCE = dedent(
+    """
+    @solid
+    def my_solid():
+        return 1
+
+    def unrelated():
+        return 2
+
+    def caller():
+        return my_solid()
+
+    DOC = "runs my_solid"
+    """
+)
+
+
+def test_tracker_standalone():
+    context = CodemodContext()
+    ConvertSolidToOp(context).transform_module(cst.parse_module(SOURCE))
+    tracker: StatementTracker = context.scratch[CONTEXT_KEY]
+    assert tracker.changed == {0, 2, 3}
+    assert tracker.names["my_solid"] == {0, 2}
+    assert tracker.strings == [(3, '"runs my_solid"')]
+    table = RenameTable({"my_solid": "my_op"})
+    assert tracker.referencing(RenameTransformer(context, table)) == {0, 2, 3}
+
+
+def test_tracker_multiplexed():
+    multiplexed = MultiplexedCodemod.from_classes([ConvertSolidToOp])
+    result = multiplexed.transform_module(cst.parse_module(SOURCE))
+    assert multiplexed.tracker.changed == {0, 2, 3}
+    assert multiplexed.codemods[0].context.scratch[CONTEXT_KEY] is multiplexed.tracker
+    assert "def my_op():" in result.code
+    assert "return my_op()" in result.code
+    assert '"runs my_op"' in result.code
+
+
+def test_revisit_statements_reuses_other_statements():
+    context = CodemodContext()
+    # Visited rather than transformed, which would add an import in front.
+    updated = cst.parse_module(SOURCE).visit(ConvertSolidToOp(context))
+    transformer = RenameTransformer(context, RenameTable({"my_op": "renamed"}))
+    revisited = revisit_statements(context, updated, transformer)
+    assert revisited.body[1] is updated.body[1]
+    assert "def renamed():" in revisited.code
+
+
+def test_revisit_statements_untracked():
+    context = CodemodContext()
+    tree = cst.parse_module(SOURCE)
+    transformer = RenameTransformer(context, RenameTable({"unrelated": "other"}))
+    assert "def other():" in revisit_statements(context, tree, transformer).code